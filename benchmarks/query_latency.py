@@ -0,0 +1,149 @@
+"""
+Query latency benchmark for the Gold query service.
+
+Writes a synthetic region-by-month-by-category Gold table, starts the
+service on a free local port and measures p50 / p99 request latency over
+HTTP (one keep-alive connection) for:
+
+- cold:   a new query each request (filter + group-by on the Arrow table)
+- warm:   repeated queries (LRU response cache)
+- 304:    repeated queries with If-None-Match
+- pandas: the same query re-reading the Gold file with pandas per request,
+          without the service (the baseline it replaces)
+
+Usage (from the project root):
+    python benchmarks/query_latency.py [--rows 50000] [--requests 500] [--format parquet]
+"""
+import argparse
+import http.client
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.dashboard.query_service import make_server  # noqa: E402
+from src.writer_service import WriterService  # noqa: E402
+
+REGIONS = ("north", "south", "east", "west", "central")
+CATEGORIES = ("electronics", "toys", "clothing", "home", "sports", "books")
+MONTHS = [f"{year}-{month:02d}" for year in range(2015, 2025) for month in range(1, 13)]
+
+
+def write_table(base: str, rows: int, fmt: str):
+    rng = random.Random(0)
+    table = [
+        {
+            "sale_month": rng.choice(MONTHS),
+            "region": rng.choice(REGIONS),
+            "category": rng.choice(CATEGORIES),
+            "total_revenue": round(rng.uniform(10, 10_000), 2),
+            "total_quantity": rng.randint(1, 50),
+        }
+        for _ in range(rows)
+    ]
+    WriterService(base, gold_format=fmt).write_gold_table("rollup", table)
+
+
+def queries():
+    """
+    Distinct dashboard-style queries, in a fixed order.
+    """
+    rng = random.Random(1)
+    while True:
+        start, end = sorted(rng.sample(MONTHS, 2))
+        regions = ",".join(rng.sample(REGIONS, rng.randint(1, 3)))
+        yield (
+            f"/tables/rollup?month_from={start}&month_to={end}&region={regions}"
+            f"&group_by=category&order_by=-total_revenue_sum"
+        )
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return statistics.median(samples) * 1000, p99 * 1000
+
+
+def measure_http(conn, paths, etags=None):
+    samples, seen = [], {}
+    for path in paths:
+        headers = {"If-None-Match": etags[path]} if etags else {}
+        start = time.perf_counter()
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        samples.append(time.perf_counter() - start)
+        seen[path] = response.getheader("ETag")
+        if etags and response.status != 304:
+            raise RuntimeError(f"expected 304 for {path}, got {response.status}")
+    return samples, seen
+
+
+def measure_pandas(base: str, fmt: str, paths):
+    import pandas as pd
+
+    from urllib.parse import parse_qsl, urlsplit
+
+    path = os.path.join(base, "gold", f"rollup.{fmt}")
+    read = {"csv": pd.read_csv, "parquet": pd.read_parquet, "orc": pd.read_orc}[fmt]
+
+    samples = []
+    for url in paths:
+        params = dict(parse_qsl(urlsplit(url).query))
+        start = time.perf_counter()
+        df = read(path)
+        df = df[
+            (df["sale_month"] >= params["month_from"]) & (df["sale_month"] <= params["month_to"])
+            & df["region"].isin(params["region"].split(","))
+        ]
+        df.groupby("category")[["total_revenue", "total_quantity"]].sum().to_json()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000, help="Rows in the synthetic Gold table")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--format", default="parquet", choices=("csv", "parquet", "orc"))
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as base:
+        write_table(base, args.rows, args.format)
+
+        server = make_server(base, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+        try:
+            # first request loads the table; not part of any scenario
+            measure_http(conn, ["/tables/rollup?limit=1"])
+
+            paths = list(itertools.islice(queries(), args.requests))
+            repeated = [paths[i % 20] for i in range(args.requests)]
+
+            cold, _ = measure_http(conn, paths)
+            warm, etags = measure_http(conn, repeated)
+            not_modified, _ = measure_http(conn, repeated, etags)
+            baseline = measure_pandas(base, args.format, paths[:min(args.requests, 100)])
+        finally:
+            conn.close()
+            server.shutdown()
+            server.server_close()
+
+    print(f"{args.rows} rows, {args.format}, {args.requests} requests per scenario")
+    print(f"{'scenario':<10} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, samples in (("cold", cold), ("warm", warm), ("304", not_modified), ("pandas", baseline)):
+        p50, p99 = percentiles(samples)
+        print(f"{name:<10} {p50:>8.2f} {p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,139 @@
+"""
+Startup benchmark: import cost of the orchestrator per Gold format.
+
+Runs `python -X importtime -m src.pipeline_orchestrator` against a tiny
+generated input once per format, for a real micro-batch run and for
+--dry-run, and reports wall time, total import time and which heavy
+libraries were loaded.
+
+Usage (from the project root):
+    python benchmarks/startup_importtime.py [--repeat 5]
+"""
+import argparse
+import csv
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+FORMATS = ("csv", "parquet", "orc")
+HEAVY_MODULES = ("pyarrow", "pyorc", "pandas", "plotly", "altair")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONFIG_TEMPLATE = """[PIPELINE]
+chunk_size = 1000
+max_rows = -1
+enable_checkpoint = true
+checkpoint_file = checkpoint.json
+
+[INPUT]
+input_type = directory
+input_path = {base}/input
+file_pattern = sales_data_part_*.csv
+
+[OUTPUT]
+output_dir = {base}/processed
+format = {fmt}
+
+[CHECKPOINTS]
+bronze_checkpoint = {base}/checkpoints/bronze.json
+silver_checkpoint = {base}/checkpoints/silver.json
+
+[MEMORY]
+max_chunk_mb = 256
+flush_interval = 50000
+
+[ANOMALY]
+top_n = 5
+high_revenue_threshold = 1000000
+"""
+
+
+def write_input(base: str, rows: int = 100):
+    os.makedirs(os.path.join(base, "input"))
+    os.makedirs(os.path.join(base, "checkpoints"))
+    with open(os.path.join(base, "input", "sales_data_part_0001.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "order_id", "product_name", "category", "quantity", "unit_price",
+            "discount_percent", "region", "sale_date", "customer_email"
+        ])
+        for i in range(rows):
+            writer.writerow([
+                f"ORD-{i}", "iphone 14", "electronics", i % 5 + 1, 100.0 + i,
+                0.1, "north", f"2024-0{i % 9 + 1}-15", ""
+            ])
+
+
+def parse_importtime(stderr: str):
+    """
+    Returns (total import seconds, set of top-level packages imported).
+    """
+    total_us = 0
+    packages = set()
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        # "import time: <self us> | <cumulative us> | <module>"
+        self_us, _, name = line.split("|", 2)
+        total_us += int(self_us.split(":")[-1])
+        packages.add(name.strip().split(".")[0])
+
+    return total_us / 1e6, packages
+
+
+def run_once(config_path: str, dry_run: bool):
+    cmd = [sys.executable, "-X", "importtime", "-m", "src.pipeline_orchestrator", config_path]
+    if dry_run:
+        cmd.append("--dry-run")
+
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+
+    import_s, packages = parse_importtime(proc.stderr)
+    return wall, import_s, packages
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per format and mode")
+    args = parser.parse_args(argv)
+
+    print(f"{'format':<8} {'mode':<8} {'wall ms':>9} {'import ms':>10}  heavy modules")
+
+    for fmt in FORMATS:
+        for dry_run in (False, True):
+            walls, imports, heavy = [], [], set()
+
+            for _ in range(args.repeat):
+                # fresh output each run, so every run does the same work
+                with tempfile.TemporaryDirectory() as base:
+                    write_input(base)
+                    config_path = os.path.join(base, "pipeline.conf")
+                    with open(config_path, "w") as f:
+                        f.write(CONFIG_TEMPLATE.format(base=base, fmt=fmt))
+
+                    wall, import_s, packages = run_once(config_path, dry_run)
+
+                walls.append(wall)
+                imports.append(import_s)
+                heavy |= packages.intersection(HEAVY_MODULES)
+
+            mode = "dry-run" if dry_run else "run"
+            print(
+                f"{fmt:<8} {mode:<8} {statistics.median(walls) * 1000:>9.1f} "
+                f"{statistics.median(imports) * 1000:>10.1f}  {', '.join(sorted(heavy)) or '-'}"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,42 +1,112 @@
 from collections import defaultdict
 import heapq
 
+from src.spill_service import ENTRY_BYTES, SpillStore
+
+
+# Sums are kept as fixed-point integers so partial states can be merged in
+# any order and still finalize to exactly the same Gold values.
+REVENUE_SCALE = 100               # revenue is rounded to cents in Silver
+DISCOUNT_SCALE = 1_000_000_000    # discount_percent in [0, 1]
+
+
+def _monthly_bucket():
+    return {
+        "revenue": 0,
+        "quantity": 0,
+        "discount_sum": 0,
+        "count": 0
+    }
+
+
+def _product_bucket():
+    return {
+        "revenue": 0,
+        "quantity": 0
+    }
+
+
+def _region_month_bucket():
+    return {
+        "revenue": 0,
+        "count": 0
+    }
+
+
+def _category_bucket():
+    return {
+        "discount_sum": 0,
+        "count": 0
+    }
+
+
+def _group_sums(table, keys, values):
+    """
+    Rows of {key..., <value>_sum..., count_all} per distinct key tuple.
+    """
+    aggregations = [(value, "sum") for value in values] + [([], "count_all")]
+    return table.group_by(keys, use_threads=False).aggregate(aggregations).to_pylist()
+
 
 class AggregationService:
     """
     Streaming-safe business aggregations.
+    Partial states built over disjoint inputs can be combined with merge().
+
+    With spill_dir and max_state_mb set, the product state (the only
+    unbounded one) is checked every check_every rows and spilled to
+    hash-partitioned files once its estimated size exceeds max_state_mb;
+    finalize() merges the partitions one at a time. Call close() to
+    remove the spill files.
     """
 
-    def __init__(self, anomaly_top_n: int):
+    def __init__(
+        self,
+        anomaly_top_n: int,
+        first_seq: int = 0,
+        spill_dir: str = None,
+        max_state_mb: int = 0,
+        check_every: int = 50000
+    ):
         # monthly_sales_summary
-        self.monthly = defaultdict(lambda: {
-            "revenue": 0.0,
-            "quantity": 0,
-            "discount_sum": 0.0,
-            "count": 0
-        })
+        self.monthly = defaultdict(_monthly_bucket)
 
         # top_products
-        self.products = defaultdict(lambda: {
-            "revenue": 0.0,
-            "quantity": 0
-        })
+        self.products = defaultdict(_product_bucket)
 
         # region_wise_performance
-        self.regions = defaultdict(float)
+        self.regions = defaultdict(int)
+
+        # rollup_region_by_month, keyed on (sale_month, region)
+        self.region_monthly = defaultdict(_region_month_bucket)
 
         # category_discount_map
-        self.category_discount = defaultdict(lambda: {
-            "discount_sum": 0.0,
-            "count": 0
-        })
+        self.category_discount = defaultdict(_category_bucket)
 
-        # anomaly detection (min-heap)
+        # anomaly detection (min-heap of (revenue, -seq, row))
         self.anomaly_top_n = anomaly_top_n
         self.anomalies = []
+        self._seq = first_seq
+
+        # products spill
+        self.max_state_bytes = max_state_mb * 1024 * 1024
+        self.check_every = max(1, check_every)
+        self._rows_since_check = 0
+        self._spill = None
+        if spill_dir and max_state_mb:
+            self._spill = SpillStore(spill_dir, "products", ("revenue", "quantity"), self.max_state_bytes)
+
+    def process(self, row: dict, seq: int = None):
+        """
+        seq orders rows globally for anomaly tie-breaking (earlier wins).
+        Defaults to arrival order.
+        """
+        if seq is None:
+            seq = self._seq
+            self._seq += 1
 
-    def process(self, row: dict):
-        revenue = row["revenue"]
+        revenue = round(row["revenue"] * REVENUE_SCALE)
+        discount = round(row["discount_percent"] * DISCOUNT_SCALE)
         quantity = row["quantity"]
 
         # ------------------
@@ -45,7 +115,7 @@ class AggregationService:
         m = self.monthly[row["sale_month"]]
         m["revenue"] += revenue
         m["quantity"] += quantity
-        m["discount_sum"] += row["discount_percent"]
+        m["discount_sum"] += discount
         m["count"] += 1
 
         # ------------------
@@ -60,26 +130,187 @@ class AggregationService:
         # ------------------
         self.regions[row["region"]] += revenue
 
+        rm = self.region_monthly[(row["sale_month"], row["region"])]
+        rm["revenue"] += revenue
+        rm["count"] += 1
+
         # ------------------
         # Category discount
         # ------------------
         c = self.category_discount[row["category"]]
-        c["discount_sum"] += row["discount_percent"]
+        c["discount_sum"] += discount
         c["count"] += 1
 
         # ------------------
         # Anomaly detection
         # ------------------
-        self._track_anomaly(row)
+        self._track_anomaly(row, seq)
+
+        if self._spill is not None:
+            self._count_rows(1)
+
+    def process_batch(self, table):
+        """
+        Vectorized process() over a pyarrow Table of normalized Silver rows
+        (quantity int, prices and revenue float). Per-batch partial sums come
+        from group_by and are folded into the running state; only the batch's
+        own top-N candidates reach the anomaly heap. Same state as calling
+        process() on every row in order.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
 
-    def _track_anomaly(self, row: dict):
-        entry = (row["revenue"], row)
+        n = table.num_rows
+        if n == 0:
+            return
+
+        first_seq = self._seq
+        self._seq += n
+
+        # Python round(): half to even, on the same float64 products
+        revenue = pc.cast(pc.round(pc.multiply(table["revenue"], REVENUE_SCALE), round_mode="half_to_even"), pa.int64())
+        discount = pc.cast(
+            pc.round(pc.multiply(table["discount_percent"], float(DISCOUNT_SCALE)), round_mode="half_to_even"),
+            pa.int64()
+        )
+        parts = pa.table({
+            "sale_month": table["sale_month"],
+            "product_key": table["product_key"],
+            "region": table["region"],
+            "category": table["category"],
+            "revenue": revenue,
+            "quantity": pc.cast(table["quantity"], pa.int64()),
+            "discount": discount,
+        })
+
+        # ------------------
+        # Monthly summary
+        # ------------------
+        for g in _group_sums(parts, ["sale_month"], ["revenue", "quantity", "discount"]):
+            m = self.monthly[g["sale_month"]]
+            m["revenue"] += g["revenue_sum"]
+            m["quantity"] += g["quantity_sum"]
+            m["discount_sum"] += g["discount_sum"]
+            m["count"] += g["count_all"]
+
+        # ------------------
+        # Product aggregation
+        # ------------------
+        for g in _group_sums(parts, ["product_key"], ["revenue", "quantity"]):
+            p = self.products[g["product_key"]]
+            p["revenue"] += g["revenue_sum"]
+            p["quantity"] += g["quantity_sum"]
+
+        # ------------------
+        # Region aggregation
+        # ------------------
+        for g in _group_sums(parts, ["sale_month", "region"], ["revenue"]):
+            self.regions[g["region"]] += g["revenue_sum"]
+
+            rm = self.region_monthly[(g["sale_month"], g["region"])]
+            rm["revenue"] += g["revenue_sum"]
+            rm["count"] += g["count_all"]
+
+        # ------------------
+        # Category discount
+        # ------------------
+        for g in _group_sums(parts, ["category"], ["discount"]):
+            c = self.category_discount[g["category"]]
+            c["discount_sum"] += g["discount_sum"]
+            c["count"] += g["count_all"]
+
+        if self._spill is not None:
+            self._count_rows(n)
+
+        # ------------------
+        # Anomaly detection
+        # ------------------
+        k = min(self.anomaly_top_n, n)
+        if k <= 0:
+            return
+
+        # row position breaks revenue ties (earlier wins), as seq does
+        candidates = pc.select_k_unstable(
+            pa.table({"revenue": table["revenue"], "position": pa.array(range(n), pa.int64())}),
+            k=k,
+            sort_keys=[("revenue", "descending"), ("position", "ascending")]
+        )
+        for position, row in zip(candidates.to_pylist(), table.take(candidates).to_pylist()):
+            self._track_anomaly(row, first_seq + position)
+
+    def _track_anomaly(self, row: dict, seq: int):
+        entry = (row["revenue"], -seq, row)
 
         if len(self.anomalies) < self.anomaly_top_n:
             heapq.heappush(self.anomalies, entry)
         else:
             heapq.heappushpop(self.anomalies, entry)
 
+    # ------------------
+    # Spilling
+    # ------------------
+    def _count_rows(self, n: int):
+        self._rows_since_check += n
+        if self._rows_since_check >= self.check_every:
+            self._rows_since_check = 0
+            self._maybe_spill()
+
+    def _maybe_spill(self):
+        if len(self.products) * ENTRY_BYTES > self.max_state_bytes:
+            self._spill.spill(self.products)
+            self.products = defaultdict(_product_bucket)
+
+    def spill_count(self) -> int:
+        return self._spill.spills if self._spill is not None else 0
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.clear()
+
+    # ------------------
+    # Partial state merge
+    # ------------------
+    def merge(self, other: "AggregationService"):
+        for month, data in other.monthly.items():
+            m = self.monthly[month]
+            for field, value in data.items():
+                m[field] += value
+
+        for key, data in other.products.items():
+            p = self.products[key]
+            p["revenue"] += data["revenue"]
+            p["quantity"] += data["quantity"]
+
+        for region, revenue in other.regions.items():
+            self.regions[region] += revenue
+
+        for key, data in other.region_monthly.items():
+            rm = self.region_monthly[key]
+            rm["revenue"] += data["revenue"]
+            rm["count"] += data["count"]
+
+        for cat, data in other.category_discount.items():
+            c = self.category_discount[cat]
+            c["discount_sum"] += data["discount_sum"]
+            c["count"] += data["count"]
+
+        self.anomalies = heapq.nlargest(
+            self.anomaly_top_n,
+            self.anomalies + other.anomalies,
+            key=lambda e: (e[0], e[1])
+        )
+        heapq.heapify(self.anomalies)
+
+        if other._spill is not None and other._spill.spilled:
+            if self._spill is None:
+                self._spill = other._spill
+                other._spill = None
+            else:
+                self._spill.absorb(other._spill)
+
+        if self._spill is not None and self.max_state_bytes:
+            self._maybe_spill()
+
     # ------------------
     # Final outputs
     # ------------------
@@ -89,55 +320,76 @@ class AggregationService:
             "top_products": self._finalize_products(),
             "region_wise_performance": self._finalize_regions(),
             "category_discount_map": self._finalize_category_discount(),
-            "anomaly_records": self._finalize_anomalies()
+            "anomaly_records": self._finalize_anomalies(),
+            "rollup_region_by_month": self._finalize_region_monthly()
         }
 
     def _finalize_monthly(self):
         result = []
-        for month, data in self.monthly.items():
+        for month in sorted(self.monthly):
+            data = self.monthly[month]
             result.append({
                 "sale_month": month,
-                "total_revenue": round(data["revenue"], 2),
+                "total_revenue": round(data["revenue"] / REVENUE_SCALE, 2),
                 "total_quantity": data["quantity"],
+                "order_count": data["count"],
                 "avg_discount": round(
-                    data["discount_sum"] / data["count"], 4
-                )
+                    data["discount_sum"] / DISCOUNT_SCALE / data["count"], 4
+                ),
+                # fixed-point, so upserts can re-derive avg_discount exactly
+                "discount_sum": data["discount_sum"]
             })
         return result
 
     def _finalize_products(self):
-        items = [
+        items = self.products.items()
+        if self._spill is not None and self._spill.spilled:
+            items = self._spill.merged_items(self.products)
+
+        top = heapq.nsmallest(10, items, key=lambda kv: (-kv[1]["revenue"], kv[0]))
+
+        return [
             {
                 "product_key": k,
-                "revenue": round(v["revenue"], 2),
+                "revenue": round(v["revenue"] / REVENUE_SCALE, 2),
                 "quantity": v["quantity"]
             }
-            for k, v in self.products.items()
+            for k, v in top
         ]
 
-        items.sort(key=lambda x: x["revenue"], reverse=True)
-        return items[:10]
-    
     def _finalize_regions(self):
         return [
-            {"region": region, "total_revenue": round(revenue, 2)}
-            for region, revenue in self.regions.items()
+            {"region": region, "total_revenue": round(self.regions[region] / REVENUE_SCALE, 2)}
+            for region in sorted(self.regions)
         ]
-    
+
+    def _finalize_region_monthly(self):
+        return [
+            {
+                "sale_month": month,
+                "region": region,
+                "total_revenue": round(data["revenue"] / REVENUE_SCALE, 2),
+                "order_count": data["count"]
+            }
+            for (month, region), data in sorted(self.region_monthly.items())
+        ]
+
     def _finalize_category_discount(self):
         result = []
-        for cat, data in self.category_discount.items():
+        for cat in sorted(self.category_discount):
+            data = self.category_discount[cat]
             result.append({
                 "category": cat,
                 "avg_discount": round(
-                    data["discount_sum"] / data["count"], 4
+                    data["discount_sum"] / DISCOUNT_SCALE / data["count"], 4
                 )
             })
         return result
 
     def _finalize_anomalies(self):
-        return sorted(
-            [row for _, row in self.anomalies],
-            key=lambda x: x["revenue"],
-            reverse=True
-        )
+        return [
+            row for _, _, row in sorted(
+                self.anomalies,
+                key=lambda e: (-e[0], -e[1])
+            )
+        ]
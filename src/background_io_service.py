@@ -0,0 +1,121 @@
+import queue
+import threading
+from typing import Iterable, Iterator
+
+from src.checkpoint_service import Checkpoint
+
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class Prefetcher:
+    """
+    Read-ahead: drains an iterator on a background thread, keeping up to
+    `depth` items ready so parsing the next chunk overlaps with the caller's
+    work on the current one.
+    """
+
+    def __init__(self, iterable: Iterable, depth: int = 2):
+        self._source = iter(iterable)
+        self._queue = queue.Queue(maxsize=max(1, depth))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bronze-prefetch", daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        try:
+            for item in self._source:
+                if not self._put(item):
+                    return
+        except BaseException as e:
+            self._put(_Failure(e))
+            return
+        self._put(_DONE)
+
+    def __iter__(self) -> Iterator:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            self.close()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+
+class WriteBehindWriter:
+    """
+    Write-behind for Silver chunks.
+
+    submit() returns as soon as the chunk is queued; a background thread
+    writes the chunk and then commits the Bronze checkpoint, strictly in
+    submission order. At most `max_in_flight` chunks wait in the queue.
+
+    A crash loses only uncommitted chunks, which are re-read on restart and
+    rewritten under the same Silver file name.
+    """
+
+    def __init__(self, writer, checkpoint, max_in_flight: int = 2):
+        self.writer = writer
+        self.checkpoint = checkpoint
+        self._queue = queue.Queue(maxsize=max(1, max_in_flight))
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="silver-write-behind", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is _DONE:
+                    return
+                if self._error is not None:
+                    continue  # drain after a failure, commit nothing further
+
+                source_file, chunk_index, rows, chunk_size = job
+                self.writer.write_silver_chunk(source_file, chunk_index, rows)
+                self.checkpoint.save(Checkpoint(file=source_file, chunk_index=chunk_index + 1, chunk_size=chunk_size))
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, source_file: str, chunk_index: int, rows: list, chunk_size: int = None):
+        self._raise_if_failed()
+        self._queue.put((source_file, chunk_index, rows, chunk_size))
+
+    def flush(self):
+        """
+        Blocks until every submitted chunk is written and committed.
+        """
+        self._queue.join()
+        self._raise_if_failed()
+
+    def close(self):
+        self._queue.put(_DONE)
+        self._thread.join()
+        self._raise_if_failed()
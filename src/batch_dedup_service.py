@@ -0,0 +1,145 @@
+import csv
+import heapq
+import os
+import shutil
+from itertools import groupby
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+from src.dedup_service import DedupService
+
+
+class ExternalSorter:
+    """
+    Sorts tuples of strings and ints in bounded memory: up to buffer_rows
+    items are sorted in memory and written as a run file, runs are
+    k-way merged on read.
+    """
+
+    def __init__(self, work_dir: str, name: str, types: Tuple[type, ...], buffer_rows: int):
+        self.work_dir = work_dir
+        self.name = name
+        self.types = types
+        self.buffer_rows = max(1, buffer_rows)
+        self._buffer = []
+        self._runs = []
+
+    def add(self, item: tuple):
+        self._buffer.append(item)
+        if len(self._buffer) >= self.buffer_rows:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+
+        self._buffer.sort()
+        path = os.path.join(self.work_dir, f"{self.name}_{len(self._runs):05d}.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(self._buffer)
+        self._runs.append(path)
+        self._buffer = []
+
+    def _read_run(self, path: str) -> Iterator[tuple]:
+        types = self.types
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                yield tuple(t(v) for t, v in zip(types, row))
+
+    def sorted(self) -> Iterator[tuple]:
+        if not self._runs:
+            # everything fit in memory: no run files
+            self._buffer.sort()
+            yield from self._buffer
+            return
+
+        self._flush()
+        yield from heapq.merge(*(self._read_run(path) for path in self._runs))
+
+
+class SortMergeDedup:
+    """
+    Batch dedup over a set of Silver files, replacing one store lookup per
+    row with sorts and a merge:
+
+    1. (order_id, file_index, row_index) of every row is external-sorted.
+    2. The sorted stream is merged against the store's keys, read in key
+       order (anti-join); per order_id the first position wins.
+    3. Surviving positions are sorted back into file order.
+    4. New keys are bulk-loaded into the store, already in key order.
+
+    Keeps exactly the rows per-row lookups would keep, in the same order.
+    """
+
+    def __init__(self, dedup: DedupService, work_dir: str, buffer_rows: int = 1_000_000):
+        self.dedup = dedup
+        self.work_dir = work_dir
+        self.buffer_rows = buffer_rows
+        self.rows_read = 0
+        self.duplicates = 0
+
+    def run(
+        self,
+        files: List[str],
+        read_order_ids: Callable[[str], Iterable[str]]
+    ) -> Iterator[Tuple[int, List[int]]]:
+        """
+        Yields (file_index, kept row indexes) for every file, in order.
+        New keys are in the store once the generator is exhausted.
+        """
+        if os.path.exists(self.work_dir):
+            shutil.rmtree(self.work_dir)
+        os.makedirs(self.work_dir)
+
+        try:
+            positions = ExternalSorter(self.work_dir, "ids", (str, int, int), self.buffer_rows)
+            for file_index, path in enumerate(files):
+                for row_index, order_id in enumerate(read_order_ids(path)):
+                    positions.add((order_id, file_index, row_index))
+                    self.rows_read += 1
+
+            survivors = ExternalSorter(self.work_dir, "kept", (int, int), self.buffer_rows)
+            new_keys_path = os.path.join(self.work_dir, "new_keys.csv")
+            with open(new_keys_path, "w", encoding="utf-8", newline="") as f:
+                new_keys = csv.writer(f)
+                for order_id, file_index, row_index in self._anti_join(positions.sorted()):
+                    survivors.add((file_index, row_index))
+                    new_keys.writerow((order_id,))
+
+            kept = groupby(survivors.sorted(), key=lambda item: item[0])
+            current = next(kept, None)
+            for file_index in range(len(files)):
+                rows = []
+                if current is not None and current[0] == file_index:
+                    rows = [row_index for _, row_index in current[1]]
+                    current = next(kept, None)
+                yield file_index, rows
+
+            with open(new_keys_path, "r", encoding="utf-8", newline="") as f:
+                self.dedup.mark_seen_many(row[0] for row in csv.reader(f))
+        finally:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _anti_join(self, positions: Iterator[tuple]) -> Iterator[tuple]:
+        """
+        First position of each order_id not already in the store. Both
+        inputs are in code point order (SQLite BINARY collation on UTF-8
+        sorts the same way).
+        """
+        stored = self.dedup.iter_sorted()
+        stored_key = next(stored, None)
+
+        try:
+            for order_id, group in groupby(positions, key=lambda item: item[0]):
+                first = next(group)
+                self.duplicates += sum(1 for _ in group)
+
+                while stored_key is not None and stored_key < order_id:
+                    stored_key = next(stored, None)
+                if stored_key == order_id:
+                    self.duplicates += 1
+                    continue
+
+                yield first
+        finally:
+            # releases the read lock before the bulk load writes
+            stored.close()
@@ -0,0 +1,373 @@
+import csv
+import hashlib
+import io
+import json
+import mmap
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.checkpoint_service import Checkpoint, CheckpointService
+from src.clean_transform_service import CleanTransformService
+from src.dedup_service import DedupService, drop_duplicates, store_path
+from src.metrics_service import MetricsService
+from src.profiling_service import ChunkProfiler
+from src.schema_service import BronzeSchema
+from src.tuning_service import rss_bytes
+from src.writer_service import WriterService
+
+
+SCAN_BLOCK = 16 * 1024 * 1024
+
+# bytes before the end of a split file fingerprinted to tell an append from a rewrite
+TAIL_BYTES = 64 * 1024
+
+
+# -------------------------
+# Splitting
+# -------------------------
+def count_quotes(path: str, start: int, end: int) -> int:
+    """
+    Number of '"' bytes in [start, end). Runs in worker processes.
+    """
+    count = 0
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for pos in range(start, end, SCAN_BLOCK):
+            count += mm[pos:min(pos + SCAN_BLOCK, end)].count(b'"')
+    return count
+
+
+def next_record_boundary(mm, pos: int, in_quotes: bool) -> int:
+    """
+    Offset just past the first newline at or after pos that is outside a
+    quoted field, given the quote state at pos. Escaped quotes ("") flip
+    the state twice, so parity is enough (RFC 4180 quoting).
+    """
+    size = len(mm)
+    while pos < size:
+        newline = mm.find(b"\n", pos)
+        if newline == -1:
+            return size
+
+        quote = mm.find(b'"', pos, newline)
+        if quote == -1:
+            if not in_quotes:
+                return newline + 1
+            pos = newline + 1  # newline inside a quoted field
+        else:
+            in_quotes = not in_quotes
+            pos = quote + 1
+
+    return size
+
+
+def split_byte_ranges(
+    path: str,
+    target_ranges: int,
+    pool=None,
+    start: Optional[int] = None
+) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Returns (header, ranges): the file body (from start, a record boundary,
+    when given) split into about target_ranges [start, end) byte ranges,
+    each starting and ending on a record boundary.
+
+    Quote parity at each raw cut point comes from per-segment quote counts
+    (computed on pool when given), so only short forward scans happen here.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        header_end = next_record_boundary(mm, 0, False)
+        header = next(csv.reader(io.StringIO(mm[:header_end].decode("utf-8"))), [])
+        size = len(mm)
+        body_start = header_end if start is None else start
+
+        body = size - body_start
+        cuts = [body_start + body * k // target_ranges for k in range(1, target_ranges)]
+        segments = list(zip([body_start] + cuts, cuts))
+
+        mapper = pool.map if pool is not None else map
+        counts = list(mapper(count_quotes, [path] * len(segments), *zip(*segments))) if segments else []
+
+        boundaries = [body_start]
+        quotes = 0
+        for cut, count in zip(cuts, counts):
+            quotes += count
+            boundary = next_record_boundary(mm, cut, quotes % 2 == 1)
+            if boundary > boundaries[-1] and boundary < size:
+                boundaries.append(boundary)
+        boundaries.append(size)
+
+    ranges = [(a, b) for a, b in zip(boundaries, boundaries[1:]) if b > a]
+    return header, ranges
+
+
+# -------------------------
+# Plan
+# -------------------------
+class RangePlan:
+    """
+    Persisted split of one Bronze file, so a resumed run reuses the same
+    ranges (and therefore the same Silver file names). Ranges are recorded
+    as done by the parent process only; progress inside a range lives in
+    the range's own checkpoint.
+
+    When the file changes, the plan is extended rather than replaced: the
+    earlier ranges stay (done or not) and the new ones are numbered after
+    them, so they get fresh range checkpoints and Silver chunk names that
+    sort after the earlier ones (past the Silver checkpoint).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        source: str,
+        size: int,
+        mtime_ns: int,
+        header: List[str],
+        ranges,
+        done=None,
+        tail_sha1: Optional[str] = None
+    ):
+        self.path = path
+        self.source = source
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.header = header
+        self.ranges = [tuple(r) for r in ranges]
+        self.done = set(done or [])
+        self.tail_sha1 = tail_sha1
+
+    @staticmethod
+    def plan_path(range_dir: str, source: str) -> str:
+        return os.path.join(range_dir, f"{_base(source)}.plan.json")
+
+    @staticmethod
+    def _read(range_dir: str, source: str) -> Optional["RangePlan"]:
+        path = RangePlan.plan_path(range_dir, source)
+        if not os.path.exists(path):
+            return None
+
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        return RangePlan(
+            path, source, data["size"], data["mtime_ns"], data["header"], data["ranges"], data["done"],
+            data.get("tail_sha1")
+        )
+
+    @staticmethod
+    def load(range_dir: str, source: str) -> Optional["RangePlan"]:
+        """
+        Returns the saved plan, or None if there is none or the source
+        file has changed since it was made.
+        """
+        plan = RangePlan._read(range_dir, source)
+        if plan is None:
+            return None
+
+        stat = os.stat(source)
+        if plan.size != stat.st_size or plan.mtime_ns != stat.st_mtime_ns:
+            return None
+        return plan
+
+    @staticmethod
+    def create(
+        range_dir: str,
+        source: str,
+        target_ranges: int,
+        pool=None,
+        range_bytes: Optional[int] = None
+    ) -> "RangePlan":
+        """
+        Splits source into at least target_ranges ranges (and ranges of
+        about range_bytes, when given). With an earlier plan for a changed
+        source, only the appended bytes are split if the file just grew;
+        otherwise the whole body is split again and Phase 2 dedup drops the
+        rows seen before.
+        """
+        os.makedirs(range_dir, exist_ok=True)
+        stat = os.stat(source)
+        previous = RangePlan._read(range_dir, source)
+
+        start = None
+        if previous is not None and previous.appended_to(source, stat.st_size):
+            start = previous.size
+
+        if range_bytes:
+            span = stat.st_size - (start or 0)
+            target_ranges = max(target_ranges, -(-span // range_bytes))
+        header, ranges = split_byte_ranges(source, target_ranges, pool, start)
+
+        plan = RangePlan(
+            RangePlan.plan_path(range_dir, source), source, stat.st_size, stat.st_mtime_ns, header,
+            (previous.ranges if previous else []) + ranges,
+            previous.done if previous else None,
+            _tail_sha1(source, stat.st_size)
+        )
+        # leftovers from a plan that was deleted by hand must not resume the new ranges
+        first_new = len(previous.ranges) if previous else 0
+        for index in range(first_new, len(plan.ranges)):
+            if os.path.exists(plan.checkpoint_path(index)):
+                os.remove(plan.checkpoint_path(index))
+
+        plan.save()
+        return plan
+
+    def appended_to(self, source: str, size: int) -> bool:
+        """
+        Whether source is this plan's file with records appended: larger,
+        and the bytes it ended with (on a newline) unchanged.
+        """
+        if size <= self.size or not self.tail_sha1:
+            return False
+
+        with open(source, "rb") as f:
+            f.seek(self.size - 1)
+            if f.read(1) != b"\n":
+                return False
+        return _tail_sha1(source, self.size) == self.tail_sha1
+
+    def is_complete(self) -> bool:
+        return len(self.done) == len(self.ranges)
+
+    def mark_done(self, index: int):
+        self.done.add(index)
+        self.save()
+
+    def checkpoint_path(self, index: int) -> str:
+        return os.path.join(os.path.dirname(self.path), f"{_base(self.source)}_r{index:04d}.json")
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "source": self.source,
+                "size": self.size,
+                "mtime_ns": self.mtime_ns,
+                "header": self.header,
+                "ranges": self.ranges,
+                "done": sorted(self.done),
+                "tail_sha1": self.tail_sha1,
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+def _base(source: str) -> str:
+    return os.path.basename(source).replace(".csv", "")
+
+
+def _tail_sha1(source: str, size: int) -> str:
+    with open(source, "rb") as f:
+        f.seek(max(0, size - TAIL_BYTES))
+        return hashlib.sha1(f.read(size - max(0, size - TAIL_BYTES))).hexdigest()
+
+
+# -------------------------
+# Worker
+# -------------------------
+class MmapRangeReader(io.RawIOBase):
+    """
+    Read-only stream over bytes [start, end) of a memory-mapped file.
+    """
+
+    def __init__(self, path: str, start: int, end: int):
+        self._fh = open(path, "rb")
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._pos = start
+        self._end = end
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = min(len(buffer), self._end - self._pos)
+        if n <= 0:
+            return 0
+        buffer[:n] = self._mm[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def close(self):
+        if self.closed:
+            return
+        self._mm.close()
+        self._fh.close()
+        super().close()
+
+
+def clean_byte_range(task: Dict) -> Tuple[int, MetricsService]:
+    """
+    Parses and cleans one byte range, writing Silver chunks named
+    <base>_r<range>_chunk_<n>.csv. Resumes after the last chunk recorded
+    in the range checkpoint. Runs in worker processes; with task["profiler"]
+    (the parent's ChunkProfiler) each range samples its own chunks.
+    """
+    index = task["index"]
+    source = task["source"]
+    profiler = task.get("profiler") or ChunkProfiler(task["output_dir"])
+
+    metrics = MetricsService()
+    cleaner = CleanTransformService(task["cache_size"])
+    writer = WriterService(task["output_dir"])
+    checkpoint = CheckpointService(task["checkpoint_path"])
+    resume_at = checkpoint.get().chunk_index
+    # a resumed range keeps the chunk size it was started with
+    chunk_size = checkpoint.get().chunk_size or task["chunk_size"]
+    dedup = DedupService(store_path(task["output_dir"])) if task.get("early_dedup") else None
+
+    raw = MmapRangeReader(source, task["start"], task["end"])
+    with io.TextIOWrapper(io.BufferedReader(raw), encoding="utf-8", newline="") as f:
+        if task["schema_file"]:
+            parse = BronzeSchema.load(task["schema_file"]).compile(task["header"], source)
+            records = (parse(r) for r in csv.reader(f) if r)
+            clean = cleaner.process_record
+        else:
+            records = csv.DictReader(f, fieldnames=task["header"])
+            clean = cleaner.process_row
+
+        chunk_index = 0
+        chunk = []
+
+        def flush():
+            start = time.perf_counter()
+            profile = profiler.start_chunk(f"bronze_{_base(source)}_r{index:04d}_c{chunk_index}")
+            silver_rows = []
+            with profiler.stage(profile, "clean"), metrics.timed("clean"):
+                for record in chunk:
+                    metrics.increment_clean_read()
+                    result = clean(record)
+                    if not result["is_valid"]:
+                        metrics.increment_rejected(result["errors"])
+                        continue
+                    metrics.increment_success()
+                    silver_rows.append(result["clean_row"])
+
+            if dedup is not None:
+                with profiler.stage(profile, "dedup"):
+                    silver_rows, dropped = drop_duplicates(silver_rows, dedup)
+                metrics.increment_deduplicated_early(dropped)
+
+            with profiler.stage(profile, "silver_write"), metrics.timed("silver_write"):
+                writer.write_silver_chunk(source, chunk_index, silver_rows, range_index=index)
+            checkpoint.save(Checkpoint(file=source, chunk_index=chunk_index + 1, chunk_size=chunk_size))
+            metrics.record_chunk(len(chunk), time.perf_counter() - start, rss_bytes())
+            profiler.finish_chunk(profile, metrics)
+
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                if chunk_index >= resume_at:
+                    flush()
+                chunk = []
+                chunk_index += 1
+
+        if chunk and chunk_index >= resume_at:
+            flush()
+
+    checkpoint.close()
+    if dedup is not None:
+        dedup.close()
+    metrics.record_cache_stats(cleaner.cache_stats())
+    return index, metrics
@@ -1,49 +1,125 @@
 import json
 import os
+import time
 from typing import Optional
 
 
 class Checkpoint:
-    def __init__(self, file: Optional[str] = None, chunk_index: int = 0):
+    def __init__(self, file: Optional[str] = None, chunk_index: int = 0, chunk_size: Optional[int] = None):
         self.file = file
         self.chunk_index = chunk_index
+        # Bronze: chunk size the file was started with, so a resume skips
+        # the same rows even if chunk_size changed since (auto-tuning)
+        self.chunk_size = chunk_size
 
     def to_dict(self):
-        return {
+        data = {
             "file": self.file,
             "chunk_index": self.chunk_index
         }
+        if self.chunk_size is not None:
+            data["chunk_size"] = self.chunk_size
+        return data
 
     @staticmethod
     def from_dict(data):
         return Checkpoint(
             file=data.get("file"),
-            chunk_index=data.get("chunk_index", 0)
+            chunk_index=data.get("chunk_index", 0),
+            chunk_size=data.get("chunk_size")
         )
 
 
 class CheckpointService:
     """
     One checkpoint service per layer (bronze / silver)
+
+    Modes:
+      - snapshot: every save rewrites the checkpoint file (temp + fsync + os.replace)
+      - wal: every save appends a record to <path>.wal; the log is fsynced once
+        per commit interval (group commit) and compacted into the snapshot on close()
+
+    Recovery in both modes returns the latest record that reached disk.
+    Losing the records after the last commit only means re-processing
+    chunks, which is idempotent.
+
+    read_only loads the checkpoint without repairing a torn log (--dry-run).
     """
 
-    def __init__(self, path: str, enabled: bool = True):
+    def __init__(
+        self,
+        path: str,
+        enabled: bool = True,
+        mode: str = "snapshot",
+        commit_every: int = 1,
+        commit_interval: float = 0.0,
+        read_only: bool = False
+    ):
         self.path = path
         self.enabled = enabled
+        self.read_only = read_only
+        self.mode = mode
+        self.commit_every = max(1, commit_every)
+        self.commit_interval = commit_interval
+
+        self.wal_path = path + ".wal"
+        self._wal = None
+        self._pending = 0
+        self._last_commit = time.monotonic()
+        self._wal_recovered = False
+
         self._checkpoint = self._load() if enabled else Checkpoint()
 
     def _load(self) -> Checkpoint:
-        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
-            return Checkpoint()
+        checkpoint = Checkpoint()
+
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "r") as f:
+                checkpoint = Checkpoint.from_dict(json.load(f))
+
+        if os.path.exists(self.wal_path):
+            checkpoint = self._replay_wal(checkpoint)
+            self._wal_recovered = True
 
-        with open(self.path, "r") as f:
-            data = json.load(f)
-            return Checkpoint.from_dict(data)
+        return checkpoint
 
+    def _replay_wal(self, checkpoint: Checkpoint) -> Checkpoint:
+        with open(self.wal_path, "rb") as f:
+            data = f.read()
+
+        # a torn trailing record is dropped, so the next append starts on a clean line
+        complete = data[:data.rfind(b"\n") + 1]
+        if len(complete) != len(data) and not self.read_only:
+            with open(self.wal_path, "r+b") as f:
+                f.truncate(len(complete))
+
+        for line in complete.splitlines():
+            try:
+                checkpoint = Checkpoint.from_dict(json.loads(line))
+            except ValueError:
+                continue
+
+        return checkpoint
+
+    # -------------------------
+    # Save
+    # -------------------------
     def save(self, checkpoint: Checkpoint):
         if not self.enabled:
             return
 
+        if self.mode == "wal":
+            self._append(checkpoint)
+        else:
+            self._write_snapshot(checkpoint)
+            if self._wal_recovered:
+                # log left by an earlier wal-mode run is now superseded
+                os.remove(self.wal_path)
+                self._wal_recovered = False
+
+        self._checkpoint = checkpoint
+
+    def _write_snapshot(self, checkpoint: Checkpoint):
         tmp_path = self.path + ".tmp"
 
         with open(tmp_path, "w") as f:
@@ -51,15 +127,65 @@ class CheckpointService:
             f.flush()
             os.fsync(f.fileno())
 
-        if os.path.exists(self.path):
-            os.remove(self.path)
+        # atomic swap: a valid checkpoint is on disk at every instant
+        os.replace(tmp_path, self.path)
 
-        os.rename(tmp_path, self.path)
-        self._checkpoint = checkpoint
+    def _append(self, checkpoint: Checkpoint):
+        if self._wal is None:
+            self._wal = open(self.wal_path, "a", encoding="utf-8")
+
+        self._wal.write(json.dumps(checkpoint.to_dict()) + "\n")
+        self._wal.flush()
+        self._pending += 1
+
+        due_by_count = self._pending >= self.commit_every
+        due_by_time = (
+            self.commit_interval > 0
+            and time.monotonic() - self._last_commit >= self.commit_interval
+        )
+        if due_by_count or due_by_time:
+            self.commit()
+
+    def commit(self):
+        """
+        Makes every appended record durable (one fsync for the whole group).
+        """
+        if self._wal is None or self._pending == 0:
+            return
+
+        os.fsync(self._wal.fileno())
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def close(self):
+        """
+        Clean shutdown: compacts the log into the snapshot file.
+        """
+        if not self.enabled or self.mode != "wal":
+            return
+
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+
+        if os.path.exists(self.wal_path):
+            self._write_snapshot(self._checkpoint)
+            os.remove(self.wal_path)
+        self._pending = 0
+        self._wal_recovered = False
 
     def get(self) -> Checkpoint:
         return self._checkpoint
 
     def clear(self):
-        if self.enabled and os.path.exists(self.path):
-            os.remove(self.path)
\ No newline at end of file
+        if not self.enabled:
+            return
+
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+
+        for path in (self.path, self.wal_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._wal_recovered = False
@@ -1,7 +1,10 @@
 from datetime import datetime
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
 import re
 
+from src.schema_service import RECORD_FIELDS
+
 
 DATE_FORMATS = [
     "%Y-%m-%d",
@@ -32,12 +35,57 @@ CATEGORY_MAP = {
 }
 
 
+PRODUCT_KEY_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_product(raw: str) -> Tuple[str, str, bool]:
+    """
+    Returns (product_name, product_key, defaulted).
+    """
+    product = raw.strip().lower()
+    if not product:
+        return "unknown_product", "unknown_product", True
+    return product, PRODUCT_KEY_RE.sub("_", product).strip("_"), False
+
+
+def normalize_category(raw: str) -> Tuple[str, bool]:
+    category = CATEGORY_MAP.get(raw.strip().lower(), "unknown")
+    return category, category == "unknown"
+
+
+def normalize_region(raw: str) -> Tuple[str, bool]:
+    region = raw.strip().lower()
+    return REGION_MAP.get(region, "north"), region not in REGION_MAP
+
+
 class CleanTransformService:
     """
     Cleans, standardizes, and applies DQ rules.
     Rows missing critical economic fields are dropped.
+
+    Product / category / region normalization is memoized per raw value
+    (bounded LRU, kept for the lifetime of the service, so across chunks):
+    the vocabulary is small and heavily repeated.
     """
 
+    def __init__(self, cache_size: int = 65536):
+        self._product = lru_cache(maxsize=cache_size)(normalize_product)
+        self._category = lru_cache(maxsize=cache_size)(normalize_category)
+        self._region = lru_cache(maxsize=cache_size)(normalize_region)
+
+    def cache_stats(self) -> Dict[str, Tuple[int, int]]:
+        """
+        (hits, misses) per normalization cache.
+        """
+        return {
+            name: (info.hits, info.misses)
+            for name, info in (
+                ("product", self._product.cache_info()),
+                ("category", self._category.cache_info()),
+                ("region", self._region.cache_info()),
+            )
+        }
+
     def normalize_silver_row(row: dict) -> dict:
         """
         Re-casts Silver CSV row fields to correct types.
@@ -49,13 +97,31 @@ class CleanTransformService:
         return row
 
     def process_row(self, row: Dict[str, str]) -> Dict[str, Any]:
+        return self.process_record(tuple(map(row.get, RECORD_FIELDS)))
+
+    def process_record(self, record: tuple) -> Dict[str, Any]:
+        """
+        record: Bronze values in RECORD_FIELDS order (see schema_service);
+        typed fields may already be converted, None where they did not parse.
+        """
+        (
+            order_id,
+            product_name,
+            category,
+            quantity,
+            unit_price,
+            discount_percent,
+            region,
+            sale_date_raw,
+            email,
+        ) = record
+
         errors: List[str] = []
         clean: Dict[str, Any] = {}
 
         # -------------------
         # order_id (HARD FAIL)
         # -------------------
-        order_id = row.get("order_id")
         if not order_id:
             return self._reject("missing_order_id")
         clean["order_id"] = order_id
@@ -64,7 +130,7 @@ class CleanTransformService:
         # quantity (HARD FAIL)
         # -------------------
         try:
-            qty = int(row.get("quantity"))
+            qty = int(quantity)
             if qty <= 0:
                 raise ValueError
             clean["quantity"] = qty
@@ -75,7 +141,7 @@ class CleanTransformService:
         # unit_price (HARD FAIL)
         # -------------------
         try:
-            price = float(row.get("unit_price"))
+            price = float(unit_price)
             if price <= 0:
                 raise ValueError
             clean["unit_price"] = round(price, 2)
@@ -85,22 +151,18 @@ class CleanTransformService:
         # -------------------
         # product_name (SOFT FAIL)
         # -------------------
-        raw_product = (row.get("product_name") or "").strip().lower()
-        if not raw_product:
-            raw_product = "unknown_product"
+        product_name, product_key, defaulted = self._product(product_name or "")
+        if defaulted:
             errors.append("default_product_name")
 
-        clean["product_name"] = raw_product
-        clean["product_key"] = re.sub(
-            r"[^a-z0-9]+", "_", raw_product
-        ).strip("_")
+        clean["product_name"] = product_name
+        clean["product_key"] = product_key
 
         # -------------------
         # category (SOFT FAIL)
         # -------------------
-        raw_category = (row.get("category") or "").strip().lower()
-        category = CATEGORY_MAP.get(raw_category, "unknown")
-        if category == "unknown":
+        category, defaulted = self._category(category or "")
+        if defaulted:
             errors.append("default_category")
         clean["category"] = category
 
@@ -108,7 +170,7 @@ class CleanTransformService:
         # discount_percent (SOFT FAIL)
         # -------------------
         try:
-            discount = float(row.get("discount_percent"))
+            discount = float(discount_percent)
             discount = max(0.0, min(discount, 1.0))
         except Exception:
             discount = 0.0
@@ -119,16 +181,14 @@ class CleanTransformService:
         # -------------------
         # region (SOFT FAIL)
         # -------------------
-        raw_region = (row.get("region") or "").strip().lower()
-        region = REGION_MAP.get(raw_region, "north")
-        if raw_region not in REGION_MAP:
+        region, defaulted = self._region(region or "")
+        if defaulted:
             errors.append("default_region")
         clean["region"] = region
 
         # -------------------
         # sale_date (SOFT FAIL, CANONICAL)
         # -------------------
-        sale_date_raw = row.get("sale_date")
         sale_date_obj = None
 
         if sale_date_raw:
@@ -150,7 +210,6 @@ class CleanTransformService:
         # -------------------
         # customer_email (OPTIONAL)
         # -------------------
-        email = row.get("customer_email")
         if email and "@" not in email:
             email = None
             errors.append("invalid_email")
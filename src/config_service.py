@@ -2,6 +2,10 @@ import configparser
 import os
 
 
+# starting point for chunk_size = auto before any tuning history exists
+DEFAULT_CHUNK_SIZE = 50_000
+
+
 class ConfigError(Exception):
     """
     Raised when configuration is invalid or incomplete.
@@ -34,6 +38,13 @@ class Config:
         self._load_output()
         self._load_memory()
         self._load_anomaly()
+        self._load_aggregation()
+        self._load_dedup()
+        self._load_parallel()
+        self._load_io()
+        self._load_watch()
+        self._load_coordination()
+        self._load_metrics()
 
     # -------------------------
     # Section loaders
@@ -42,7 +53,11 @@ class Config:
         section = "PIPELINE"
         self._require(section, ["chunk_size", "max_rows", "enable_checkpoint", "checkpoint_file"])
 
-        self.chunk_size = self._get_int(section, "chunk_size")
+        # auto: picked at startup from the tuning profile (see TuningService)
+        self.chunk_size = self._get_int_or_auto(section, "chunk_size")
+        self.auto_chunk_size = self.chunk_size is None
+        if self.auto_chunk_size:
+            self.chunk_size = DEFAULT_CHUNK_SIZE
         self.max_rows = self._get_int(section, "max_rows")
         self.enable_checkpoint = self._get_bool(section, "enable_checkpoint")
         self.checkpoint_file = self._get_str(section, "checkpoint_file")
@@ -54,6 +69,8 @@ class Config:
         self.input_type = self._get_str(section, "input_type").lower()
         self.input_path = self._get_str(section, "input_path")
         self.file_pattern = self._get_str(section, "file_pattern", default=None)
+        # optional: Bronze rows are parsed positionally against this schema
+        self.schema_file = self._get_str(section, "schema_file", default=None)
 
         if self.input_type not in ("file", "directory"):
             raise ConfigError(
@@ -83,7 +100,35 @@ class Config:
                 key="format"
             )
 
-        os.makedirs(self.output_dir, exist_ok=True)
+        # ORC writer options (format = orc)
+        self.orc_stripe_size = self._get_int(section, "orc_stripe_size", default=64 * 1024 * 1024)
+        self.orc_compression = self._get_str(section, "orc_compression", default="zlib").lower()
+
+        if self.orc_compression not in ("none", "zlib", "snappy", "lz4", "zstd"):
+            raise ConfigError(
+                "orc_compression must be one of none, zlib, snappy, lz4, zstd",
+                section=section,
+                key="orc_compression"
+            )
+
+        # Streaming Gold writer options
+        self.row_group_size = self._get_int(section, "row_group_size", default=128 * 1024)
+        self.parquet_compression = self._get_str(section, "parquet_compression", default="snappy").lower()
+        self.use_dictionary = self._get_bool(section, "use_dictionary", default=True)
+
+        if self.row_group_size < 1:
+            raise ConfigError(
+                "row_group_size must be >= 1",
+                section=section,
+                key="row_group_size"
+            )
+
+        if self.parquet_compression not in ("none", "snappy", "gzip", "brotli", "lz4", "zstd"):
+            raise ConfigError(
+                "parquet_compression must be one of none, snappy, gzip, brotli, lz4, zstd",
+                section=section,
+                key="parquet_compression"
+            )
 
     def _load_checkpoints(self):
         section = "CHECKPOINTS"
@@ -92,6 +137,18 @@ class Config:
         self.bronze_checkpoint = self._get_str(section, "bronze_checkpoint")
         self.silver_checkpoint = self._get_str(section, "silver_checkpoint")
 
+        # snapshot: rewrite per chunk | wal: append + group commit
+        self.checkpoint_mode = self._get_str(section, "mode", default="snapshot").lower()
+        self.checkpoint_commit_every = self._get_int(section, "commit_every_chunks", default=1)
+        self.checkpoint_commit_interval = self._get_float(section, "commit_interval_seconds", default=0.0)
+
+        if self.checkpoint_mode not in ("snapshot", "wal"):
+            raise ConfigError(
+                "checkpoint mode must be 'snapshot' or 'wal'",
+                section=section,
+                key="mode"
+            )
+
     def _load_memory(self):
         section = "MEMORY"
         self._require(section, ["max_chunk_mb", "flush_interval"])
@@ -99,6 +156,27 @@ class Config:
         self.max_chunk_mb = self._get_int(section, "max_chunk_mb")
         self.flush_interval = self._get_int(section, "flush_interval")
 
+        # aggregation state (products) estimated above this spills to disk; 0 never spills.
+        # Checked every flush_interval rows.
+        self.max_aggregation_mb = self._get_int(section, "max_aggregation_mb", default=1024)
+
+        if self.max_aggregation_mb < 0:
+            raise ConfigError(
+                "max_aggregation_mb must be >= 0",
+                section=section,
+                key="max_aggregation_mb"
+            )
+
+        # raw value -> normalized product / category / region memo entries
+        self.normalize_cache_size = self._get_int(section, "normalize_cache_size", default=65536)
+
+        if self.normalize_cache_size < 0:
+            raise ConfigError(
+                "normalize_cache_size must be >= 0",
+                section=section,
+                key="normalize_cache_size"
+            )
+
     def _load_anomaly(self):
         section = "ANOMALY"
         self._require(section, ["top_n", "high_revenue_threshold"])
@@ -106,6 +184,149 @@ class Config:
         self.anomaly_top_n = self._get_int(section, "top_n")
         self.high_revenue_threshold = self._get_float(section, "high_revenue_threshold")
 
+    def _load_aggregation(self):
+        section = "AGGREGATION"
+        # Optional section: Silver → Gold aggregates whole Arrow tables per file
+        # (false: row by row, the reference path)
+
+        self.vectorized_aggregation = self._get_bool(section, "vectorized", default=True)
+
+    def _load_dedup(self):
+        section = "DEDUP"
+        # Optional section. lookup: one store lookup per Silver row.
+        # sort_merge: external sort + merge against the store (backfills)
+
+        self.dedup_strategy = self._get_str(section, "strategy", default="lookup").lower()
+        self.dedup_sort_buffer_rows = self._get_int(section, "sort_buffer_rows", default=1_000_000)
+        # Phase 1 drops in-chunk and already-stored duplicates before Silver
+        self.dedup_early = self._get_bool(section, "early", default=False)
+
+        if self.dedup_strategy not in ("lookup", "sort_merge"):
+            raise ConfigError(
+                "strategy must be 'lookup' or 'sort_merge'",
+                section=section,
+                key="strategy"
+            )
+
+        # keys first seen longer ago are dropped by --compact-dedup (0 keeps all)
+        self.dedup_retention_days = self._get_float(section, "retention_days", default=0.0)
+        self.dedup_journal_mode = self._get_str(section, "journal_mode", default="delete").lower()
+
+        if self.dedup_retention_days < 0:
+            raise ConfigError(
+                "retention_days must be >= 0",
+                section=section,
+                key="retention_days"
+            )
+
+        if self.dedup_journal_mode not in ("wal", "delete"):
+            raise ConfigError(
+                "journal_mode must be 'wal' or 'delete'",
+                section=section,
+                key="journal_mode"
+            )
+
+        if self.dedup_sort_buffer_rows < 1:
+            raise ConfigError(
+                "sort_buffer_rows must be >= 1",
+                section=section,
+                key="sort_buffer_rows"
+            )
+
+    def _load_parallel(self):
+        section = "PARALLEL"
+        # Optional section: defaults to single-process execution
+
+        self.workers = self._get_int_or_auto(section, "workers", default=1)
+        self.auto_workers = self.workers is None
+        if self.auto_workers:
+            self.workers = 1
+
+        if self.workers < 1:
+            raise ConfigError(
+                "workers must be >= 1",
+                section=section,
+                key="workers"
+            )
+
+        # input_type = directory with workers > 1: Bronze chunks reach the cleaning
+        # workers as Arrow IPC files here (e.g. /dev/shm/pipeline_handoff)
+        self.handoff_dir = self._get_str(section, "handoff_dir", default=os.path.join(self.output_dir, "handoff"))
+
+        # input_type = file with workers > 1: target size of one byte range
+        self.range_mb = self._get_int(section, "range_mb", default=256)
+
+        if self.range_mb < 1:
+            raise ConfigError(
+                "range_mb must be >= 1",
+                section=section,
+                key="range_mb"
+            )
+
+    def _load_io(self):
+        section = "IO"
+        # Optional section: 0 disables the background thread
+
+        self.prefetch_chunks = self._get_int(section, "prefetch_chunks", default=2)
+        self.write_behind_chunks = self._get_int(section, "write_behind_chunks", default=2)
+
+        for key in ("prefetch_chunks", "write_behind_chunks"):
+            if getattr(self, key) < 0:
+                raise ConfigError(
+                    f"{key} must be >= 0",
+                    section=section,
+                    key=key
+                )
+
+    def _load_watch(self):
+        section = "WATCH"
+        # Optional section: used only with --watch
+
+        self.watch_poll_seconds = self._get_float(section, "poll_interval_seconds", default=30.0)
+        self.watch_gold_refresh_seconds = self._get_float(section, "gold_refresh_seconds", default=300.0)
+
+        if self.watch_poll_seconds <= 0:
+            raise ConfigError(
+                "poll_interval_seconds must be > 0",
+                section=section,
+                key="poll_interval_seconds"
+            )
+
+    def _load_coordination(self):
+        section = "COORDINATION"
+        # Optional section: used only with --distributed
+
+        self.lease_seconds = self._get_float(section, "lease_seconds", default=60.0)
+
+        if self.lease_seconds <= 0:
+            raise ConfigError(
+                "lease_seconds must be > 0",
+                section=section,
+                key="lease_seconds"
+            )
+
+    def _load_metrics(self):
+        section = "METRICS"
+        # Optional section: progress is logged every progress_interval_seconds;
+        # with textfile_path set, a Prometheus textfile is rewritten as often
+
+        self.progress_interval = self._get_float(section, "progress_interval_seconds", default=30.0)
+        self.metrics_textfile = self._get_str(section, "textfile_path", default=None)
+
+        if self.progress_interval <= 0:
+            raise ConfigError(
+                "progress_interval_seconds must be > 0",
+                section=section,
+                key="progress_interval_seconds"
+            )
+
+        if self.metrics_textfile and not self.metrics_textfile.endswith(".prom"):
+            raise ConfigError(
+                "textfile_path must end in .prom (node_exporter textfile collector)",
+                section=section,
+                key="textfile_path"
+            )
+
     # -------------------------
     # Helpers
     # -------------------------
@@ -124,9 +345,11 @@ class Config:
     def _get_str(self, section, key, default=None):
         return self._parser.get(section, key, fallback=default)
 
-    def _get_int(self, section, key):
+    def _get_int(self, section, key, default=None):
         try:
-            return self._parser.getint(section, key)
+            if default is None:
+                return self._parser.getint(section, key)
+            return self._parser.getint(section, key, fallback=default)
         except ValueError:
             raise ConfigError(
                 "Invalid integer value",
@@ -134,9 +357,20 @@ class Config:
                 key=key
             )
 
-    def _get_float(self, section, key):
+    def _get_int_or_auto(self, section, key, default=None):
+        """
+        None for "auto".
+        """
+        value = self._parser.get(section, key, fallback=None)
+        if value is not None and value.strip().lower() == "auto":
+            return None
+        return self._get_int(section, key, default)
+
+    def _get_float(self, section, key, default=None):
         try:
-            return self._parser.getfloat(section, key)
+            if default is None:
+                return self._parser.getfloat(section, key)
+            return self._parser.getfloat(section, key, fallback=default)
         except ValueError:
             raise ConfigError(
                 "Invalid float value",
@@ -144,9 +378,11 @@ class Config:
                 key=key
             )
 
-    def _get_bool(self, section, key):
+    def _get_bool(self, section, key, default=None):
         try:
-            return self._parser.getboolean(section, key)
+            if default is None:
+                return self._parser.getboolean(section, key)
+            return self._parser.getboolean(section, key, fallback=default)
         except ValueError:
             raise ConfigError(
                 "Invalid boolean value",
@@ -1,11 +1,11 @@
 import streamlit as st
-import pandas as pd
 
 from loaders import load_table
 from charts import (
     monthly_revenue_chart,
     region_bar_chart,
-    top_products_chart
+    top_products_chart,
+    yearly_revenue_chart
 )
 
 st.set_page_config(
@@ -29,28 +29,61 @@ if not output_path:
 # -------------------------
 # Load Data
 # -------------------------
+# Tables are cached by file mtime/size; only columns used below are read
 try:
-    monthly_df = load_table(output_path, "monthly_sales_summary")
-
-    monthly_df = monthly_df[monthly_df["sale_month"] > "1970-01-01"]
-    top_products_df = load_table(output_path, "top_products")
-    region_df = load_table(output_path, "region_wise_performance")
-    anomaly_df = load_table(output_path, "anomaly_records")
+    monthly_df = load_table(
+        output_path,
+        "monthly_sales_summary",
+        columns=["sale_month", "total_revenue", "total_quantity"],
+        sale_month_after="1970-01-01",
+        sort_by="sale_month"
+    )
+    top_products_df = load_table(
+        output_path,
+        "top_products",
+        columns=["product_key", "revenue"]
+    )
+    region_df = load_table(
+        output_path,
+        "region_wise_performance",
+        columns=["region", "total_revenue"]
+    )
+    anomaly_df = load_table(
+        output_path,
+        "anomaly_records",
+        sort_by="revenue",
+        ascending=False
+    )
 except Exception as e:
     st.error(str(e))
     st.stop()
 
+# Rollups are precomputed by the pipeline; older outputs may not have them
+try:
+    kpi_df = load_table(output_path, "rollup_kpis")
+    yearly_df = load_table(output_path, "rollup_revenue_by_year", sort_by="year")
+except FileNotFoundError:
+    kpi_df = None
+    yearly_df = None
+
 # -------------------------
 # KPIs
 # -------------------------
 st.subheader("Key Metrics")
 
-total_revenue = monthly_df["total_revenue"].sum()
-total_orders = monthly_df["total_quantity"].sum()
+if kpi_df is not None and not kpi_df.empty:
+    total_revenue = kpi_df["total_revenue"].iloc[0]
+    total_orders = kpi_df["order_count"].iloc[0]
+    total_units = kpi_df["total_quantity"].iloc[0]
+else:
+    total_revenue = monthly_df["total_revenue"].sum()
+    total_orders = None
+    total_units = monthly_df["total_quantity"].sum()
 
-col1, col2 = st.columns(2)
+col1, col2, col3 = st.columns(3)
 col1.metric("Total Revenue", f"{total_revenue:,.2f}")
-col2.metric("Total Orders", int(total_orders))
+col2.metric("Total Orders", int(total_orders) if total_orders is not None else "n/a")
+col3.metric("Units Sold", int(total_units))
 
 # -------------------------
 # Charts
@@ -62,6 +95,12 @@ st.plotly_chart(
     use_container_width=True
 )
 
+if yearly_df is not None:
+    st.plotly_chart(
+        yearly_revenue_chart(yearly_df),
+        use_container_width=True
+    )
+
 st.subheader("Regional Performance")
 
 st.plotly_chart(
@@ -82,6 +121,6 @@ st.altair_chart(
 st.subheader("Anomalous Transactions")
 
 st.dataframe(
-    anomaly_df.sort_values("revenue", ascending=False),
+    anomaly_df,
     use_container_width=True
 )
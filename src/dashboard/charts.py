@@ -1,10 +1,15 @@
-import plotly.express as px
-import altair as alt
+# plotting libraries are imported by the chart that needs them, so the
+# page does not pay for them before there is data to render
 
 
 def monthly_revenue_chart(df):
+    import plotly.express as px
+
+    if not df["sale_month"].is_monotonic_increasing:
+        df = df.sort_values("sale_month")
+
     return px.line(
-        df.sort_values("sale_month"),
+        df,
         x="sale_month",
         y="total_revenue",
         markers=True,
@@ -12,7 +17,20 @@ def monthly_revenue_chart(df):
     )
 
 
+def yearly_revenue_chart(df):
+    import plotly.express as px
+
+    return px.bar(
+        df.astype({"year": str}),
+        x="year",
+        y="total_revenue",
+        title="Revenue by Year"
+    )
+
+
 def region_bar_chart(df):
+    import plotly.express as px
+
     return px.bar(
         df,
         x="region",
@@ -22,6 +40,8 @@ def region_bar_chart(df):
 
 
 def top_products_chart(df):
+    import altair as alt
+
     chart = alt.Chart(df).mark_bar().encode(
         x=alt.X("product_key:N", sort="-y"),
         y="revenue:Q",
@@ -1,22 +1,120 @@
 import os
-import pandas as pd
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-def load_table(base_path: str, table_name: str) -> pd.DataFrame:
+
+def _resolve_path(base_path: str, table_name: str) -> str:
+    gold_dir = os.path.join(base_path, "gold")
+
+    for ext in ("parquet", "orc", "csv"):
+        path = os.path.join(gold_dir, f"{table_name}.{ext}")
+        if os.path.exists(path):
+            return path
+
+    raise FileNotFoundError(
+        f"Gold table '{table_name}' not found in {gold_dir}"
+    )
+
+
+def table_version(base_path: str, table_name: str):
     """
-    Loads a Gold table from CSV or Parquet.
+    (path, mtime_ns, size) of a Gold table's file: what load_table's cache
+    is keyed on, for callers that keep their own copy.
     """
+    path = _resolve_path(base_path, table_name)
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def list_tables(base_path: str):
     gold_dir = os.path.join(base_path, "gold")
+    if not os.path.isdir(gold_dir):
+        return []
 
-    csv_path = os.path.join(gold_dir, f"{table_name}.csv")
-    parquet_path = os.path.join(gold_dir, f"{table_name}.parquet")
+    names = set()
+    for entry in os.listdir(gold_dir):
+        name, ext = os.path.splitext(entry)
+        if ext in (".parquet", ".orc", ".csv"):
+            names.add(name)
+    return sorted(names)
 
-    if os.path.exists(parquet_path):
-        return pd.read_parquet(parquet_path)
 
-    if os.path.exists(csv_path):
-        return pd.read_csv(csv_path)
+def load_table(
+    base_path: str,
+    table_name: str,
+    columns=None,
+    sale_month_after: str = None,
+    sort_by: str = None,
+    ascending: bool = True
+) -> "pd.DataFrame":
+    """
+    Loads a Gold table from CSV, Parquet or ORC.
 
-    raise FileNotFoundError(
-        f"Gold table '{table_name}' not found in {gold_dir}"
+    Results are cached on (path, mtime, size) plus the read options, so a
+    table is only re-read after the pipeline rewrites it. The returned
+    DataFrame is shared between callers and must be treated as read-only.
+
+    - columns: read only these columns (projection pushed into Parquet)
+    - sale_month_after: keep rows with sale_month > value (predicate pushed into Parquet)
+    - sort_by / ascending: sort once at load time
+    """
+    path = _resolve_path(base_path, table_name)
+    stat = os.stat(path)
+
+    return _read_table(
+        path,
+        stat.st_mtime_ns,
+        stat.st_size,
+        tuple(columns) if columns else None,
+        sale_month_after,
+        sort_by,
+        ascending
     )
+
+
+def load_table_uncached(base_path: str, table_name: str) -> "pd.DataFrame":
+    """
+    Loads a whole Gold table without going through load_table's cache, for
+    callers that keep their own (converted) copy, so a table version is
+    not held in memory twice.
+    """
+    path, mtime_ns, size = table_version(base_path, table_name)
+    return _read_table.__wrapped__(path, mtime_ns, size, None, None, None, True)
+
+
+@lru_cache(maxsize=32)
+def _read_table(path, mtime_ns, size, columns, sale_month_after, sort_by, ascending):
+    # mtime_ns / size are only part of the cache key
+    import pandas as pd
+
+    columns = list(columns) if columns else None
+
+    if path.endswith(".parquet"):
+        filters = [("sale_month", ">", sale_month_after)] if sale_month_after else None
+        df = pd.read_parquet(path, columns=columns, filters=filters)
+    elif path.endswith(".orc"):
+        df = _read_orc(path, columns)
+        if sale_month_after:
+            df = df[df["sale_month"] > sale_month_after]
+    else:
+        df = pd.read_csv(path, usecols=columns, dtype={"sale_month": str})
+        if sale_month_after:
+            df = df[df["sale_month"] > sale_month_after]
+
+    if sort_by:
+        df = df.sort_values(sort_by, ascending=ascending)
+
+    return df.reset_index(drop=True)
+
+
+def _read_orc(path: str, columns=None) -> "pd.DataFrame":
+    import pandas as pd
+    import pyorc
+
+    with open(path, "rb") as f:
+        reader = pyorc.Reader(f, column_names=columns)
+        names = list(reader.selected_schema.fields)
+        return pd.DataFrame(list(reader), columns=names)
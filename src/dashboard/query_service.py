@@ -0,0 +1,332 @@
+"""
+Read-optimized HTTP/JSON access to the Gold tables.
+
+Gold tables are loaded once through loaders.load_table_uncached and kept
+in memory as Arrow tables; a table is reloaded when its file's mtime or size
+changes. Responses carry an ETag derived from the table version and the
+normalized query, so a poller that sends If-None-Match gets a 304 without
+the query being run. Computed responses are also kept in a small LRU.
+
+    python -m src.dashboard.query_service ./processed [--host 127.0.0.1] [--port 8765]
+
+    GET /health
+    GET /tables
+    GET /tables/<name>?month_from=2024-01&month_to=2024-06&region=north,south
+                      &category=electronics&group_by=region&agg=sum:total_revenue
+                      &columns=...&order_by=-total_revenue&limit=10
+
+Filters apply to the sale_month, region and category columns; group_by
+plus agg (sum, mean, min, max, count; default: sum of every numeric
+column) aggregates the filtered rows.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from src.dashboard.loaders import list_tables, load_table_uncached, table_version
+
+
+AGGREGATIONS = ("sum", "mean", "min", "max", "count")
+FILTER_COLUMNS = {"month_from": "sale_month", "month_to": "sale_month", "region": "region", "category": "category"}
+QUERY_KEYS = set(FILTER_COLUMNS) | {"columns", "group_by", "agg", "order_by", "limit"}
+
+RESPONSE_CACHE_SIZE = 256
+
+logger = logging.getLogger("gold_query")
+
+
+class QueryError(ValueError):
+    """
+    Invalid query parameters (HTTP 400).
+    """
+
+
+# -------------------------
+# Tables
+# -------------------------
+class GoldStore:
+    """
+    Gold tables as Arrow tables, reloaded when their file changes. The
+    version (mtime_ns-size) is re-checked with one listdir and one stat
+    per request.
+    """
+
+    def __init__(self, base_path: str):
+        self.base_path = base_path
+        self._tables: Dict[str, Tuple[str, object]] = {}
+        self._lock = threading.Lock()
+
+    def names(self) -> List[str]:
+        return list_tables(self.base_path)
+
+    def get(self, name: str) -> Tuple[str, object]:
+        """
+        (version, pyarrow.Table). Raises FileNotFoundError for unknown tables.
+        """
+        version = self._stat(name)
+
+        cached = self._tables.get(name)
+        if cached is not None and cached[0] == version:
+            return cached
+
+        with self._lock:
+            cached = self._tables.get(name)
+            if cached is None or cached[0] != version:
+                import pyarrow as pa
+
+                df = load_table_uncached(self.base_path, name)
+                cached = (version, pa.Table.from_pandas(df, preserve_index=False))
+                self._tables[name] = cached
+                logger.info(f"Loaded Gold table {name} ({cached[1].num_rows} rows, version {version})")
+        return cached
+
+    def version(self, name: str) -> str:
+        """
+        Version without loading the table (the If-None-Match shortcut).
+        """
+        return self._stat(name)
+
+    def _stat(self, name: str) -> str:
+        # the name comes from the URL: only tables listed in gold/ resolve,
+        # never a path such as ../../other
+        if name not in self.names():
+            raise FileNotFoundError(f"Gold table {name!r} not found")
+        _, mtime_ns, size = table_version(self.base_path, name)
+        return f"{mtime_ns}-{size}"
+
+
+# -------------------------
+# Queries
+# -------------------------
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _require_columns(table, columns, param: str):
+    missing = [column for column in columns if column not in table.column_names]
+    if missing:
+        raise QueryError(f"{param}: unknown column(s) {missing} (table has {table.column_names})")
+
+
+def run_query(table, params: Dict[str, str]):
+    """
+    Filters, aggregates, projects, orders and limits an Arrow table.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    unknown = set(params) - QUERY_KEYS
+    if unknown:
+        raise QueryError(f"unknown parameter(s) {sorted(unknown)}")
+
+    mask = None
+    for param, column in FILTER_COLUMNS.items():
+        value = params.get(param)
+        if not value:
+            continue
+        _require_columns(table, [column], param)
+
+        if param == "month_from":
+            condition = pc.greater_equal(table[column], value)
+        elif param == "month_to":
+            condition = pc.less_equal(table[column], value)
+        else:
+            condition = pc.is_in(table[column], value_set=pa.array(_split(value)))
+        mask = condition if mask is None else pc.and_(mask, condition)
+
+    if mask is not None:
+        table = table.filter(mask)
+
+    if params.get("agg") and not params.get("group_by"):
+        raise QueryError("agg needs group_by")
+
+    if params.get("group_by"):
+        keys = _split(params["group_by"])
+        _require_columns(table, keys, "group_by")
+
+        if params.get("agg"):
+            aggregations = []
+            for item in _split(params["agg"]):
+                function, _, column = item.partition(":")
+                if function not in AGGREGATIONS or not column:
+                    raise QueryError(f"agg: expected <{'|'.join(AGGREGATIONS)}>:<column>, got {item!r}")
+                aggregations.append((column, function))
+        else:
+            aggregations = [
+                (field.name, "sum") for field in table.schema
+                if field.name not in keys and (pa.types.is_integer(field.type) or pa.types.is_floating(field.type))
+            ]
+        _require_columns(table, [column for column, _ in aggregations], "agg")
+
+        table = table.group_by(keys).aggregate(aggregations)
+        # Arrow puts the keys last: keys first reads better
+        table = table.select(keys + [name for name in table.column_names if name not in keys])
+
+    if params.get("columns"):
+        columns = _split(params["columns"])
+        _require_columns(table, columns, "columns")
+        table = table.select(columns)
+
+    if params.get("order_by"):
+        sort_keys = []
+        for item in _split(params["order_by"]):
+            column = item.lstrip("-")
+            sort_keys.append((column, "descending" if item.startswith("-") else "ascending"))
+        _require_columns(table, [column for column, _ in sort_keys], "order_by")
+        table = table.sort_by(sort_keys)
+
+    if params.get("limit"):
+        try:
+            limit = int(params["limit"])
+        except ValueError:
+            raise QueryError(f"limit: expected an integer, got {params['limit']!r}")
+        if limit < 0:
+            raise QueryError("limit must be >= 0")
+        table = table.slice(0, limit)
+
+    return table
+
+
+class GoldQueryService:
+    """
+    Request handling without the HTTP server (tests and benchmarks call
+    handle() directly). Returns (status, headers, body).
+    """
+
+    def __init__(self, base_path: str, cache_size: int = RESPONSE_CACHE_SIZE):
+        self.store = GoldStore(base_path)
+        self.cache_size = cache_size
+        self._responses: "OrderedDict[tuple, Tuple[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def handle(self, url: str, if_none_match: Optional[str] = None) -> Tuple[int, Dict[str, str], bytes]:
+        parts = urlsplit(url)
+        path = parts.path.rstrip("/")
+
+        try:
+            if path == "/health":
+                return self._json(200, {"status": "ok"})
+            if path == "/tables":
+                return self._json(200, {"tables": self.store.names()})
+            if path.startswith("/tables/"):
+                return self._table(path[len("/tables/"):], parts.query, if_none_match)
+            return self._json(404, {"error": f"no route {path!r}"})
+        except FileNotFoundError as e:
+            return self._json(404, {"error": str(e)})
+        except QueryError as e:
+            return self._json(400, {"error": str(e)})
+        except Exception:
+            # e.g. an unreadable Gold file: answer rather than drop the connection
+            logger.exception(f"Failed to serve {url}")
+            return self._json(500, {"error": "internal error, see the service log"})
+
+    def _table(self, name: str, query: str, if_none_match: Optional[str]):
+        import pyarrow as pa
+
+        params = dict(parse_qsl(query))
+        canonical = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+
+        # a matching ETag needs only the table's version (one stat), not the query
+        if if_none_match:
+            etag = self._etag(name, self.store.version(name), canonical)
+            if etag in [tag.strip() for tag in if_none_match.split(",")]:
+                return 304, {"ETag": etag, "Cache-Control": "no-cache"}, b""
+
+        # key and ETag come from the version of the table the body is built from
+        version, table = self.store.get(name)
+        etag = self._etag(name, version, canonical)
+        key = (name, version, canonical)
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is not None:
+                self._responses.move_to_end(key)
+        if cached is None:
+            try:
+                result = run_query(table, params)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as e:
+                # e.g. sum over a string column
+                raise QueryError(str(e))
+            body = json.dumps({
+                "table": name,
+                "version": version,
+                "row_count": result.num_rows,
+                "rows": result.to_pylist(),
+            }, default=str).encode("utf-8")
+            cached = (etag, body)
+            with self._lock:
+                self._responses[key] = cached
+                while len(self._responses) > self.cache_size:
+                    self._responses.popitem(last=False)
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Content-Type": "application/json"}
+        return 200, headers, cached[1]
+
+    @staticmethod
+    def _etag(name: str, version: str, canonical: str) -> str:
+        return '"' + hashlib.sha1(f"{name}|{version}|{canonical}".encode("utf-8")).hexdigest()[:24] + '"'
+
+    @staticmethod
+    def _json(status: int, payload: dict):
+        return status, {"Content-Type": "application/json"}, json.dumps(payload).encode("utf-8")
+
+
+# -------------------------
+# HTTP server
+# -------------------------
+class _Handler(BaseHTTPRequestHandler):
+    # keep-alive: pollers reuse one connection. Headers and body go out
+    # as two writes, which Nagle would hold back for the client's delayed ACK
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    service: GoldQueryService = None
+
+    def do_GET(self):
+        status, headers, body = self.service.handle(self.path, self.headers.get("If-None-Match"))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_server(base_path: str, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    handler = type("GoldQueryHandler", (_Handler,), {"service": GoldQueryService(base_path)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.dashboard.query_service",
+        description="HTTP/JSON query service over the Gold tables"
+    )
+    parser.add_argument("output_dir", help="Pipeline output_dir (the directory containing gold/)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    server = make_server(args.output_dir, args.host, args.port)
+    logger.info(f"Serving Gold tables from {args.output_dir} on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
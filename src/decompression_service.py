@@ -0,0 +1,146 @@
+import gzip
+import io
+import queue
+import threading
+
+
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+BLOCK_SIZE = 1024 * 1024
+QUEUE_BLOCKS = 8
+
+_EOF = object()
+
+
+def compression_of(path: str):
+    for suffix in COMPRESSED_SUFFIXES:
+        if path.endswith(suffix):
+            return suffix
+    return None
+
+
+def strip_compression_suffix(path: str) -> str:
+    suffix = compression_of(path)
+    return path[:-len(suffix)] if suffix else path
+
+
+def _open_decompressed(path: str, suffix: str):
+    fh = open(path, "rb")
+
+    if suffix == ".gz":
+        # GzipFile reads every member of a multi-member stream
+        return gzip.GzipFile(fileobj=fh, mode="rb"), fh
+
+    try:
+        import zstandard
+    except ImportError:
+        fh.close()
+        raise ImportError(
+            f"zstandard is required to read {path} (pip install zstandard)"
+        )
+
+    reader = zstandard.ZstdDecompressor().stream_reader(fh, read_across_frames=True)
+    return reader, fh
+
+
+class ThreadedDecompressor(io.RawIOBase):
+    """
+    Raw byte stream whose decompression runs on a background thread.
+
+    zlib and zstd release the GIL while inflating, so the next blocks are
+    decompressed while the caller parses CSV from the previous ones.
+    """
+
+    def __init__(self, path: str, suffix: str):
+        super().__init__()
+        self._source, self._fh = _open_decompressed(path, suffix)
+        self._queue = queue.Queue(maxsize=QUEUE_BLOCKS)
+        self._stop = threading.Event()
+        self._block = b""
+        self._pos = 0
+        self._eof = False
+
+        self._thread = threading.Thread(target=self._run, name=f"decompress-{suffix[1:]}", daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        try:
+            while True:
+                block = self._source.read(BLOCK_SIZE)
+                if not block:
+                    break
+                if not self._put(block):
+                    return
+        except BaseException as e:
+            self._put(e)
+            return
+        self._put(_EOF)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._pos >= len(self._block):
+            if self._eof:
+                return 0
+
+            item = self._queue.get()
+            if item is _EOF:
+                self._eof = True
+                return 0
+            if isinstance(item, BaseException):
+                raise item
+
+            self._block = item
+            self._pos = 0
+
+        n = min(len(buffer), len(self._block) - self._pos)
+        buffer[:n] = self._block[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def compressed_offset(self) -> int:
+        return self._fh.tell()
+
+    def close(self):
+        if self.closed:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._source.close()
+        self._fh.close()
+        super().close()
+
+
+def open_bronze_text(path: str):
+    """
+    Opens a Bronze file as text for csv; compression is chosen by extension.
+    """
+    suffix = compression_of(path)
+    if suffix is None:
+        return open(path, "r", newline="", encoding="utf-8")
+
+    raw = ThreadedDecompressor(path, suffix)
+    return io.TextIOWrapper(io.BufferedReader(raw, BLOCK_SIZE), encoding="utf-8", newline="")
+
+
+def bytes_read(f) -> int:
+    """
+    Bytes of the Bronze file on disk consumed so far by a stream from
+    open_bronze_text (compressed bytes for compressed files). Read-ahead
+    buffering keeps it slightly ahead of the rows parsed (progress only).
+    """
+    raw = f.buffer.raw
+    if isinstance(raw, ThreadedDecompressor):
+        return raw.compressed_offset()
+    return raw.tell()
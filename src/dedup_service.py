@@ -1,26 +1,58 @@
 import sqlite3
 import os
+import time
+from typing import Iterable, List, Optional, Set, Tuple
+
+
+# SQLite's default limit on host parameters per statement is 999
+LOOKUP_BATCH = 500
+
+
+def store_path(output_dir: str) -> str:
+    return os.path.join(output_dir, "dedup", "order_id.db")
 
 
 class DedupService:
     """
     Disk-backed deduplication service using SQLite.
+
+    Every key records when it was first seen (epoch seconds), so keys older
+    than the retention window can be dropped by compact().
     """
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, timeout: float = 60.0, journal_mode: str = None):
         os.makedirs(os.path.dirname(path), exist_ok=True)
 
-        self.conn = sqlite3.connect(path)
+        self.path = path
+        self.timeout = timeout
+        # timeout lets several processes take turns on the write lock
+        self.conn = sqlite3.connect(path, timeout=timeout)
+
+        # persistent in the file; wal lets readers run during compaction,
+        # but needs a local filesystem (use delete on NFS)
+        if journal_mode:
+            self.conn.execute(f"PRAGMA journal_mode={journal_mode}")
+
         self._init_table()
 
     def _init_table(self):
         self.conn.execute(
             """
             CREATE TABLE IF NOT EXISTS seen (
-                order_id TEXT PRIMARY KEY
+                order_id TEXT PRIMARY KEY,
+                first_seen INTEGER
             )
             """
         )
+
+        # stores created before first_seen existed: keys count as seen now
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(seen)")]
+        if "first_seen" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE seen ADD COLUMN first_seen INTEGER")
+                self.conn.execute("UPDATE seen SET first_seen = ?", (int(time.time()),))
+
+        self.conn.execute("CREATE INDEX IF NOT EXISTS seen_first_seen ON seen (first_seen)")
         self.conn.commit()
 
     def is_duplicate(self, order_id: str) -> bool:
@@ -32,10 +64,118 @@ class DedupService:
 
     def mark_seen(self, order_id: str):
         self.conn.execute(
-            "INSERT OR IGNORE INTO seen VALUES (?)",
-            (order_id,)
+            "INSERT OR IGNORE INTO seen VALUES (?, ?)",
+            (order_id, int(time.time()))
         )
         self.conn.commit()
 
+    def mark_seen_many(self, order_ids):
+        """
+        Bulk insert in a single transaction.
+        """
+        now = int(time.time())
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO seen VALUES (?, ?)",
+                ((order_id, now) for order_id in order_ids)
+            )
+
+    def add_missing(self, keys: Iterable[Tuple[str, int]], cutoff: int = None):
+        """
+        Adds (order_id, first_seen) pairs not yet in the store; stored keys
+        keep their first_seen. Pairs first seen before cutoff are skipped,
+        so keys that compaction expired stay expired.
+        """
+        if cutoff is not None:
+            keys = ((order_id, first_seen) for order_id, first_seen in keys if first_seen >= cutoff)
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?)", keys)
+
+    def seen_among(self, order_ids: Iterable[str]) -> Set[str]:
+        """
+        Those of order_ids already in the store, looked up in batches.
+        """
+        order_ids = list(order_ids)
+        seen = set()
+        for start in range(0, len(order_ids), LOOKUP_BATCH):
+            batch = order_ids[start:start + LOOKUP_BATCH]
+            cur = self.conn.execute(
+                f"SELECT order_id FROM seen WHERE order_id IN ({','.join('?' * len(batch))})",
+                batch
+            )
+            seen.update(order_id for (order_id,) in cur)
+        # end the read transaction so writers are not held up
+        self.conn.commit()
+        return seen
+
+    def iter_sorted(self):
+        """
+        All stored keys in key order (primary key index scan). Reads on a
+        separate connection, so the main one stays free for writes.
+        """
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            for (order_id,) in conn.execute("SELECT order_id FROM seen ORDER BY order_id"):
+                yield order_id
+        finally:
+            conn.close()
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def compact(self, retention_days: float = None, batch_size: int = 10000, now: float = None) -> int:
+        """
+        Drops keys first seen more than retention_days ago (none when
+        retention_days is None), then rebuilds the table and its indexes
+        (VACUUM). Deletes run in short transactions so a running pipeline
+        only waits for one batch; the final VACUUM holds the write lock for
+        one pass over the live keys. Returns the number of keys removed.
+        """
+        removed = 0
+        if retention_days is not None:
+            cutoff = int((time.time() if now is None else now) - retention_days * 86400)
+            removed = self._expire(cutoff, batch_size)
+
+        self.conn.execute("VACUUM")
+        if self.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        return removed
+
+    def _expire(self, cutoff: int, batch_size: int) -> int:
+        removed = 0
+        while True:
+            with self.conn:
+                cur = self.conn.execute(
+                    """
+                    DELETE FROM seen WHERE order_id IN (
+                        SELECT order_id FROM seen WHERE first_seen < ? LIMIT ?
+                    )
+                    """,
+                    (cutoff, batch_size)
+                )
+            removed += cur.rowcount
+            if cur.rowcount < batch_size:
+                return removed
+
     def close(self):
         self.conn.close()
+
+
+def drop_duplicates(rows: List[dict], dedup: Optional[DedupService] = None) -> Tuple[List[dict], int]:
+    """
+    Early dedup of one chunk's clean rows, before they are written to
+    Silver: keeps the first row of each order_id within the chunk and drops
+    rows whose order_id is already in the store (only read, not marked).
+    Phase 2 would drop exactly these rows; it still dedups what is left.
+    Returns (kept rows, number dropped).
+    """
+    kept = {}
+    for row in rows:
+        kept.setdefault(row["order_id"], row)
+
+    if dedup is not None and kept:
+        for order_id in dedup.seen_among(kept):
+            del kept[order_id]
+
+    return list(kept.values()), len(rows) - len(kept)
@@ -0,0 +1,228 @@
+import csv
+import os
+import shutil
+import time
+import zlib
+from typing import List
+
+from src.aggregation_service import AggregationService
+from src.clean_transform_service import CleanTransformService
+from src.dedup_service import DedupService
+
+
+SEQ_FIELD = "_seq"
+ROW_BITS = 32  # seq = file_index << ROW_BITS | row_index
+
+
+def partition_of(order_id: str, partitions: int) -> int:
+    # crc32 rather than hash(): must agree across worker processes
+    return zlib.crc32(order_id.encode("utf-8")) % partitions
+
+
+def _spill_path(spill_dir: str, partition: int, shard: int) -> str:
+    return os.path.join(spill_dir, f"part_{partition:03d}", f"shard_{shard:05d}.csv")
+
+
+# -------------------------
+# Worker tasks (module level so they pickle)
+# -------------------------
+def shard_silver_files(shard: int, files: List[tuple], partitions: int, spill_dir: str) -> int:
+    """
+    Map step: routes every row of a contiguous range of Silver files to its
+    order_id hash partition, tagged with its global position.
+    """
+    handles = {}
+    writers = {}
+    rows = 0
+
+    try:
+        for file_index, path in files:
+            with open(path, "r", newline="", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+
+                for row_index, row in enumerate(reader):
+                    p = partition_of(row["order_id"], partitions)
+
+                    writer = writers.get(p)
+                    if writer is None:
+                        out_path = _spill_path(spill_dir, p, shard)
+                        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                        handles[p] = open(out_path, "w", newline="", encoding="utf-8")
+                        writer = csv.DictWriter(handles[p], fieldnames=[SEQ_FIELD] + reader.fieldnames)
+                        writer.writeheader()
+                        writers[p] = writer
+
+                    row[SEQ_FIELD] = (file_index << ROW_BITS) | row_index
+                    writer.writerow(row)
+                    rows += 1
+    finally:
+        for handle in handles.values():
+            handle.close()
+
+    return rows
+
+
+def aggregate_partition(
+    partition: int,
+    shards: int,
+    spill_dir: str,
+    dedup_path: str,
+    anomaly_top_n: int,
+    aggregation_options: dict = None,
+    file_times: List[int] = None,
+    cutoff: int = None
+):
+    """
+    Reduce step: dedups one order_id partition (first occurrence in global
+    order wins) and builds its partial aggregation state. Keys missing from
+    the dedup store are added as first seen at their Silver file's mtime.
+    """
+    aggregator = AggregationService(anomaly_top_n, **(aggregation_options or {}))
+    seen = {}
+    rows_read = 0
+    duplicates = 0
+
+    # shards cover contiguous file ranges, so shard order is global order
+    for shard in range(shards):
+        path = _spill_path(spill_dir, partition, shard)
+        if not os.path.exists(path):
+            continue
+
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                rows_read += 1
+                seq = int(row.pop(SEQ_FIELD))
+
+                order_id = row["order_id"]
+                if order_id in seen:
+                    duplicates += 1
+                    continue
+
+                seen[order_id] = file_times[seq >> ROW_BITS]
+                aggregator.process(CleanTransformService.normalize_silver_row(row), seq=seq)
+
+    dedup = DedupService(dedup_path)
+    dedup.add_missing(sorted(seen.items()), cutoff)
+    dedup.close()
+
+    return aggregator, rows_read, duplicates
+
+
+class GoldRebuildService:
+    """
+    Rebuilds Gold from all Silver files with shard-and-merge aggregation.
+
+    - Map: Silver files are split into contiguous shards, each worker routes
+      its rows to order_id hash partitions.
+    - Reduce: each worker dedups one partition and aggregates it.
+    - Merge: partial states are combined in the parent.
+
+    The result is identical to a serial pass over the same files. The
+    dedup store is not reset: stored keys keep their first_seen, and keys
+    older than retention_days (expired by compaction) are not added back.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        dedup_path: str,
+        anomaly_top_n: int,
+        workers: int = 1,
+        aggregation_options: dict = None,
+        retention_days: float = None
+    ):
+        self.output_dir = output_dir
+        self.dedup_path = dedup_path
+        self.anomaly_top_n = anomaly_top_n
+        self.workers = max(1, workers)
+        # extra AggregationService arguments (spill settings)
+        self.aggregation_options = aggregation_options or {}
+        self.retention_days = retention_days
+        self.spill_dir = os.path.join(output_dir, "rebuild_tmp")
+
+    def rebuild(self, silver_files: List[str], metrics=None) -> AggregationService:
+        files = list(enumerate(sorted(silver_files)))
+
+        # a Silver file is written when its rows are first seen
+        file_times = [int(os.path.getmtime(path)) for _, path in files]
+        cutoff = int(time.time() - self.retention_days * 86400) if self.retention_days else None
+
+        if self.workers == 1 or len(files) <= 1:
+            results = [self._rebuild_serial(files, file_times, cutoff)]
+        else:
+            results = self._rebuild_parallel(files, file_times, cutoff)
+
+        # rows processed after the rebuild (watch mode) continue the global order
+        merged = AggregationService(
+            self.anomaly_top_n, first_seq=len(files) << ROW_BITS, **self.aggregation_options
+        )
+        for aggregator, rows_read, duplicates in results:
+            merged.merge(aggregator)
+            aggregator.close()
+            if metrics is not None:
+                metrics.increment_read(rows_read)
+                metrics.increment_deduplicated(duplicates)
+
+        return merged
+
+    def _rebuild_serial(self, files: List[tuple], file_times: List[int], cutoff: int = None):
+        # one partition, one shard: no need to spill
+        aggregator = AggregationService(self.anomaly_top_n, **self.aggregation_options)
+        seen = {}
+        rows_read = 0
+        duplicates = 0
+
+        for file_index, path in files:
+            with open(path, "r", newline="", encoding="utf-8") as f:
+                for row_index, row in enumerate(csv.DictReader(f)):
+                    rows_read += 1
+                    order_id = row["order_id"]
+                    if order_id in seen:
+                        duplicates += 1
+                        continue
+
+                    seen[order_id] = file_times[file_index]
+                    aggregator.process(
+                        CleanTransformService.normalize_silver_row(row),
+                        seq=(file_index << ROW_BITS) | row_index
+                    )
+
+        dedup = DedupService(self.dedup_path)
+        dedup.add_missing(sorted(seen.items()), cutoff)
+        dedup.close()
+
+        return aggregator, rows_read, duplicates
+
+    def _rebuild_parallel(self, files: List[tuple], file_times: List[int], cutoff: int = None):
+        from concurrent.futures import ProcessPoolExecutor
+
+        shard_size = -(-len(files) // self.workers)
+        shards = [files[i:i + shard_size] for i in range(0, len(files), shard_size)]
+        partitions = self.workers
+
+        if os.path.exists(self.spill_dir):
+            shutil.rmtree(self.spill_dir)
+        os.makedirs(self.spill_dir)
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                list(pool.map(
+                    shard_silver_files,
+                    range(len(shards)),
+                    shards,
+                    [partitions] * len(shards),
+                    [self.spill_dir] * len(shards)
+                ))
+                return list(pool.map(
+                    aggregate_partition,
+                    range(partitions),
+                    [len(shards)] * partitions,
+                    [self.spill_dir] * partitions,
+                    [self.dedup_path] * partitions,
+                    [self.anomaly_top_n] * partitions,
+                    [self.aggregation_options] * partitions,
+                    [file_times] * partitions,
+                    [cutoff] * partitions
+                ))
+        finally:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
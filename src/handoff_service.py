@@ -0,0 +1,207 @@
+import os
+import shutil
+import socket
+import time
+from typing import List, Optional, Sequence
+
+from src.clean_transform_service import CleanTransformService
+from src.dedup_service import DedupService, drop_duplicates, store_path
+from src.metrics_service import MetricsService
+from src.profiling_service import ChunkProfile, ChunkProfiler
+from src.schema_service import RECORD_FIELDS, BronzeSchema
+from src.tuning_service import rss_bytes
+from src.writer_service import WriterService
+
+
+# -------------------------
+# Segment lifetime
+# -------------------------
+def _owner_prefix() -> str:
+    # output_dir may be shared between hosts: only this host's pids are checked
+    return f"{socket.gethostname()}-"
+
+
+def process_dir(root: str) -> str:
+    """
+    This process's directory under root (swept once the process is gone).
+    """
+    return os.path.join(root, f"{_owner_prefix()}{os.getpid()}")
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def sweep_stale(root: str) -> List[str]:
+    """
+    Removes the hand-off directories of processes on this host that are no
+    longer running (a crashed run). Returns the removed paths.
+    """
+    if not os.path.isdir(root):
+        return []
+
+    prefix = _owner_prefix()
+    removed = []
+    for name in os.listdir(root):
+        pid = name[len(prefix):]
+        if not name.startswith(prefix) or not pid.isdigit() or _pid_alive(int(pid)):
+            continue
+
+        path = os.path.join(root, name)
+        shutil.rmtree(path, ignore_errors=True)
+        removed.append(path)
+
+    return removed
+
+
+class ArrowHandoff:
+    """
+    Passes Bronze chunks to worker processes as Arrow IPC files.
+
+    put() writes a chunk's records column-wise (RECORD_FIELDS order) into
+    <root>/<host>-<pid>/; only the path goes through the executor queue.
+    The worker memory-maps the file, so the columns are read without a
+    copy or unpickling, and deletes it once read. The directory is removed
+    on close; one left behind by a crash is removed by the next run's
+    sweep_stale(). With root on /dev/shm the files never touch disk.
+    """
+
+    def __init__(self, root: str, schema: Optional[BronzeSchema] = None):
+        self.root = root
+        self.dir = process_dir(root)
+        # explicit column types: Arrow type inference costs more than the copy
+        self.types = [schema.types[name] if schema else "string" for name in RECORD_FIELDS]
+        self._seq = 0
+
+    def open(self):
+        sweep_stale(self.root)
+        os.makedirs(self.dir, exist_ok=True)
+        return self
+
+    def put(self, rows: Sequence) -> str:
+        """
+        rows: record tuples (schema ingestion) or DictReader rows.
+        """
+        import pyarrow as pa
+
+        if rows and isinstance(rows[0], dict):
+            columns = [[row.get(name) for row in rows] for name in RECORD_FIELDS]
+        else:
+            columns = list(zip(*rows)) if rows else [[] for _ in RECORD_FIELDS]
+
+        arrow_types = {"string": pa.string(), "int": pa.int64(), "float": pa.float64()}
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(column, arrow_types[kind]) for column, kind in zip(columns, self.types)],
+            names=list(RECORD_FIELDS)
+        )
+
+        path = os.path.join(self.dir, f"chunk_{self._seq:08d}.arrow")
+        self._seq += 1
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+        return path
+
+    def close(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_records(path: str) -> List[tuple]:
+    """
+    Memory-maps a hand-off file and returns its rows as record tuples.
+    The file is unlinked at once; the mapping stays valid until released.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+        os.remove(path)
+        columns = [table.column(name).to_pylist() for name in RECORD_FIELDS]
+
+    return list(zip(*columns))
+
+
+# -------------------------
+# Worker (module level so it pickles)
+# -------------------------
+_cleaner: Optional[CleanTransformService] = None
+_writer: Optional[WriterService] = None
+_dedup: Optional[DedupService] = None
+_profiler: Optional[ChunkProfiler] = None
+
+
+def init_clean_worker(
+    cache_size: int,
+    output_dir: str,
+    early_dedup: bool = False,
+    profiler: Optional[ChunkProfiler] = None
+):
+    """
+    Process pool initializer: one cleaner (and warm caches) per worker.
+    """
+    global _cleaner, _writer, _dedup, _profiler
+    _cleaner = CleanTransformService(cache_size)
+    _writer = WriterService(output_dir)
+    # read only: Phase 2 marks the keys
+    _dedup = DedupService(store_path(output_dir)) if early_dedup else None
+    # the parent's profiler (same run directory and stages); it picks the sampled chunks
+    _profiler = profiler or ChunkProfiler(output_dir)
+
+
+def clean_handoff_chunk(
+    path: str,
+    source_file: str,
+    chunk_index: int,
+    profile_label: Optional[str] = None
+) -> MetricsService:
+    """
+    Cleans one handed-off chunk and writes it to Silver. profile_label:
+    set when the parent sampled this chunk for profiling (the results
+    come back in the returned metrics).
+    """
+    metrics = MetricsService()
+    before = _cleaner.cache_stats()
+    start = time.perf_counter()
+    profile = ChunkProfile(profile_label) if profile_label else None
+
+    records = read_records(path)
+    silver_rows = []
+    with _profiler.stage(profile, "clean"), metrics.timed("clean"):
+        for record in records:
+            metrics.increment_clean_read()
+            result = _cleaner.process_record(record)
+
+            if not result["is_valid"]:
+                metrics.increment_rejected(result["errors"])
+                continue
+
+            metrics.increment_success()
+            silver_rows.append(result["clean_row"])
+
+    if _dedup is not None:
+        with _profiler.stage(profile, "dedup"):
+            silver_rows, dropped = drop_duplicates(silver_rows, _dedup)
+        metrics.increment_deduplicated_early(dropped)
+
+    with _profiler.stage(profile, "silver_write"), metrics.timed("silver_write"):
+        _writer.write_silver_chunk(source_file, chunk_index, silver_rows)
+    metrics.record_chunk(len(records), time.perf_counter() - start, rss_bytes())
+    _profiler.finish_chunk(profile, metrics)
+
+    # only this chunk's share of the long-lived caches' counters
+    metrics.record_cache_stats({
+        name: (hits - before[name][0], misses - before[name][1])
+        for name, (hits, misses) in _cleaner.cache_stats().items()
+    })
+    return metrics
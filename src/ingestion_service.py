@@ -1,7 +1,22 @@
 import csv
 import glob
 import os
-from typing import Iterator, Dict, List
+from typing import Iterator, Dict, List, Optional, Iterable
+
+from src.manifest_service import SilverManifest, manifest_path
+from src.schema_service import BronzeSchema
+from src.byte_range_service import RangePlan
+from src.checkpoint_service import Checkpoint
+from src.decompression_service import COMPRESSED_SUFFIXES, bytes_read, compression_of, open_bronze_text
+
+
+# Silver columns that are not strings (see CleanTransformService.normalize_silver_row)
+SILVER_TYPES = {
+    "quantity": "int64",
+    "unit_price": "float64",
+    "discount_percent": "float64",
+    "revenue": "float64",
+}
 
 
 class IngestionService:
@@ -19,7 +34,14 @@ class IngestionService:
         self.bronze_files = self._resolve_bronze_files()
         self.bronze_files.sort()
 
+        # Bronze chunks carry record tuples instead of dicts when a schema is set
+        self.schema = BronzeSchema.load(config.schema_file) if config.schema_file else None
+
+        # byte-range plans and per-range checkpoints of split Bronze files
+        self.range_dir = os.path.join(config.output_dir, "ranges")
+
         self.silver_dir = os.path.join(config.output_dir, "silver")
+        self.silver_manifest = SilverManifest(self.silver_dir, manifest_path(config.output_dir))
 
     # -------------------------
     # BRONZE PHASE
@@ -35,43 +57,130 @@ class IngestionService:
         if not os.path.isdir(self.config.input_path):
             raise NotADirectoryError(self.config.input_path)
 
-        files = glob.glob(
-            os.path.join(self.config.input_path, self.config.file_pattern)
-        )
+        # compressed drops match the same pattern plus a compression suffix
+        pattern = os.path.join(self.config.input_path, self.config.file_pattern)
+        files = set(glob.glob(pattern))
+        for suffix in COMPRESSED_SUFFIXES:
+            files.update(glob.glob(pattern + suffix))
+        files = list(files)
+
         if not files:
             raise FileNotFoundError(f"No files match pattern: {self.config.file_pattern}")
         
         return files
     
-    def read_bronze_chunks(self) -> Iterator[Dict]:
+    def refresh_bronze_files(self) -> List[str]:
+        """
+        Re-lists Bronze input (watch mode). An empty directory is not an error here.
+        """
+        try:
+            self.bronze_files = sorted(self._resolve_bronze_files())
+        except FileNotFoundError:
+            self.bronze_files = []
+        return self.bronze_files
+
+    def can_split(self, path: str) -> bool:
+        """
+        Byte-range splitting needs a plain (seekable, uncompressed), non-empty file.
+        """
+        return compression_of(path) is None and os.path.getsize(path) > 0
+
+    def range_plan(self, path: str, workers: int, pool=None) -> RangePlan:
+        """
+        Loads the persisted byte-range plan for path, or splits the file
+        into ranges of about [PARALLEL] range_mb (at least one per worker).
+        A file changed since it was split gets new ranges after the old
+        ones (see RangePlan.create).
+        """
+        plan = RangePlan.load(self.range_dir, path)
+        if plan is not None:
+            return plan
+
+        return RangePlan.create(self.range_dir, path, workers, pool, range_bytes=self.config.range_mb * 1024 * 1024)
+
+    def pending_bronze_files(self) -> List[str]:
+        """
+        Bronze files not yet fully covered by the checkpoint (the
+        checkpointed file itself may have chunks left).
+        """
         cp = self.bronze_cp.get()
+        return [
+            path for path in self.bronze_files
+            if (not cp.file or path >= cp.file) and not self._ingested_by_ranges(path)
+        ]
+
+    def bronze_file_done(self, path: str) -> bool:
+        """
+        Whether the Bronze checkpoint is at the end of path, the
+        checkpointed file. Counts the file's rows (reporting, not the hot path).
+        """
+        cp = self.bronze_cp.get()
+        if path != cp.file:
+            return False
+
+        done = cp.chunk_index * (cp.chunk_size or self.config.chunk_size)
+        with open_bronze_text(path) as f:
+            return sum(1 for _ in self._bronze_rows(f, path)) <= done
 
-        for file_path in self.bronze_files:
+    def _ingested_by_ranges(self, path: str) -> bool:
+        plan = RangePlan.load(self.range_dir, path)
+        return plan is not None and plan.is_complete()
+
+    def _bronze_rows(self, f, file_path: str) -> Iterator:
+        if self.schema:
+            # header validated once, rows become record tuples (no dicts)
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return  # empty file
+            parse = self.schema.compile(header, file_path)
+            yield from (parse(r) for r in reader if r)
+        else:
+            yield from csv.DictReader(f)  # assumes CSV input and header row present. Reads as dict per row
+
+    def read_bronze_chunks(self, files: Optional[List[str]] = None, resume: bool = True) -> Iterator[Dict]:
+        """
+        files restricts the read to a subset of the Bronze files (still
+        filtered by the checkpoint, unless resume is False: late files are
+        read whole). Payloads carry the chunk_size they were cut with (the
+        checkpointed file keeps the size it was started with) and the bytes
+        of the file read so far (progress).
+        """
+        cp = self.bronze_cp.get() if resume else Checkpoint()
+
+        for file_path in sorted(files) if files is not None else self.bronze_files:
             if cp.file and file_path < cp.file:
                 continue
 
-            with open(file_path, "r", newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)  # assumes CSV input and header row present. Reads as dict per row
+            if self._ingested_by_ranges(file_path):
+                continue
 
+            chunk_size = self.config.chunk_size
+            if file_path == cp.file and cp.chunk_size:
+                chunk_size = cp.chunk_size
+
+            with open_bronze_text(file_path) as f:
                 chunk = []
                 chunk_index = 0
                 rows_seen = 0
 
-                for row in reader:
+                for row in self._bronze_rows(f, file_path):
                     rows_seen += 1
 
                     # Skip rows already processed (resume)
                     if file_path == cp.file and chunk_index < cp.chunk_index:
-                        if rows_seen % self.config.chunk_size == 0:
+                        if rows_seen % chunk_size == 0:
                             chunk_index += 1
                         continue
 
                     chunk.append(row)
 
-                    if len(chunk) >= self.config.chunk_size:
+                    if len(chunk) >= chunk_size:
                         yield {
                             "file": file_path,
                             "chunk_index": chunk_index,
+                            "chunk_size": chunk_size,
+                            "offset": bytes_read(f),
                             "rows": chunk
                         }
                         chunk = []
@@ -81,23 +190,85 @@ class IngestionService:
                     yield {
                         "file": file_path,
                         "chunk_index": chunk_index,
+                        "chunk_size": chunk_size,
+                        "offset": bytes_read(f),
                         "rows": chunk
                     }
 
+    def sample_bronze_rows(self, limit: int) -> List:
+        """
+        The first limit rows of the pending Bronze files, parsed like
+        read_bronze_chunks rows (tuning calibration; checkpoints untouched).
+        """
+        rows = []
+        for file_path in self.pending_bronze_files():
+            with open_bronze_text(file_path) as f:
+                for row in self._bronze_rows(f, file_path):
+                    rows.append(row)
+                    if len(rows) >= limit:
+                        return rows
+        return rows
+
     # -------------------------
     # SILVER PHASE
     # -------------------------
-    def read_silver_files(self) -> Iterator[Dict]:
+    def list_silver_files(
+        self,
+        min_month: Optional[str] = None,
+        max_month: Optional[str] = None,
+        regions: Optional[Iterable[str]] = None,
+        categories: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """
+        Silver file discovery. Uses the manifest (single read, supports
+        data skipping) and falls back to listing the directory.
+        """
         if not os.path.exists(self.silver_dir):
-            return
+            return []
+
+        if self.silver_manifest.exists():
+            return self.silver_manifest.select(min_month, max_month, regions, categories)
 
-        files = sorted(glob.glob(os.path.join(self.silver_dir, "*.csv")))
+        return sorted(glob.glob(os.path.join(self.silver_dir, "*.csv")))
+
+    def pending_silver_files(self, **filters) -> List[str]:
         cp = self.silver_cp.get()
+        return [
+            path for path in self.list_silver_files(**filters)
+            if not cp.file or path > cp.file
+        ]
 
-        for path in files:
-            if cp.file and path <= cp.file:
-                continue
+    def read_silver_tables(self, files: Optional[List[str]] = None, **filters) -> Iterator[Dict]:
+        """
+        Like read_silver_files, but each file is parsed by pyarrow into a
+        Table typed as normalize_silver_row would type it.
+        """
+        for path in self.pending_silver_files(**filters) if files is None else files:
+            yield {
+                "file": path,
+                "table": self.read_silver_table(path)
+            }
+
+    @staticmethod
+    def read_silver_table(path: str, columns: Optional[List[str]] = None):
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f), [])
+
+        column_types = {name: pa.type_for_alias(SILVER_TYPES.get(name, "string")) for name in header}
+        return pa_csv.read_csv(
+            path,
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(column_types=column_types, include_columns=columns)
+        )
 
+    def read_silver_files(self, files: Optional[List[str]] = None, **filters) -> Iterator[Dict]:
+        """
+        files: explicit Silver files (late files) instead of the pending ones.
+        """
+        for path in self.pending_silver_files(**filters) if files is None else files:
             with open(path, "r", newline="", encoding="utf-8") as f:
                 reader = csv.DictReader(f)
                 rows = list(reader)
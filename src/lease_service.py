@@ -0,0 +1,220 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+
+BRONZE = "bronze"
+MERGE = "merge"
+MERGE_ITEM = "__gold_merge__"
+
+
+def lease_path(output_dir: str) -> str:
+    return os.path.join(output_dir, "coordination", "leases.db")
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaseService:
+    """
+    Work distribution over a SQLite lease table shared by several workers
+    (processes or hosts on a shared filesystem).
+
+    - register(): every worker adds the Bronze files it sees (idempotent)
+    - claim(): hands out one pending item, or one whose lease expired
+      because its owner stopped heartbeating
+    - heartbeat() / complete(): only succeed for the current owner
+
+    The single Gold merge is a lease of its own, claimable once every
+    Bronze item is done. Expiry compares wall clocks, so lease_seconds
+    must be well above the clock skew between hosts.
+    """
+
+    def __init__(self, path: str, worker_id: str, lease_seconds: float = 60.0, timeout: float = 60.0):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.path = path
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.timeout = timeout
+
+        # autocommit; writes use explicit BEGIN IMMEDIATE transactions
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self._init_table()
+
+    def _init_table(self):
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS leases (
+                item TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                owner TEXT,
+                expires_at REAL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+
+    @contextmanager
+    def _transaction(self):
+        # takes the write lock up front, so check-then-update is atomic
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    # -------------------------
+    # WORK ITEMS
+    # -------------------------
+    def register(self, items: Iterable[str]) -> int:
+        """
+        Adds new items as pending. New work invalidates a finished merge.
+        """
+        with self._transaction():
+            added = 0
+            for item in items:
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO leases (item, kind, status) VALUES (?, ?, 'pending')",
+                    (item, BRONZE)
+                )
+                added += cur.rowcount
+
+            self.conn.execute(
+                "INSERT OR IGNORE INTO leases (item, kind, status) VALUES (?, ?, 'pending')",
+                (MERGE_ITEM, MERGE)
+            )
+            if added:
+                self.conn.execute(
+                    "UPDATE leases SET status = 'pending', owner = NULL WHERE item = ?",
+                    (MERGE_ITEM,)
+                )
+
+        return added
+
+    def claim(self) -> Optional[str]:
+        with self._transaction():
+            row = self.conn.execute(
+                """
+                SELECT item FROM leases
+                WHERE kind = ? AND (status = 'pending' OR (status = 'leased' AND expires_at < ?))
+                ORDER BY item LIMIT 1
+                """,
+                (BRONZE, time.time())
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            self._take(row[0])
+            return row[0]
+
+    def claim_merge(self) -> bool:
+        """
+        True for exactly one worker once all Bronze items are done
+        (or again if that worker's merge lease expired).
+        """
+        with self._transaction():
+            if self._remaining() or not self._claimable(MERGE_ITEM):
+                return False
+
+            self._take(MERGE_ITEM)
+            return True
+
+    def _claimable(self, item: str) -> bool:
+        row = self.conn.execute(
+            """
+            SELECT 1 FROM leases
+            WHERE item = ? AND (status = 'pending' OR (status = 'leased' AND expires_at < ?))
+            """,
+            (item, time.time())
+        ).fetchone()
+        return row is not None
+
+    def _take(self, item: str):
+        self.conn.execute(
+            """
+            UPDATE leases
+            SET status = 'leased', owner = ?, expires_at = ?, attempts = attempts + 1
+            WHERE item = ?
+            """,
+            (self.worker_id, time.time() + self.lease_seconds, item)
+        )
+
+    def heartbeat(self, item: str) -> bool:
+        """
+        Extends the lease. False means it expired and was taken over.
+        """
+        with self._transaction():
+            cur = self.conn.execute(
+                """
+                UPDATE leases SET expires_at = ?
+                WHERE item = ? AND owner = ? AND status = 'leased'
+                """,
+                (time.time() + self.lease_seconds, item, self.worker_id)
+            )
+        return cur.rowcount == 1
+
+    def complete(self, item: str) -> bool:
+        with self._transaction():
+            cur = self.conn.execute(
+                """
+                UPDATE leases SET status = 'done', expires_at = NULL
+                WHERE item = ? AND owner = ? AND status = 'leased'
+                """,
+                (item, self.worker_id)
+            )
+        return cur.rowcount == 1
+
+    # -------------------------
+    # STATUS
+    # -------------------------
+    def _remaining(self) -> int:
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM leases WHERE kind = ? AND status != 'done'",
+            (BRONZE,)
+        ).fetchone()[0]
+
+    def all_done(self) -> bool:
+        return self._remaining() == 0
+
+    def status(self, item: str) -> Optional[str]:
+        row = self.conn.execute("SELECT status FROM leases WHERE item = ?", (item,)).fetchone()
+        return row[0] if row else None
+
+    @contextmanager
+    def keep_alive(self, item: str, interval: Optional[float] = None):
+        """
+        Heartbeats item from a background thread while the block runs.
+        The thread uses its own connection (sqlite3 connections are per thread).
+        """
+        interval = interval or self.lease_seconds / 3
+        stop = threading.Event()
+
+        def beat():
+            leases = LeaseService(self.path, self.worker_id, self.lease_seconds, self.timeout)
+            try:
+                while not stop.wait(interval):
+                    if not leases.heartbeat(item):
+                        return
+            finally:
+                leases.close()
+
+        thread = threading.Thread(target=beat, name=f"lease-{item}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,155 @@
+import csv
+import glob
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+
+def manifest_path(output_dir: str) -> str:
+    return os.path.join(output_dir, "manifest", "silver.jsonl")
+
+
+class SilverManifest:
+    """
+    Append-only manifest of Silver chunk files.
+
+    One JSON line per chunk write, carrying per-file statistics:
+      - row_count, byte_size
+      - min/max sale_month
+      - distinct regions / categories
+      - source bronze file
+
+    A later line for the same file supersedes earlier ones, so rewriting
+    a chunk on replay stays idempotent.
+    """
+
+    def __init__(self, silver_dir: str, path: str):
+        self.silver_dir = silver_dir
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    # -------------------------
+    # WRITE
+    # -------------------------
+    def record(self, silver_path: str, source_file: str, chunk_index: int, rows: List[Dict]):
+        entry = self.build_entry(silver_path, source_file, chunk_index, rows)
+
+        # single write of a full line so concurrent appenders do not interleave
+        line = (json.dumps(entry, sort_keys=True) + "\n").encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def build_entry(silver_path: str, source_file: Optional[str], chunk_index: int, rows: List[Dict]) -> Dict:
+        months = [r["sale_month"] for r in rows if r.get("sale_month")]
+
+        return {
+            "file": os.path.basename(silver_path),
+            "source_file": source_file,
+            "chunk_index": chunk_index,
+            "row_count": len(rows),
+            "byte_size": os.path.getsize(silver_path),
+            "min_sale_month": min(months) if months else None,
+            "max_sale_month": max(months) if months else None,
+            "regions": sorted({r["region"] for r in rows if r.get("region")}),
+            "categories": sorted({r["category"] for r in rows if r.get("category")}),
+        }
+
+    def bootstrap(self):
+        """
+        Builds the manifest from Silver files written before it existed.
+        Runs once; later writes only append. An empty manifest is created
+        too, so worker processes appending later never race a bootstrap.
+        """
+        if self.exists():
+            return
+
+        files = sorted(glob.glob(os.path.join(self.silver_dir, "*.csv")))
+
+        # created here rather than in __init__, so readers (--dry-run) write nothing
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as out:
+            for path in files:
+                with open(path, "r", newline="", encoding="utf-8") as f:
+                    rows = list(csv.DictReader(f))
+                # source file / chunk index are not recoverable from legacy files
+                entry = self.build_entry(path, None, -1, rows)
+                out.write(json.dumps(entry, sort_keys=True) + "\n")
+
+    def reconcile(self) -> int:
+        """
+        Indexes Silver files that have no manifest entry (e.g. a line lost
+        from an append on a network filesystem). Returns the number added.
+        """
+        indexed = {entry["file"] for entry in self.entries()}
+        missing = [
+            path for path in sorted(glob.glob(os.path.join(self.silver_dir, "*.csv")))
+            if os.path.basename(path) not in indexed
+        ]
+
+        for path in missing:
+            with open(path, "r", newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+            self.record(path, None, -1, rows)
+
+        return len(missing)
+
+    # -------------------------
+    # READ
+    # -------------------------
+    def entries(self) -> List[Dict]:
+        if not self.exists():
+            return []
+
+        latest = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # torn trailing line from an interrupted append
+                    continue
+                latest[entry["file"]] = entry
+
+        return [latest[name] for name in sorted(latest)]
+
+    def select(
+        self,
+        min_month: Optional[str] = None,
+        max_month: Optional[str] = None,
+        regions: Optional[Iterable[str]] = None,
+        categories: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """
+        Returns sorted Silver file paths whose statistics may contain rows
+        matching the filters. Files are pruned, rows are not.
+        """
+        regions = set(regions) if regions else None
+        categories = set(categories) if categories else None
+
+        selected = []
+        for entry in self.entries():
+            if entry["row_count"] == 0:
+                continue
+            if min_month and entry["max_sale_month"] and entry["max_sale_month"] < min_month:
+                continue
+            if max_month and entry["min_sale_month"] and entry["min_sale_month"] > max_month:
+                continue
+            if regions is not None and not regions.intersection(entry["regions"]):
+                continue
+            if categories is not None and not categories.intersection(entry["categories"]):
+                continue
+
+            path = os.path.join(self.silver_dir, entry["file"])
+            if os.path.exists(path):
+                selected.append(path)
+
+        return selected
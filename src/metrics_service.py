@@ -1,4 +1,6 @@
+import time
 from collections import defaultdict
+from contextlib import contextmanager
 
 
 class MetricsService:
@@ -13,9 +15,21 @@ class MetricsService:
         self.rows_rejected = 0
         self.rejection_reasons = defaultdict(int)
         self.rows_deduplicated = 0
+        # dropped in Phase 1, before Silver (also counted in rows_deduplicated)
+        self.rows_deduplicated_early = 0
+        self.profiles = []
+        self.cache_stats = {}
+        # Phase 1 per-chunk throughput and memory (tuning profile)
+        self.chunk_stats = []
+        # seconds per stage (clean, dedup, ...) and per phase (bronze, silver, gold)
+        self.stage_seconds = defaultdict(float)
 
-    def increment_deduplicated(self):
-        self.rows_deduplicated += 1
+    def increment_deduplicated(self, count: int = 1):
+        self.rows_deduplicated += count
+
+    def increment_deduplicated_early(self, count: int = 1):
+        self.rows_deduplicated += count
+        self.rows_deduplicated_early += count
 
     def increment_clean_read(self, count: int = 1):
         self.cleaned_rows += count
@@ -31,19 +45,85 @@ class MetricsService:
         for reason in reasons:
             self.rejection_reasons[reason] += 1
 
-    def summary(self) -> dict:
+    def record_profile(self, chunk: str, stage: str, result: dict):
+        """
+        result: seconds, peak_bytes and top_allocations of one profiled stage.
+        """
+        self.profiles.append({"chunk": chunk, "stage": stage, **result})
+
+    def record_chunk(self, rows: int, seconds: float, rss_bytes=None):
+        """
+        One Bronze chunk cleaned and written: rows in, seconds taken and
+        the process RSS afterwards (None where unavailable).
+        """
+        self.chunk_stats.append({"rows": rows, "seconds": seconds, "rss_bytes": rss_bytes})
+
+    def record_stage(self, stage: str, seconds: float):
+        self.stage_seconds[stage] += seconds
+
+    @contextmanager
+    def timed(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[stage] += time.perf_counter() - start
+
+    def record_cache_stats(self, stats: dict):
+        """
+        stats: {cache name: (hits, misses)}; added to stats already recorded
+        (one cleaner per worker process).
+        """
+        for name, (hits, misses) in stats.items():
+            own_hits, own_misses = self.cache_stats.get(name, (0, 0))
+            self.cache_stats[name] = (own_hits + hits, own_misses + misses)
+
+    def merge(self, other: "MetricsService"):
+        """
+        Adds the counters of a worker process's metrics.
+        """
+        self.rows_read += other.rows_read
+        self.cleaned_rows += other.cleaned_rows
+        self.rows_successful += other.rows_successful
+        self.rows_rejected += other.rows_rejected
+        self.rows_deduplicated += other.rows_deduplicated
+        self.rows_deduplicated_early += other.rows_deduplicated_early
+
+        for reason, count in other.rejection_reasons.items():
+            self.rejection_reasons[reason] += count
+
+        self.record_cache_stats(other.cache_stats)
+        self.profiles.extend(other.profiles)
+        self.chunk_stats.extend(other.chunk_stats)
+        for stage, seconds in other.stage_seconds.items():
+            self.stage_seconds[stage] += seconds
+
+    def cache_hit_rates(self) -> dict:
         return {
+            name: hits / (hits + misses) if hits + misses else 0.0
+            for name, (hits, misses) in self.cache_stats.items()
+        }
+
+    def summary(self) -> dict:
+        summary = {
             "rows_read": self.rows_read,
             "rows_successful": self.rows_successful,
             "rows_rejected": self.rows_rejected,
             "rejection_reasons": dict(self.rejection_reasons)
         }
+        if self.cache_stats:
+            summary["cache_hit_rates"] = self.cache_hit_rates()
+        if self.profiles:
+            summary["profiles"] = self.profiles
+        return summary
 
     def log_summary(self, logger):
         logger.info(f"Rows read from bronze: {self.cleaned_rows}")
         logger.info(f"Rows read from silver: {self.rows_read}")
         logger.info(f"Rows successful: {self.rows_successful}")
         logger.info(f"Rows rejected: {self.rows_rejected}")
+        if self.rows_deduplicated_early:
+            logger.info(f"Duplicate rows dropped before Silver: {self.rows_deduplicated_early}")
 
         if self.rejection_reasons:
             logger.info("Top rejection reasons:")
@@ -53,3 +133,15 @@ class MetricsService:
                 reverse=True
             ):
                 logger.info(f"  {reason}: {count}")
+
+        for name, rate in self.cache_hit_rates().items():
+            hits, misses = self.cache_stats[name]
+            logger.info(f"Normalize cache {name}: {rate:.1%} hit rate ({hits} hits, {misses} misses)")
+
+        for profile in self.profiles:
+            top = profile["top_allocations"][:1]
+            site = f", top allocation {top[0]['site']} ({top[0]['bytes']} B)" if top else ""
+            logger.info(
+                f"Profiled {profile['chunk']} [{profile['stage']}]: "
+                f"{profile['seconds']:.3f}s, peak {profile['peak_bytes']} B{site}"
+            )
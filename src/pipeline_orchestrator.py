@@ -1,6 +1,12 @@
+import argparse
+import csv
+import itertools
 import logging
+import signal
 import sys
 import os
+import threading
+import time
 
 from src.config_service import Config, ConfigError
 from src.checkpoint_service import Checkpoint, CheckpointService
@@ -9,7 +15,17 @@ from src.clean_transform_service import CleanTransformService
 from src.metrics_service import MetricsService
 from src.aggregation_service import AggregationService
 from src.writer_service import WriterService
-from src.dedup_service import DedupService
+from src.dedup_service import DedupService, drop_duplicates, store_path
+from src.batch_dedup_service import SortMergeDedup
+from src.gold_rebuild_service import GoldRebuildService
+from src.background_io_service import Prefetcher, WriteBehindWriter
+from src.watch_service import WatchService
+from src.byte_range_service import clean_byte_range
+from src.handoff_service import ArrowHandoff, clean_handoff_chunk, init_clean_worker, sweep_stale
+from src.profiling_service import STAGES, ChunkProfiler
+from src.lease_service import MERGE_ITEM, LeaseService, default_worker_id, lease_path
+from src.tuning_service import TuningService, rss_bytes
+from src.progress_service import ProgressReporter
 
 def setup_logger():
     logging.basicConfig(
@@ -21,108 +37,868 @@ def setup_logger():
     return logging.getLogger("pipeline")
 
 
-def run_pipeline(config_path: str):
-    logger = setup_logger()
-
+def load_config(config_path: str, logger) -> Config:
     try:
-        config = Config(config_path)
+        return Config(config_path)
     except ConfigError as e:
         logger.error(f"Config error: {e}")
         sys.exit(1)
 
-    bronze_cp = CheckpointService(path=config.bronze_checkpoint, enabled=config.enable_checkpoint)
-    silver_cp = CheckpointService(path=config.silver_checkpoint, enabled=config.enable_checkpoint)
 
+class Pipeline:
+    """
+    Owns the services for one process. Batch runs use it once; watch mode
+    keeps it (SQLite connections, checkpoints, aggregation state) warm
+    across micro-batches.
+    """
 
-    ingestion = IngestionService(config, bronze_cp, silver_cp)
-    cleaner = CleanTransformService()
-    metrics = MetricsService()
-    aggregator = AggregationService(config.anomaly_top_n)
+    def __init__(self, config: Config, logger, use_checkpoints: bool = True, profiler: ChunkProfiler = None):
+        self.config = config
+        self.logger = logger
+        # created here rather than by Config, so --dry-run writes nothing
+        os.makedirs(config.output_dir, exist_ok=True)
+        self.profiler = profiler or ChunkProfiler(config.output_dir)
+
+        # distributed workers track progress in the lease table instead
+        checkpoint_options = dict(
+            enabled=config.enable_checkpoint and use_checkpoints,
+            mode=config.checkpoint_mode,
+            commit_every=config.checkpoint_commit_every,
+            commit_interval=config.checkpoint_commit_interval
+        )
+        self.bronze_cp = CheckpointService(path=config.bronze_checkpoint, **checkpoint_options)
+        self.silver_cp = CheckpointService(path=config.silver_checkpoint, **checkpoint_options)
+
+        self.ingestion = IngestionService(config, self.bronze_cp, self.silver_cp)
+        self.cleaner = CleanTransformService(config.normalize_cache_size)
+        self.metrics = MetricsService()
+        self.progress = ProgressReporter(logger, self.metrics, config.metrics_textfile, config.progress_interval)
+        self._bronze_offsets = {}
+        # aggregation state past [MEMORY] max_aggregation_mb spills here
+        self.aggregation_options = dict(
+            spill_dir=os.path.join(config.output_dir, "agg_spill"),
+            max_state_mb=config.max_aggregation_mb,
+            check_every=config.flush_interval
+        )
+        sweep_stale(self.aggregation_options["spill_dir"])
+        self.aggregator = AggregationService(config.anomaly_top_n, **self.aggregation_options)
+        self.pending_gold = False
+
+        self.dedup_path = store_path(config.output_dir)
+        self.dedup = DedupService(path=self.dedup_path, journal_mode=config.dedup_journal_mode)
+
+        self.writer = WriterService(
+            config.output_dir,
+            config.output_format,
+            orc_stripe_size=config.orc_stripe_size,
+            orc_compression=config.orc_compression,
+            row_group_size=config.row_group_size,
+            parquet_compression=config.parquet_compression,
+            use_dictionary=config.use_dictionary
+        )
 
-    dedup = DedupService(path=os.path.join(config.output_dir, "dedup", "order_id.db"))
+        # every Phase 1 run is recorded; chunk_size / workers = auto read it back
+        self.tuning = TuningService(config.output_dir, config.max_chunk_mb)
+        if config.auto_chunk_size or config.auto_workers:
+            self.apply_tuning()
 
-    writer = WriterService(config.output_dir, config.output_format)
+    def apply_tuning(self):
+        """
+        Resolves chunk_size / workers = auto from the tuning profile, or by
+        a calibration pass over pending Bronze rows without history.
+        """
+        config, logger = self.config, self.logger
+        fixed_chunk_size = None if config.auto_chunk_size else config.chunk_size
+        fixed_workers = None if config.auto_workers else config.workers
+
+        tuning = self.tuning.choose(fixed_chunk_size, fixed_workers)
+        if tuning is None:
+            logger.info("No tuning history for this host, calibrating on a Bronze sample")
+            # own cleaner: calibration must not count towards the run's cache stats
+            cleaner = CleanTransformService(config.normalize_cache_size)
+            clean = cleaner.process_record if self.ingestion.schema else cleaner.process_row
+            tuning = self.tuning.calibrate(self.ingestion.sample_bronze_rows, clean, fixed_workers)
+
+        if tuning is None:
+            logger.info(
+                f"Auto-tuning: no history and no pending Bronze rows, "
+                f"keeping chunk_size={config.chunk_size}, workers={config.workers}"
+            )
+            return
+
+        if config.auto_chunk_size:
+            config.chunk_size = tuning.chunk_size
+        if config.auto_workers:
+            config.workers = tuning.workers
+        logger.info(f"Auto-tuned chunk_size={config.chunk_size}, workers={config.workers}: {tuning.reason}")
 
     # -------------------------
     # Phase 1: Bronze → Silver
     # -------------------------
-    logger.info("Starting Bronze → Silver phase")
+    def run_bronze_phase(self, files=None) -> bool:
+        config, logger = self.config, self.logger
+        logger.info("Starting Bronze → Silver phase")
+
+        start = time.monotonic()
+        first_chunk = len(self.metrics.chunk_stats)
+
+        # total work: the pending files' sizes; done: bytes read up to the current chunk
+        pending = [path for path in self.ingestion.pending_bronze_files() if files is None or path in files]
+        sizes = [os.path.getsize(path) for path in pending]
+        self._bronze_offsets = dict(zip(pending, itertools.accumulate([0] + sizes)))
+        self.progress.start_phase("bronze", sum(sizes), self.metrics.cleaned_rows)
+
+        workers = 1
+        if config.input_type == "file" and config.workers > 1 and self._splits(self.ingestion.bronze_files[0]):
+            workers = config.workers
+            bronze_processed = self.run_bronze_ranges(self.ingestion.bronze_files[0], workers)
+        elif config.input_type == "directory" and config.workers > 1:
+            workers = config.workers
+            bronze_processed = self.run_bronze_parallel(files)
+        else:
+            bronze_processed = self.run_bronze_serial(files)
+
+        self.progress.finish_phase("bronze", self.metrics.cleaned_rows)
+        self.tuning.record_run(
+            config.chunk_size,
+            workers,
+            time.monotonic() - start,
+            self.metrics.chunk_stats[first_chunk:]
+        )
+        return bronze_processed
+
+    def _splits(self, source: str) -> bool:
+        # a file already started serially is finished serially
+        return self.bronze_cp.get().file != source and self.ingestion.can_split(source)
+
+    def _bronze_progress(self, payload):
+        done = self._bronze_offsets.get(payload["file"], 0) + payload["offset"]
+        self.progress.update("bronze", done, self.metrics.cleaned_rows)
+
+    def run_bronze_serial(self, files=None) -> bool:
+        config, logger = self.config, self.logger
+
+        bronze_chunks = self.ingestion.read_bronze_chunks(files)
+        if config.prefetch_chunks:
+            bronze_chunks = Prefetcher(bronze_chunks, depth=config.prefetch_chunks)
+
+        write_behind = None
+        if config.write_behind_chunks:
+            write_behind = WriteBehindWriter(self.writer, self.bronze_cp, max_in_flight=config.write_behind_chunks)
+
+        bronze_processed = False
+        try:
+            for payload in bronze_chunks:
+                chunk_start = time.perf_counter()
+                bronze_processed = True
+                logger.info(f"Processing file={payload['file']}, chunk={payload['chunk_index']}, rows={len(payload['rows'])}")
+
+                profile = self.profiler.start_chunk(
+                    f"bronze_{os.path.basename(payload['file'])}_c{payload['chunk_index']}"
+                )
+                silver_rows = self._clean_chunk(payload["rows"], profile)
+                self._bronze_progress(payload)
+
+                if write_behind and profile is None:
+                    write_behind.submit(payload["file"], payload["chunk_index"], silver_rows, payload["chunk_size"])
+                    self.metrics.record_chunk(len(payload["rows"]), time.perf_counter() - chunk_start, rss_bytes())
+                    continue
+
+                if write_behind:
+                    # a profiled chunk is written inline, after the queued ones
+                    write_behind.flush()
+
+                with self.profiler.stage(profile, "silver_write"), self.metrics.timed("silver_write"):
+                    self.writer.write_silver_chunk(
+                        payload["file"],
+                        payload["chunk_index"],
+                        silver_rows
+                    )
+
+                self.bronze_cp.save(
+                    Checkpoint(
+                        file=payload["file"],
+                        chunk_index=payload["chunk_index"] + 1,
+                        chunk_size=payload["chunk_size"]
+                    )
+                )
+                self.metrics.record_chunk(len(payload["rows"]), time.perf_counter() - chunk_start, rss_bytes())
+                self.profiler.finish_chunk(profile, self.metrics)
+        except BaseException as e:
+            # the chunk loop's error propagates; a write-behind error behind
+            # it (other than the same one, re-raised) is only logged
+            if write_behind:
+                try:
+                    write_behind.close()
+                except BaseException as write_error:
+                    if write_error is not e:
+                        logger.error(f"Silver write-behind failed too: {write_error!r}")
+            raise
+
+        # Silver must be complete and committed before Phase 2 reads it
+        if write_behind:
+            write_behind.close()
+
+        self.bronze_cp.commit()
+
+        if not bronze_processed:
+            logger.info("No Bronze data to process (checkpoint up-to-date)")
+        return bronze_processed
+
+    def _clean_chunk(self, rows, profile) -> list:
+        # schema-compiled ingestion yields record tuples instead of dicts
+        clean = self.cleaner.process_record if self.ingestion.schema else self.cleaner.process_row
 
-    bronze_processed = False
-    for payload in ingestion.read_bronze_chunks():
         silver_rows = []
-        bronze_processed = True
-        logger.info(f"Processing file={payload['file']}, chunk={payload['chunk_index']}, rows={len(payload['rows'])}")
+        with self.profiler.stage(profile, "clean"), self.metrics.timed("clean"):
+            for row in rows:
+                self.metrics.increment_clean_read()
+                result = clean(row)
 
-        for row in payload["rows"]:
-            metrics.increment_clean_read()
-            result = cleaner.process_row(row)
+                if not result["is_valid"]:
+                    self.metrics.increment_rejected(result["errors"])
+                    continue
 
-            if not result["is_valid"]:
-                metrics.increment_rejected(result["errors"])
-                continue
+                self.metrics.increment_success()
+                silver_rows.append(result["clean_row"])
 
-            metrics.increment_success()
-            silver_rows.append(result["clean_row"])
+        if self.config.dedup_early:
+            with self.profiler.stage(profile, "dedup"), self.metrics.timed("dedup"):
+                silver_rows, dropped = drop_duplicates(silver_rows, self.dedup)
+            self.metrics.increment_deduplicated_early(dropped)
 
-        writer.write_silver_chunk(
-            payload["file"],
-            payload["chunk_index"],
-            silver_rows
-        )
+        return silver_rows
 
-        bronze_cp.save(
-            Checkpoint(
-                file=payload["file"],
-                chunk_index=payload["chunk_index"] + 1
+    def run_bronze_late(self, files) -> list:
+        """
+        Phase 1 for files that sort before the Bronze checkpoint (backfilled
+        partitions in watch mode): each is read from its first row and
+        cleaned serially, and the checkpoint is left where it is. Returns
+        the Silver files written, for run_silver_phase(files).
+        """
+        silver_files = []
+        for payload in self.ingestion.read_bronze_chunks(files, resume=False):
+            chunk_start = time.perf_counter()
+            self.logger.info(
+                f"Processing late file={payload['file']}, chunk={payload['chunk_index']}, rows={len(payload['rows'])}"
             )
-        )
-    
-    if not bronze_processed:
-        logger.info("No Bronze data to process (checkpoint up-to-date)")
+
+            profile = self.profiler.start_chunk(
+                f"bronze_{os.path.basename(payload['file'])}_c{payload['chunk_index']}"
+            )
+            silver_rows = self._clean_chunk(payload["rows"], profile)
+
+            with self.profiler.stage(profile, "silver_write"), self.metrics.timed("silver_write"):
+                path = self.writer.write_silver_chunk(payload["file"], payload["chunk_index"], silver_rows)
+            if path:
+                silver_files.append(path)
+
+            self.metrics.record_chunk(len(payload["rows"]), time.perf_counter() - chunk_start, rss_bytes())
+            self.profiler.finish_chunk(profile, self.metrics)
+
+        return silver_files
+
+    def run_bronze_parallel(self, files=None) -> bool:
+        """
+        Phase 1 with cleaning on worker processes. Each chunk is handed over
+        as a memory-mapped Arrow IPC file (only its path is pickled); workers
+        clean it and write it to Silver. The Bronze checkpoint advances in
+        chunk order, as chunks complete.
+        """
+        from collections import deque
+        from concurrent.futures import ProcessPoolExecutor
+
+        config, logger = self.config, self.logger
+
+        bronze_chunks = self.ingestion.read_bronze_chunks(files)
+        if config.prefetch_chunks:
+            bronze_chunks = Prefetcher(bronze_chunks, depth=config.prefetch_chunks)
+
+        in_flight = deque()
+        max_in_flight = 2 * config.workers
+
+        def commit_oldest():
+            source_file, chunk_index, chunk_size, future = in_flight.popleft()
+            self.metrics.merge(future.result())
+            self.bronze_cp.save(Checkpoint(file=source_file, chunk_index=chunk_index + 1, chunk_size=chunk_size))
+
+        bronze_processed = False
+        with ArrowHandoff(config.handoff_dir, self.ingestion.schema) as handoff, ProcessPoolExecutor(
+            max_workers=config.workers,
+            initializer=init_clean_worker,
+            initargs=(config.normalize_cache_size, config.output_dir, config.dedup_early, self.profiler)
+        ) as pool:
+            for payload in bronze_chunks:
+                bronze_processed = True
+                logger.info(f"Processing file={payload['file']}, chunk={payload['chunk_index']}, rows={len(payload['rows'])}")
+
+                # sampled here, profiled on the worker
+                profile = self.profiler.start_chunk(
+                    f"bronze_{os.path.basename(payload['file'])}_c{payload['chunk_index']}"
+                )
+                path = handoff.put(payload["rows"])
+                future = pool.submit(
+                    clean_handoff_chunk, path, payload["file"], payload["chunk_index"], profile and profile.label
+                )
+                in_flight.append((payload["file"], payload["chunk_index"], payload["chunk_size"], future))
+                self._bronze_progress(payload)
+
+                if len(in_flight) >= max_in_flight:
+                    commit_oldest()
+
+            while in_flight:
+                commit_oldest()
+
+        self.bronze_cp.commit()
+
+        if not bronze_processed:
+            logger.info("No Bronze data to process (checkpoint up-to-date)")
+        return bronze_processed
+
+    def run_bronze_ranges(self, source: str, workers: int) -> bool:
+        """
+        Phase 1 for one large file: split into record-aligned byte ranges,
+        each parsed, cleaned and written to Silver by a worker process.
+        """
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            plan = self.ingestion.range_plan(source, workers, pool)
+            pending = [i for i in range(len(plan.ranges)) if i not in plan.done]
+            if not pending:
+                self.logger.info("No Bronze data to process (all byte ranges done)")
+                return False
+
+            self.logger.info(f"Processing {source} as {len(pending)}/{len(plan.ranges)} byte ranges on {workers} workers")
+            futures = [
+                pool.submit(clean_byte_range, {
+                    "index": i,
+                    "source": source,
+                    "start": plan.ranges[i][0],
+                    "end": plan.ranges[i][1],
+                    "header": plan.header,
+                    "schema_file": self.config.schema_file,
+                    "chunk_size": self.config.chunk_size,
+                    "cache_size": self.config.normalize_cache_size,
+                    "output_dir": self.config.output_dir,
+                    "checkpoint_path": plan.checkpoint_path(i),
+                    "early_dedup": self.config.dedup_early,
+                    "profiler": self.profiler,
+                })
+                for i in pending
+            ]
+
+            for future in as_completed(futures):
+                index, metrics = future.result()
+                self.metrics.merge(metrics)
+                plan.mark_done(index)
+                self.logger.info(f"Byte range {index} done ({len(plan.done)}/{len(plan.ranges)})")
+                done = sum(plan.ranges[i][1] - plan.ranges[i][0] for i in plan.done)
+                self.progress.update("bronze", done, self.metrics.cleaned_rows)
+
+        return True
 
     # -------------------------
     # Phase 2: Silver → Gold
     # -------------------------
-    logger.info("Starting Silver → Gold phase")
-    silver_processed = False
-
-    for payload in ingestion.read_silver_files():
-        silver_processed = True
-        
-        logger.info(f"Processing file={payload['file']}, rows={len(payload['rows'])}")
-        for row in payload["rows"]:
-            metrics.increment_read()
-            order_id = row["order_id"]
-            if dedup.is_duplicate(order_id):
-                metrics.increment_deduplicated()
+    def run_silver_phase(self, files=None) -> bool:
+        """
+        files: Silver files to process instead of those after the Silver
+        checkpoint (late files, see run_bronze_late); the checkpoint is
+        then left alone.
+        """
+        config, logger = self.config, self.logger
+        logger.info("Starting Silver → Gold phase")
+
+        pending = self.ingestion.pending_silver_files() if files is None else files
+        self._silver_sizes = {path: os.path.getsize(path) for path in pending}
+        self._silver_done = 0
+        self.progress.start_phase("silver", sum(self._silver_sizes.values()), self.metrics.rows_read)
+
+        if config.dedup_strategy == "sort_merge":
+            silver_processed = self.run_silver_sort_merge(files)
+        else:
+            silver_processed = self.run_silver_lookup(files)
+
+        self.progress.finish_phase("silver", self.metrics.rows_read)
+        return silver_processed
+
+    def _silver_progress(self, path: str):
+        self._silver_done += self._silver_sizes.get(path, 0)
+        self.progress.update("silver", self._silver_done, self.metrics.rows_read)
+
+    def run_silver_lookup(self, files=None) -> bool:
+        config, logger = self.config, self.logger
+        silver_processed = False
+
+        vectorized = config.vectorized_aggregation
+        if vectorized:
+            silver_files = self.ingestion.read_silver_tables(files)
+        else:
+            silver_files = self.ingestion.read_silver_files(files)
+        if config.prefetch_chunks:
+            silver_files = Prefetcher(silver_files, depth=config.prefetch_chunks)
+
+        for payload in silver_files:
+            silver_processed = True
+
+            if vectorized:
+                order_ids = payload["table"].column("order_id").to_pylist()
+            else:
+                order_ids = [row["order_id"] for row in payload["rows"]]
+
+            logger.info(f"Processing file={payload['file']}, rows={len(order_ids)}")
+            profile = self.profiler.start_chunk(f"silver_{os.path.basename(payload['file'])}")
+
+            keep = []
+            with self.profiler.stage(profile, "dedup"), self.metrics.timed("dedup"):
+                for order_id in order_ids:
+                    self.metrics.increment_read()
+                    if self.dedup.is_duplicate(order_id):
+                        self.metrics.increment_deduplicated()
+                        keep.append(False)
+                        continue
+
+                    self.dedup.mark_seen(order_id)
+                    keep.append(True)
+
+            with self.profiler.stage(profile, "aggregate"), self.metrics.timed("aggregate"):
+                if vectorized:
+                    import pyarrow as pa
+
+                    table = payload["table"]
+                    if not all(keep):
+                        table = table.filter(pa.array(keep))
+                    self.aggregator.process_batch(table)
+                else:
+                    for row, kept in zip(payload["rows"], keep):
+                        if kept:
+                            self.aggregator.process(CleanTransformService.normalize_silver_row(row))
+
+            if files is None:
+                self.silver_cp.save(Checkpoint(file=payload["file"]))
+            self.profiler.finish_chunk(profile, self.metrics)
+            self._silver_progress(payload["file"])
+
+        self.silver_cp.commit()
+
+        if not silver_processed:
+            logger.info("No Silver data to process (checkpoint up-to-date)")
+        else:
+            self.pending_gold = True
+        return silver_processed
+
+    def run_silver_sort_merge(self, files=None) -> bool:
+        """
+        Phase 2 with batch dedup: all pending Silver files are deduplicated
+        together by sort-merge, then their surviving rows are aggregated in
+        file order (same result as per-row lookups).
+        """
+        config, logger = self.config, self.logger
+
+        late = files is not None
+        if not late:
+            files = self.ingestion.pending_silver_files()
+        if not files:
+            logger.info("No Silver data to process (checkpoint up-to-date)")
+            return False
+
+        logger.info(f"Deduplicating {len(files)} Silver files by sort-merge")
+        batch = SortMergeDedup(
+            self.dedup,
+            os.path.join(config.output_dir, "dedup", "sort_tmp"),
+            buffer_rows=config.dedup_sort_buffer_rows
+        )
+
+        def read_order_ids(path):
+            return self.ingestion.read_silver_table(path, ["order_id"]).column("order_id").to_pylist()
+
+        # the dedup pass spans all files; only the per-file aggregate step is profiled
+        for file_index, kept in batch.run(files, read_order_ids):
+            path = files[file_index]
+            logger.info(f"Processing file={path}, rows kept={len(kept)}")
+            self._silver_progress(path)
+            if not kept:
                 continue
 
-            dedup.mark_seen(order_id)
-            normalized = CleanTransformService.normalize_silver_row(row)
-            aggregator.process(normalized)
+            profile = self.profiler.start_chunk(f"silver_{os.path.basename(path)}")
+            with self.profiler.stage(profile, "aggregate"), self.metrics.timed("aggregate"):
+                if config.vectorized_aggregation:
+                    table = self.ingestion.read_silver_table(path)
+                    if len(kept) < table.num_rows:
+                        table = table.take(kept)
+                    self.aggregator.process_batch(table)
+                else:
+                    with open(path, "r", newline="", encoding="utf-8") as f:
+                        rows = list(csv.DictReader(f))
+                    for row_index in kept:
+                        self.aggregator.process(CleanTransformService.normalize_silver_row(rows[row_index]))
+            self.profiler.finish_chunk(profile, self.metrics)
+
+        self.metrics.increment_read(batch.rows_read)
+        self.metrics.increment_deduplicated(batch.duplicates)
+
+        if not late:
+            self.silver_cp.save(Checkpoint(file=files[-1]))
+            self.silver_cp.commit()
+        self.pending_gold = True
+        return True
+
+    def rebuild_gold(self, workers: int):
+        self.logger.info(f"Rebuilding Gold from all Silver files (workers={workers})")
+
+        silver_files = self.ingestion.list_silver_files()
+        self.progress.start_phase("silver", sum(os.path.getsize(path) for path in silver_files), self.metrics.rows_read)
+        rebuilder = GoldRebuildService(
+            self.config.output_dir,
+            self.dedup_path,
+            self.config.anomaly_top_n,
+            workers=workers,
+            aggregation_options=self.aggregation_options,
+            retention_days=self.config.dedup_retention_days or None
+        )
+        self.aggregator.close()
+        self.aggregator = rebuilder.rebuild(silver_files, self.metrics)
+        self.pending_gold = True
+        self.progress.finish_phase("silver", self.metrics.rows_read)
+
+        if silver_files:
+            self.silver_cp.save(Checkpoint(file=silver_files[-1]))
 
-        silver_cp.save(Checkpoint(file=payload["file"]))
-    
-    if not silver_processed:
-        logger.info("No Silver data to process (checkpoint up-to-date)")
     # -------------------------
-    # Gold (FULL OVERWRITE)
+    # Gold
     # -------------------------
-    logger.info("Writing Gold layer (full overwrite)")
+    def write_gold(self, full_refresh: bool = False):
+        self.logger.info("Writing Gold layer")
+        self.progress.start_phase("gold", 0)
+
+        spills = self.aggregator.spill_count()
+        if spills:
+            self.logger.info(f"Merging aggregation state spilled to disk {spills} time(s)")
+
+        final_tables = self.aggregator.finalize()
+        for name, rows in final_tables.items():
+            if rows:
+                self.writer.write_gold_table(name, rows, full_refresh=full_refresh)
+                self.logger.info(f"Wrote Gold table {name}")
+
+        self.pending_gold = False
+        self.progress.finish_phase("gold")
+
+    def close(self):
+        self.metrics.record_cache_stats(self.cleaner.cache_stats())
+        self.bronze_cp.close()
+        self.silver_cp.close()
+        self.dedup.close()
+        self.aggregator.close()
+        # final counters, including cache stats
+        self.progress.write_textfile()
+
+
+def run_pipeline(
+    config_path: str,
+    rebuild_gold: bool = False,
+    workers: int = None,
+    profile_sample: float = 0.0,
+    profile_stages=None
+):
+    logger = setup_logger()
+    config = load_config(config_path, logger)
+
+    profiler = ChunkProfiler(config.output_dir, profile_sample, profile_stages)
+    pipeline = Pipeline(config, logger, profiler=profiler)
+    try:
+        pipeline.run_bronze_phase()
+
+        if rebuild_gold:
+            pipeline.rebuild_gold(workers or config.workers)
+        else:
+            pipeline.run_silver_phase()
 
-    final_tables = aggregator.finalize()
-    for name, rows in final_tables.items():
-        if rows:
-            writer.write_gold_table(name, rows)
-            logger.info(f"Wrote Gold table {name}")
+        pipeline.write_gold(full_refresh=rebuild_gold)
+    finally:
+        pipeline.close()
 
-    metrics.log_summary(logger)
+    pipeline.metrics.log_summary(logger)
+    if profiler.enabled:
+        logger.info(f"Profiles written to {profiler.profile_dir}")
     logger.info("Pipeline complete")
 
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python pipeline_orchestrator.py <pipeline.conf>")
+def run_distributed(
+    config_path: str,
+    worker_id: str = None,
+    workers: int = None,
+    profile_sample: float = 0.0,
+    profile_stages=None
+):
+    """
+    One worker of a multi-node run sharing input_path and output_dir.
+
+    Workers claim Bronze files from the lease table and write their Silver
+    chunks; a file whose owner stops heartbeating is reclaimed and
+    reprocessed from its start (Silver chunk writes are idempotent).
+    Once every file is done, exactly one worker rebuilds Gold from all
+    of Silver.
+    """
+    logger = setup_logger()
+    config = load_config(config_path, logger)
+    worker_id = worker_id or default_worker_id()
+
+    # WAL keeps its index in shared memory, which hosts on NFS do not share
+    if config.dedup_journal_mode != "delete":
+        logger.error("Config error: [DEDUP] journal_mode must be 'delete' for --distributed (WAL is not safe on NFS)")
+        sys.exit(1)
+
+    # workers started in the same second get their own profile directory
+    profiler = ChunkProfiler(config.output_dir, profile_sample, profile_stages, run_name=worker_id)
+    pipeline = Pipeline(config, logger, use_checkpoints=False, profiler=profiler)
+    leases = LeaseService(lease_path(config.output_dir), worker_id, config.lease_seconds)
+
+    try:
+        added = leases.register(pipeline.ingestion.bronze_files)
+        logger.info(f"Worker {worker_id}: registered {added} new Bronze file(s)")
+
+        while True:
+            item = leases.claim()
+            if item is None:
+                if leases.all_done():
+                    break
+                # others still hold leases; retry in case one expires
+                time.sleep(config.lease_seconds / 3)
+                continue
+
+            logger.info(f"Worker {worker_id}: claimed {item}")
+            with leases.keep_alive(item):
+                pipeline.run_bronze_phase([item])
+
+            if not leases.complete(item):
+                logger.warning(f"Worker {worker_id}: lease on {item} was lost, another worker reprocessed it")
+
+        if leases.claim_merge():
+            logger.info(f"Worker {worker_id}: merging Gold")
+            with leases.keep_alive(MERGE_ITEM):
+                pipeline.ingestion.silver_manifest.reconcile()
+                pipeline.rebuild_gold(workers or config.workers)
+                pipeline.write_gold(full_refresh=True)
+            leases.complete(MERGE_ITEM)
+    finally:
+        leases.close()
+        pipeline.close()
+
+    pipeline.metrics.log_summary(logger)
+    if profiler.enabled:
+        logger.info(f"Profiles written to {profiler.profile_dir}")
+    logger.info(f"Worker {worker_id} complete")
+
+
+def dry_run(config_path: str):
+    """
+    Validates the config and reports pending work without writing any
+    output (no Writer, dedup store or Gold format libraries are loaded).
+    """
+    logger = setup_logger()
+    config = load_config(config_path, logger)
+
+    checkpoint_options = dict(enabled=config.enable_checkpoint, mode=config.checkpoint_mode, read_only=True)
+    bronze_cp = CheckpointService(path=config.bronze_checkpoint, **checkpoint_options)
+    silver_cp = CheckpointService(path=config.silver_checkpoint, **checkpoint_options)
+    ingestion = IngestionService(config, bronze_cp, silver_cp)
+
+    cp = bronze_cp.get()
+    for path in ingestion.pending_bronze_files():
+        if ingestion.bronze_file_done(path):
+            logger.info(f"Bronze file {path} done")
+            continue
+        resume = f" (resume at chunk {cp.chunk_index})" if path == cp.file else ""
+        logger.info(f"Pending Bronze file {path}{resume}")
+
+    logger.info(f"Pending Silver files: {len(ingestion.pending_silver_files())}")
+    logger.info(f"Gold format: {config.output_format}, output: {config.output_dir}")
+    logger.info("Dry run complete, nothing written")
+
+
+def compact_dedup(config_path: str):
+    """
+    Drops dedup keys older than [DEDUP] retention_days and rebuilds the
+    store. Safe to run next to a pipeline run (deletes are batched).
+    """
+    logger = setup_logger()
+    config = load_config(config_path, logger)
+
+    path = store_path(config.output_dir)
+    dedup = DedupService(path, journal_mode=config.dedup_journal_mode)
+    retention_days = config.dedup_retention_days or None
+
+    before_keys, before_bytes = dedup.count(), os.path.getsize(path)
+    if retention_days is None:
+        logger.info("[DEDUP] retention_days is 0: no keys expire, rebuilding the store only")
+
+    start = time.monotonic()
+    removed = dedup.compact(retention_days)
+    logger.info(
+        f"Compacted dedup store in {time.monotonic() - start:.1f}s: removed {removed} keys "
+        f"({before_keys} -> {dedup.count()}), {before_bytes} -> {os.path.getsize(path)} bytes"
+    )
+    dedup.close()
+
+
+def watch_pipeline(
+    config_path: str,
+    stop_event: threading.Event = None,
+    profile_sample: float = 0.0,
+    profile_stages=None
+):
+    """
+    Long-running micro-batch mode: each settled new Bronze file is processed
+    through Silver as soon as it appears; Gold is refreshed at most every
+    gold_refresh_seconds.
+    """
+    logger = setup_logger()
+    config = load_config(config_path, logger)
+
+    if config.input_type != "directory":
+        logger.error("Watch mode requires input_type = directory")
         sys.exit(1)
-    run_pipeline(sys.argv[1])
+
+    stop_event = stop_event or threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    profiler = ChunkProfiler(config.output_dir, profile_sample, profile_stages)
+    pipeline = Pipeline(config, logger, profiler=profiler)
+    watcher = WatchService(pipeline.ingestion, os.path.join(config.output_dir, "watch", "ingested.json"))
+
+    # Catch up on everything already present, including files backfilled
+    # behind the checkpoint while the watcher was down, then seed the
+    # aggregation state from all of Silver. The state stays cumulative from
+    # here on, so every Gold refresh is a full (and exact) rewrite of every table.
+    late = watcher.late_files(pipeline.bronze_cp.get().file)
+    pipeline.run_bronze_phase()
+    if late:
+        logger.info(f"Ingesting {len(late)} late file(s) that sort before the Bronze checkpoint")
+        pipeline.run_bronze_late(late)
+    watcher.mark_done(pipeline.ingestion.bronze_files)
+    watcher.record_ingested(pipeline.ingestion.bronze_files)
+    pipeline.rebuild_gold(config.workers)
+    pipeline.write_gold(full_refresh=True)
+    last_gold = time.monotonic()
+
+    logger.info(f"Watching {config.input_path} every {config.watch_poll_seconds}s")
+    try:
+        while not stop_event.wait(config.watch_poll_seconds):
+            new_files = watcher.poll()
+            if new_files:
+                logger.info(f"Micro-batch: {len(new_files)} new file(s)")
+
+                # the checkpoints are ordered by file name: files sorting
+                # before them are read whole and their Silver files passed
+                # on explicitly (the dedup store keeps Gold exact on replays)
+                last = pipeline.bronze_cp.get().file
+                late = [path for path in new_files if last and path < last]
+                on_time = [path for path in new_files if path not in late]
+
+                if on_time:
+                    pipeline.run_bronze_phase(on_time)
+                    pipeline.run_silver_phase()
+                if late:
+                    logger.info(f"Late file(s) sorting before checkpoint {last}: {', '.join(late)}")
+                    pipeline.run_silver_phase(pipeline.run_bronze_late(late))
+                watcher.record_ingested(new_files)
+
+            if pipeline.pending_gold and time.monotonic() - last_gold >= config.watch_gold_refresh_seconds:
+                pipeline.write_gold(full_refresh=True)
+                last_gold = time.monotonic()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if pipeline.pending_gold:
+            pipeline.write_gold(full_refresh=True)
+        pipeline.close()
+        pipeline.metrics.log_summary(logger)
+        if profiler.enabled:
+            logger.info(f"Profiles written to {profiler.profile_dir}")
+        logger.info("Watch stopped")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.pipeline_orchestrator",
+        description="Bronze → Silver → Gold batch pipeline"
+    )
+    parser.add_argument("config", help="Path to pipeline.conf")
+    parser.add_argument(
+        "--rebuild-gold",
+        action="store_true",
+        help="Rebuild Gold from all Silver files instead of the incremental upsert"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (overrides [PARALLEL] workers)"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and process new Bronze partition files as micro-batches"
+    )
+    parser.add_argument(
+        "--distributed",
+        action="store_true",
+        help="Run as one of several workers sharing output_dir (lease table coordination)"
+    )
+    parser.add_argument(
+        "--worker-id",
+        default=None,
+        help="Worker name in the lease table (default: <hostname>-<pid>)"
+    )
+    parser.add_argument(
+        "--profile",
+        type=float,
+        default=0.0,
+        metavar="FRACTION",
+        help="Profile this fraction of chunks (e.g. 0.05) with cProfile and tracemalloc"
+    )
+    parser.add_argument(
+        "--profile-stages",
+        default=",".join(STAGES),
+        help=f"Comma-separated stages to profile (default: {','.join(STAGES)})"
+    )
+    parser.add_argument(
+        "--compact-dedup",
+        action="store_true",
+        help="Drop dedup keys older than [DEDUP] retention_days and rebuild the store, then exit"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Validate the config and report pending files without processing them"
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    if args.dry_run:
+        dry_run(args.config)
+    elif args.compact_dedup:
+        compact_dedup(args.config)
+    elif args.distributed:
+        run_distributed(
+            args.config,
+            worker_id=args.worker_id,
+            workers=args.workers,
+            profile_sample=args.profile,
+            profile_stages=args.profile_stages.split(",")
+        )
+    elif args.watch:
+        watch_pipeline(args.config, profile_sample=args.profile, profile_stages=args.profile_stages.split(","))
+    else:
+        run_pipeline(
+            args.config,
+            rebuild_gold=args.rebuild_gold,
+            workers=args.workers,
+            profile_sample=args.profile,
+            profile_stages=args.profile_stages.split(",")
+        )
@@ -0,0 +1,185 @@
+import cProfile
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Iterable, Optional
+
+
+STAGES = ("clean", "silver_write", "dedup", "aggregate")
+
+# returned for every unsampled chunk / stage: no allocation, no hooks
+_NULL_STAGE = nullcontext()
+
+
+class ChunkProfile:
+    """
+    One sampled chunk; collects the artifacts of its profiled stages.
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.stages = {}
+
+
+class ChunkProfiler:
+    """
+    Profiles a sampled fraction of chunks, stage by stage.
+
+    For each profiled stage of a sampled chunk it writes, under
+    output_dir/profiles/<run>/ (<run> is the start time, plus run_name
+    when given, e.g. the worker id of a distributed run):
+      - <chunk>_<stage>.prof: cProfile stats (pstats / snakeviz)
+      - <chunk>_<stage>.collapsed: sampled call stacks in collapsed format
+        (flamegraph.pl, speedscope)
+    and records duration, peak traced memory and the top allocation sites
+    in the run metrics.
+
+    Sampling is deterministic: sample_rate=0.1 profiles every 10th chunk.
+    With sample_rate=0 every call returns immediately. tracemalloc traces
+    the whole process, so allocation sites may include prefetch threads.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        sample_rate: float = 0.0,
+        stages: Optional[Iterable[str]] = None,
+        top_n: int = 10,
+        stack_interval: float = 0.001,
+        run_name: Optional[str] = None
+    ):
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.enabled = self.sample_rate > 0
+        self.stages = set(stages) if stages else set(STAGES)
+        self.top_n = top_n
+        self.stack_interval = stack_interval
+        run = time.strftime("%Y%m%d-%H%M%S") + (f"-{_safe(run_name)}" if run_name else "")
+        self.profile_dir = os.path.join(output_dir, "profiles", run)
+        self._chunks_seen = 0
+
+        unknown = self.stages - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown profiling stages: {sorted(unknown)} (expected {STAGES})")
+
+    def start_chunk(self, label: str) -> Optional[ChunkProfile]:
+        """
+        Returns a ChunkProfile when this chunk is sampled, else None.
+        """
+        if not self.enabled:
+            return None
+
+        self._chunks_seen += 1
+        n = self._chunks_seen
+        if int(n * self.sample_rate) == int((n - 1) * self.sample_rate):
+            return None
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        return ChunkProfile(label)
+
+    def stage(self, chunk: Optional[ChunkProfile], name: str):
+        if chunk is None or name not in self.stages:
+            return _NULL_STAGE
+        return self._profile_stage(chunk, name)
+
+    @contextmanager
+    def _profile_stage(self, chunk: ChunkProfile, name: str):
+        base = os.path.join(self.profile_dir, f"{_safe(chunk.label)}_{name}")
+        sampler = StackSampler(threading.get_ident(), self.stack_interval)
+        profiler = cProfile.Profile()
+
+        # another tracer (e.g. python -X tracemalloc) is left running
+        owns_tracing = not tracemalloc.is_tracing()
+        if owns_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+
+        start = time.perf_counter()
+        sampler.start()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            sampler.stop()
+            seconds = time.perf_counter() - start
+
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, cProfile.__file__),
+                tracemalloc.Filter(False, __file__),
+            ])
+            _, peak = tracemalloc.get_traced_memory()
+            if owns_tracing:
+                tracemalloc.stop()
+
+            profiler.dump_stats(base + ".prof")
+            sampler.write(base + ".collapsed")
+
+            chunk.stages[name] = {
+                "seconds": round(seconds, 6),
+                "peak_bytes": peak,
+                "top_allocations": [
+                    {
+                        "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                        "bytes": stat.size,
+                        "count": stat.count,
+                    }
+                    for stat in snapshot.statistics("lineno")[:self.top_n]
+                ],
+            }
+
+    def finish_chunk(self, chunk: Optional[ChunkProfile], metrics):
+        if chunk is None:
+            return
+
+        for name, result in chunk.stages.items():
+            metrics.record_profile(chunk.label, name, result)
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack on a background thread and counts
+    identical stacks (collapsed-stack format: "a;b;c <count>").
+    The effective rate is bounded by the interpreter's switch interval.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if self._stop.is_set():
+                return  # the profiled block has already ended
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+
+def _safe(label: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in label)
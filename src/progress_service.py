@@ -0,0 +1,200 @@
+import os
+import time
+from typing import Dict, List, Optional
+
+from src.metrics_service import MetricsService
+
+
+class PhaseProgress:
+    """
+    Work done in one phase, measured in bytes of its input files.
+
+    The rate for the ETA is taken from the first update on, so Bronze rows
+    skipped on resume (read through quickly) do not inflate it.
+    """
+
+    def __init__(self, total_bytes: int, rows_at_start: int):
+        self.total_bytes = total_bytes
+        self.rows_at_start = rows_at_start
+        self.started = time.monotonic()
+        self.done_bytes = 0
+        self.rows = 0
+        self.finished_at = None
+        self._first = None  # (time, done_bytes) at the first update
+
+    def update(self, done_bytes: int, rows: int):
+        now = time.monotonic()
+        if self._first is None:
+            self._first = (now, done_bytes)
+        self.done_bytes = min(done_bytes, self.total_bytes) if self.total_bytes else done_bytes
+        self.rows = rows - self.rows_at_start
+
+    def finish(self):
+        self.finished_at = time.monotonic()
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started
+
+    @property
+    def fraction(self) -> float:
+        if self.finished:
+            return 1.0
+        return self.done_bytes / self.total_bytes if self.total_bytes else 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        if self.finished:
+            return 0.0
+        if self._first is None:
+            return None
+
+        first_time, first_done = self._first
+        seconds = time.monotonic() - first_time
+        done = self.done_bytes - first_done
+        if seconds <= 0 or done <= 0:
+            return None
+        return (self.total_bytes - self.done_bytes) / (done / seconds)
+
+
+class ProgressReporter:
+    """
+    Percent done, rows/s and ETA per phase (bronze, silver, gold).
+
+    update() is cheap and called once per chunk / file. At most every
+    interval seconds (and when a phase finishes) it logs one progress line
+    and, with textfile_path set, rewrites a Prometheus textfile for the
+    node_exporter textfile collector: MetricsService counters, stage
+    timings, dedup hit rate and the phase gauges. The file is written
+    next to its final path and renamed, so a scrape never sees a partial
+    file.
+    """
+
+    def __init__(self, logger, metrics: MetricsService, textfile_path: Optional[str] = None, interval: float = 30.0):
+        self.logger = logger
+        self.metrics = metrics
+        self.textfile_path = textfile_path
+        self.interval = interval
+        self.phases: Dict[str, PhaseProgress] = {}
+        self._last_report = time.monotonic()
+
+    def start_phase(self, phase: str, total_bytes: int, rows: int = 0):
+        self.phases[phase] = PhaseProgress(total_bytes, rows)
+
+    def update(self, phase: str, done_bytes: int, rows: int):
+        progress = self.phases.get(phase)
+        if progress is None:
+            return
+
+        progress.update(done_bytes, rows)
+        if time.monotonic() - self._last_report >= self.interval:
+            self.report(phase)
+
+    def finish_phase(self, phase: str, rows: Optional[int] = None):
+        progress = self.phases.get(phase)
+        if progress is None:
+            return
+
+        if rows is not None:
+            progress.rows = rows - progress.rows_at_start
+        progress.finish()
+        self.metrics.record_stage(phase, progress.elapsed)
+        self.report(phase)
+
+    def report(self, phase: str):
+        progress = self.phases[phase]
+        eta = progress.eta
+        if progress.finished:
+            self.logger.info(
+                f"Progress {phase}: done in {progress.elapsed:,.1f}s"
+                + (f", {progress.rows_per_second:,.0f} rows/s" if progress.rows else "")
+            )
+        else:
+            self.logger.info(
+                f"Progress {phase}: {progress.fraction:.1%} of {progress.total_bytes / 1e6:,.1f} MB, "
+                f"{progress.rows_per_second:,.0f} rows/s, "
+                f"ETA {'unknown' if eta is None else f'{eta:,.0f}s'}"
+            )
+        self.write_textfile()
+        self._last_report = time.monotonic()
+
+    # -------------------------
+    # Prometheus textfile
+    # -------------------------
+    def write_textfile(self):
+        if not self.textfile_path:
+            return
+
+        directory = os.path.dirname(os.path.abspath(self.textfile_path))
+        os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.textfile_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, self.textfile_path)
+
+    def render(self) -> str:
+        m = self.metrics
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples):
+            lines.append(f"# HELP pipeline_{name} {help_text}")
+            lines.append(f"# TYPE pipeline_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"pipeline_{name}{{{label_text}}} {value}" if label_text else f"pipeline_{name} {value}")
+
+        metric("bronze_rows_total", "counter", "Bronze rows cleaned.", [({}, m.cleaned_rows)])
+        metric("silver_rows_read_total", "counter", "Silver rows read in Phase 2.", [({}, m.rows_read)])
+        metric("rows_successful_total", "counter", "Rows that passed cleaning.", [({}, m.rows_successful)])
+        metric("rows_rejected_total", "counter", "Rows rejected by cleaning.", [({}, m.rows_rejected)])
+        metric(
+            "rejections_total", "counter", "Rejection reasons (a row may have several).",
+            [({"reason": reason}, count) for reason, count in sorted(m.rejection_reasons.items())]
+        )
+        metric(
+            "rows_deduplicated_total", "counter", "Duplicate rows dropped.",
+            [({"stage": "early"}, m.rows_deduplicated_early),
+             ({"stage": "silver"}, m.rows_deduplicated - m.rows_deduplicated_early)]
+        )
+        # every Silver row read is checked, and so was every row dropped early
+        checked = m.rows_read + m.rows_deduplicated_early
+        metric(
+            "dedup_hit_ratio", "gauge", "Share of order_ids checked against the dedup store that were duplicates.",
+            [({}, _ratio(m.rows_deduplicated, checked))]
+        )
+        metric(
+            "stage_seconds_total", "counter", "Time spent per stage and phase (summed over workers).",
+            [({"stage": stage}, round(seconds, 6)) for stage, seconds in sorted(m.stage_seconds.items())]
+        )
+        metric(
+            "cache_hit_ratio", "gauge", "Normalize cache hit rate.",
+            [({"cache": name}, round(rate, 6)) for name, rate in sorted(m.cache_hit_rates().items())]
+        )
+
+        phases = sorted(self.phases.items())
+        metric("phase_progress_ratio", "gauge", "Share of the phase's input bytes processed.",
+               [({"phase": phase}, round(p.fraction, 6)) for phase, p in phases])
+        metric("phase_rows_per_second", "gauge", "Rows per second since the phase started.",
+               [({"phase": phase}, round(p.rows_per_second, 3)) for phase, p in phases])
+        metric("phase_eta_seconds", "gauge", "Estimated seconds until the phase is done (-1 unknown).",
+               [({"phase": phase}, -1 if p.eta is None else round(p.eta, 3)) for phase, p in phases])
+        metric("last_update_timestamp_seconds", "gauge", "When this file was written.", [({}, round(time.time(), 3))])
+
+        return "\n".join(lines) + "\n"
+
+
+def _ratio(part: int, whole: int) -> float:
+    return round(part / whole, 6) if whole else 0.0
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,125 @@
+import os
+from typing import Callable, List, Optional, Sequence, Tuple
+
+
+# Bronze fields consumed by CleanTransformService.process_record, in
+# record order. The schema must declare each of them.
+RECORD_FIELDS = (
+    "order_id",
+    "product_name",
+    "category",
+    "quantity",
+    "unit_price",
+    "discount_percent",
+    "region",
+    "sale_date",
+    "customer_email",
+)
+
+SCHEMA_TYPES = ("string", "int", "float")
+
+
+class SchemaError(Exception):
+    """
+    Raised when schema.txt is invalid or a Bronze header does not match it.
+    """
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+CONVERTERS = {
+    "int": "_to_int",
+    "float": "_to_float",
+}
+
+
+class BronzeSchema:
+    """
+    Bronze schema loaded from schema.txt ("name:type" per line).
+
+    compile() validates a file's header once and returns a generated
+    function mapping a csv.reader row (list) straight to a record tuple in
+    RECORD_FIELDS order: columns picked by index, typed fields converted
+    (None when a value does not parse). No per-row dict is built.
+    """
+
+    def __init__(self, fields: Sequence[Tuple[str, str]], path: str = "<schema>"):
+        self.fields = list(fields)
+        self.path = path
+        self.types = dict(self.fields)
+
+        missing = [name for name in RECORD_FIELDS if name not in self.types]
+        if missing:
+            raise SchemaError(f"{path}: missing required fields {missing}")
+
+    @staticmethod
+    def load(path: str) -> "BronzeSchema":
+        if not os.path.exists(path):
+            raise SchemaError(f"Schema file not found: {path}")
+
+        fields = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+
+                name, sep, kind = line.partition(":")
+                name, kind = name.strip(), kind.strip().lower()
+                if not sep or not name:
+                    raise SchemaError(f"{path}:{line_no}: expected 'name:type', got {line!r}")
+                if kind not in SCHEMA_TYPES:
+                    raise SchemaError(f"{path}:{line_no}: unknown type {kind!r} (expected one of {SCHEMA_TYPES})")
+                if any(name == existing for existing, _ in fields):
+                    raise SchemaError(f"{path}:{line_no}: duplicate field {name!r}")
+
+                fields.append((name, kind))
+
+        return BronzeSchema(fields, path)
+
+    def compile(self, header: Optional[List[str]], source: str) -> Callable[[list], tuple]:
+        """
+        Fails fast on schema drift: every declared column must be present
+        exactly once and no undeclared column may appear (order is free).
+        """
+        header = [name.strip() for name in header or []]
+        declared = [name for name, _ in self.fields]
+
+        missing = [name for name in declared if name not in header]
+        unexpected = [name for name in header if name not in self.types]
+        duplicated = sorted({name for name in header if header.count(name) > 1})
+        if missing or unexpected or duplicated:
+            raise SchemaError(
+                f"{source}: header does not match schema {self.path}: "
+                f"missing={missing} unexpected={unexpected} duplicated={duplicated}"
+            )
+
+        width = len(header)
+        items = []
+        for name in RECORD_FIELDS:
+            item = f"row[{header.index(name)}]"
+            converter = CONVERTERS.get(self.types[name])
+            items.append(f"{converter}({item})" if converter else item)
+
+        # short rows are padded like DictReader's restval
+        source_code = (
+            "def parse(row):\n"
+            f"    if len(row) < {width}:\n"
+            f"        row = row + [None] * ({width} - len(row))\n"
+            f"    return ({', '.join(items)},)\n"
+        )
+        namespace = {"_to_int": _to_int, "_to_float": _to_float}
+        exec(compile(source_code, f"<bronze parser {os.path.basename(source)}>", "exec"), namespace)
+        return namespace["parse"]
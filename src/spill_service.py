@@ -0,0 +1,154 @@
+import csv
+import itertools
+import os
+import shutil
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterator, Sequence, Tuple
+
+from src.handoff_service import process_dir
+
+
+# Measured footprint of one product_key -> {"revenue", "quantity"} entry
+# (key, bucket dict, ints, hash slot), used to estimate state size.
+ENTRY_BYTES = 320
+
+SPILL_PARTITIONS = 64
+MAX_SPLIT_DEPTH = 4
+
+
+def _partition(key: str, partitions: int, level: int = 0) -> int:
+    # crc32, not hash(): stable across processes; level salts re-splits
+    return zlib.crc32(f"{level}:{key}".encode("utf-8")) % partitions
+
+
+class SpillStore:
+    """
+    Hash-partitioned on-disk partials of one keyed sum state
+    (key -> {field: int}).
+
+    spill() appends the in-memory entries to partition files; a key may
+    then appear in several spills. merged_items() re-sums the files one
+    partition at a time, so only one partition's distinct keys are in
+    memory. A partition whose spilled entries exceed the memory budget
+    is split again with a different salt before it is loaded.
+
+    Files live under <root>/<host>-<pid>/ and are removed by clear(); a
+    crashed run's directory is removed by handoff_service.sweep_stale().
+    """
+
+    _instances = itertools.count()
+
+    def __init__(self, root: str, name: str, fields: Sequence[str], max_bytes: int):
+        self.dir = os.path.join(process_dir(root), f"{name}_{next(SpillStore._instances):04d}")
+        self.fields = list(fields)
+        self.max_bytes = max_bytes
+        # upper bound on distinct keys per partition file
+        self.entries = [0] * SPILL_PARTITIONS
+        self.spills = 0
+
+    @property
+    def spilled(self) -> bool:
+        return any(self.entries)
+
+    def _path(self, partition: int) -> str:
+        return os.path.join(self.dir, f"part_{partition:03d}.csv")
+
+    def spill(self, state: Dict[str, dict]):
+        os.makedirs(self.dir, exist_ok=True)
+
+        by_partition = defaultdict(list)
+        for key, bucket in state.items():
+            by_partition[_partition(key, SPILL_PARTITIONS)].append([key] + [bucket[f] for f in self.fields])
+
+        for partition, rows in by_partition.items():
+            with open(self._path(partition), "a", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerows(rows)
+            self.entries[partition] += len(rows)
+
+        self.spills += 1
+
+    def absorb(self, other: "SpillStore"):
+        """
+        Takes over the spilled partials of another store (merge()).
+        """
+        if not other.spilled:
+            return
+
+        os.makedirs(self.dir, exist_ok=True)
+        for partition in range(SPILL_PARTITIONS):
+            if not other.entries[partition]:
+                continue
+            with open(other._path(partition), "rb") as src, open(self._path(partition), "ab") as dst:
+                shutil.copyfileobj(src, dst)
+            self.entries[partition] += other.entries[partition]
+
+        self.spills += other.spills
+        other.clear()
+
+    def merged_items(self, in_memory: Dict[str, dict]) -> Iterator[Tuple[str, dict]]:
+        """
+        Every key's total over the spilled partials plus in_memory
+        (left untouched), partition by partition.
+        """
+        pending = defaultdict(dict)
+        for key, bucket in in_memory.items():
+            pending[_partition(key, SPILL_PARTITIONS)][key] = bucket
+
+        for partition in range(SPILL_PARTITIONS):
+            path = self._path(partition) if self.entries[partition] else None
+            yield from self._merge(path, self.entries[partition], pending.pop(partition, {}), 1)
+
+    def _merge(self, path, entries: int, extra: Dict[str, dict], level: int):
+        if path is not None and (entries + len(extra)) * ENTRY_BYTES > self.max_bytes and level <= MAX_SPLIT_DEPTH:
+            yield from self._split(path, extra, level)
+            return
+
+        totals = {key: dict(bucket) for key, bucket in extra.items()}
+        if path is not None:
+            with open(path, "r", newline="", encoding="utf-8") as f:
+                for row in csv.reader(f):
+                    bucket = totals.get(row[0])
+                    if bucket is None:
+                        bucket = totals[row[0]] = dict.fromkeys(self.fields, 0)
+                    for field, value in zip(self.fields, row[1:]):
+                        bucket[field] += int(value)
+
+        yield from totals.items()
+
+    def _split(self, path: str, extra: Dict[str, dict], level: int):
+        sub_paths = [f"{path}.{level}_{i:02d}" for i in range(SPILL_PARTITIONS)]
+        entries = [0] * SPILL_PARTITIONS
+
+        handles = [open(p, "w", newline="", encoding="utf-8") for p in sub_paths]
+        try:
+            writers = [csv.writer(h) for h in handles]
+            with open(path, "r", newline="", encoding="utf-8") as f:
+                for row in csv.reader(f):
+                    sub = _partition(row[0], SPILL_PARTITIONS, level)
+                    writers[sub].writerow(row)
+                    entries[sub] += 1
+        finally:
+            for handle in handles:
+                handle.close()
+
+        pending = defaultdict(dict)
+        for key, bucket in extra.items():
+            pending[_partition(key, SPILL_PARTITIONS, level)][key] = bucket
+
+        try:
+            for sub, sub_path in enumerate(sub_paths):
+                yield from self._merge(sub_path, entries[sub], pending.pop(sub, {}), level + 1)
+        finally:
+            for sub_path in sub_paths:
+                if os.path.exists(sub_path):
+                    os.remove(sub_path)
+
+    def clear(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+        try:
+            os.rmdir(os.path.dirname(self.dir))  # last store of this process
+        except OSError:
+            pass
+        self.entries = [0] * SPILL_PARTITIONS
+        self.spills = 0
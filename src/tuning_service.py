@@ -0,0 +1,280 @@
+import csv
+import json
+import os
+import shutil
+import socket
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+# candidate values, tried as neighbours of the best measured one
+CHUNK_SIZES = (5_000, 10_000, 25_000, 50_000, 100_000, 200_000, 500_000)
+
+CALIBRATION_ROWS = 50_000
+MAX_RUNS = 20  # per host; older runs are dropped
+
+
+def rss_bytes() -> Optional[int]:
+    """
+    Current resident set size (Linux), None where /proc is unavailable.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def worker_ladder(cpus: int) -> List[int]:
+    ladder = [1]
+    while ladder[-1] * 2 <= cpus:
+        ladder.append(ladder[-1] * 2)
+    if ladder[-1] != cpus:
+        ladder.append(cpus)
+    return ladder
+
+
+class Tuning:
+    def __init__(self, chunk_size: int, workers: int, reason: str):
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.reason = reason
+
+
+class TuningService:
+    """
+    Picks chunk_size and worker count from earlier runs on this host.
+
+    Every run appends its Phase 1 measurements (wall-clock throughput plus
+    per-chunk rows/s and RSS) to output_dir/tuning/profile.json, keyed by
+    host name. choose() returns the best measured setting, or an untried
+    neighbour of it on the CHUNK_SIZES / worker ladder (one step per run,
+    so the search converges over a few runs). Without history, calibrate()
+    cleans a sample of Bronze rows at each candidate chunk size.
+
+    chunk_size is capped so that one chunk's rows stay within
+    [MEMORY] max_chunk_mb (bytes per row measured during calibration).
+    """
+
+    def __init__(self, output_dir: str, max_chunk_mb: int, cpus: Optional[int] = None):
+        self.dir = os.path.join(output_dir, "tuning")
+        self.path = os.path.join(self.dir, "profile.json")
+        self.max_chunk_bytes = max_chunk_mb * 1024 * 1024
+        self.cpus = cpus or os.cpu_count() or 1
+        self.host = socket.gethostname()
+        self.profile = self._load()
+
+    def _load(self) -> Dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get(self.host, {})
+        except ValueError:
+            return {}  # torn or hand-edited profile: start over
+
+    def _save(self):
+        os.makedirs(self.dir, exist_ok=True)
+
+        profiles = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    profiles = json.load(f)
+            except ValueError:
+                pass
+        profiles[self.host] = self.profile
+
+        # other hosts (or workers in one process) may share output_dir:
+        # unique temp name, then replace atomically
+        fd, tmp_path = tempfile.mkstemp(dir=self.dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(profiles, f, indent=2)
+            os.chmod(tmp_path, 0o644)  # mkstemp creates 0600
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @property
+    def runs(self) -> List[Dict]:
+        return self.profile.get("runs", [])
+
+    @property
+    def bytes_per_row(self) -> Optional[float]:
+        return self.profile.get("bytes_per_row")
+
+    def max_chunk_size(self) -> Optional[int]:
+        if not self.bytes_per_row:
+            return None
+        return int(self.max_chunk_bytes // self.bytes_per_row)
+
+    def _candidates(self) -> List[int]:
+        cap = self.max_chunk_size()
+        sizes = [size for size in CHUNK_SIZES if cap is None or size <= cap]
+        return sizes or [max(1, cap)]
+
+    # -------------------------
+    # Choice
+    # -------------------------
+    def choose(self, chunk_size: Optional[int] = None, workers: Optional[int] = None) -> Optional[Tuning]:
+        """
+        chunk_size / workers: fixed by the config (None = tuned). Returns
+        None when there is no history to choose from.
+        """
+        runs = [
+            run for run in self.runs
+            if (chunk_size is None or run["chunk_size"] == chunk_size)
+            and (workers is None or run["workers"] == workers)
+        ]
+        if not runs:
+            return None
+
+        # rows-weighted throughput per measured setting
+        totals = {}
+        for run in runs:
+            rows, seconds = totals.get((run["chunk_size"], run["workers"]), (0, 0.0))
+            totals[(run["chunk_size"], run["workers"])] = (rows + run["rows"], seconds + run["seconds"])
+        rates = {setting: rows / seconds for setting, (rows, seconds) in totals.items() if seconds > 0}
+        if not rates:
+            return None
+
+        (best_size, best_workers), best_rate = max(rates.items(), key=lambda item: item[1])
+        measured = f"best measured {best_rate:,.0f} rows/s at chunk_size={best_size}, workers={best_workers}"
+
+        if chunk_size is None:
+            size = self._untried_neighbour(self._candidates(), best_size, {s for s, w in rates if w == best_workers})
+            if size is not None:
+                return Tuning(size, best_workers, f"trying chunk_size={size} next to the {measured}")
+
+        if workers is None:
+            count = self._untried_neighbour(worker_ladder(self.cpus), best_workers, {w for s, w in rates if s == best_size})
+            if count is not None:
+                return Tuning(best_size, count, f"trying workers={count} next to the {measured}")
+
+        return Tuning(best_size, best_workers, measured)
+
+    @staticmethod
+    def _untried_neighbour(ladder: List[int], best: int, tried: set) -> Optional[int]:
+        if best not in ladder:
+            # set by hand earlier, or above the memory cap: nearest step
+            nearest = min(ladder, key=lambda value: abs(value - best))
+            return nearest if nearest not in tried else None
+
+        i = ladder.index(best)
+        # larger first: fewer, bigger chunks usually win until memory runs out
+        for j in (i + 1, i - 1):
+            if 0 <= j < len(ladder) and ladder[j] not in tried:
+                return ladder[j]
+        return None
+
+    # -------------------------
+    # Calibration
+    # -------------------------
+    def calibrate(
+        self,
+        read_sample: Callable[[int], List],
+        clean: Callable,
+        workers: Optional[int] = None
+    ) -> Optional[Tuning]:
+        """
+        read_sample(n): the first n pending Bronze rows.
+
+        Measures bytes per row (parsed plus cleaned, traced) on a small
+        probe, then cleans and CSV-serializes a sample in chunks of every
+        candidate size (up to the sample size) and picks the fastest.
+        Returns None when there are no Bronze rows to sample.
+        """
+        tracemalloc.start()
+        try:
+            probe = read_sample(CHUNK_SIZES[0])
+            self._clean_chunk(probe, clean)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        rows = read_sample(CALIBRATION_ROWS)
+        if not probe or not rows:
+            return None
+        self.profile["bytes_per_row"] = peak / len(probe)
+
+        work_dir = os.path.join(self.dir, "calibration")
+        os.makedirs(work_dir, exist_ok=True)
+        try:
+            rates = {}
+            for size in self._candidates():
+                if size > len(rows) and rates:
+                    break
+                start = time.perf_counter()
+                for offset in range(0, len(rows), size):
+                    self._write(work_dir, self._clean_chunk(rows[offset:offset + size], clean))
+                rates[size] = len(rows) / max(time.perf_counter() - start, 1e-9)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        best_size = max(rates, key=rates.get)
+        reason = (
+            f"calibration on {len(rows)} sample rows: {rates[best_size]:,.0f} rows/s at chunk_size={best_size}, "
+            f"{self.bytes_per_row:,.0f} B/row"
+        )
+        if workers is None:
+            workers = self.cpus
+            reason += f"; workers = CPU count ({self.cpus})"
+        self.profile["calibration"] = {
+            "time": time.time(),
+            "sample_rows": len(rows),
+            "rows_per_second": {str(size): round(rate) for size, rate in rates.items()},
+        }
+        self._save()
+
+        return Tuning(best_size, workers, reason)
+
+    @staticmethod
+    def _clean_chunk(rows: Iterable, clean: Callable) -> List[dict]:
+        cleaned = []
+        for row in rows:
+            result = clean(row)
+            if result["is_valid"]:
+                cleaned.append(result["clean_row"])
+        return cleaned
+
+    @staticmethod
+    def _write(work_dir: str, rows: List[dict]):
+        if not rows:
+            return
+        with open(os.path.join(work_dir, "chunk.csv"), "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+
+    # -------------------------
+    # Recording
+    # -------------------------
+    def record_run(self, chunk_size: int, workers: int, seconds: float, chunks: List[Dict]):
+        """
+        chunks: per-chunk {"rows", "seconds", "rss_bytes"} (MetricsService.chunk_stats).
+        """
+        rows = sum(chunk["rows"] for chunk in chunks)
+        if not rows or seconds <= 0:
+            return
+
+        chunk_rates = sorted(chunk["rows"] / chunk["seconds"] for chunk in chunks if chunk["seconds"] > 0)
+        rss = [chunk["rss_bytes"] for chunk in chunks if chunk["rss_bytes"] is not None]
+
+        self.profile.setdefault("runs", []).append({
+            "time": time.time(),
+            "chunk_size": chunk_size,
+            "workers": workers,
+            "chunks": len(chunks),
+            "rows": rows,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(rows / seconds),
+            "chunk_rows_per_second_p50": round(chunk_rates[len(chunk_rates) // 2]) if chunk_rates else None,
+            "peak_rss_bytes": max(rss) if rss else None,
+        })
+        del self.profile["runs"][:-MAX_RUNS]
+        self._save()
+
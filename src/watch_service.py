@@ -0,0 +1,102 @@
+import json
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class WatchService:
+    """
+    Polls the Bronze input listing for new partition files.
+
+    A file is reported once its size and mtime are unchanged across two
+    consecutive polls, so partitions still being copied in are not read
+    half-written. Reported files are not reported again unless rewritten.
+
+    The Bronze checkpoint only orders files by name, so a file that sorts
+    before it (a backfilled partition) would be skipped. Ingested files are
+    therefore recorded by name in a ledger (ingested_path), and late_files()
+    returns the ones before the checkpoint that are not in it.
+    """
+
+    def __init__(self, ingestion, ingested_path: Optional[str] = None):
+        self.ingestion = ingestion
+        self.ingested_path = ingested_path
+        self.ingested: Optional[Set[str]] = self._load_ingested()
+        self._pending: Dict[str, Tuple[int, int]] = {}
+        self._done: Dict[str, Tuple[int, int]] = {}
+
+    def _load_ingested(self) -> Optional[Set[str]]:
+        if not self.ingested_path or not os.path.exists(self.ingested_path):
+            return None
+        with open(self.ingested_path, "r", encoding="utf-8") as f:
+            return set(json.load(f)["files"])
+
+    @staticmethod
+    def _signature(path: str):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def poll(self) -> List[str]:
+        ready = []
+        seen = set()
+
+        for path in self.ingestion.refresh_bronze_files():
+            seen.add(path)
+            sig = self._signature(path)
+            if sig is None or self._done.get(path) == sig:
+                continue
+
+            if self._pending.get(path) == sig:
+                ready.append(path)
+                self._done[path] = sig
+                del self._pending[path]
+            else:
+                self._pending[path] = sig
+
+        # forget files that disappeared (moved away after processing)
+        for path in list(self._pending):
+            if path not in seen:
+                del self._pending[path]
+
+        return sorted(ready)
+
+    def mark_done(self, paths: List[str]):
+        """
+        Marks files as already handled without waiting for them to settle
+        (e.g. files present at startup, covered by the checkpoint).
+        """
+        for path in paths:
+            sig = self._signature(path)
+            if sig is not None:
+                self._done[path] = sig
+
+    # -------------------------
+    # Ingested files
+    # -------------------------
+    def late_files(self, checkpoint_file: Optional[str]) -> List[str]:
+        """
+        Bronze files that sort before the checkpoint and were never
+        ingested: backfilled while the watcher was down, or interrupted
+        while being processed. Without a ledger yet, the files before the
+        checkpoint are recorded as ingested (the checkpoint covers them).
+        """
+        if not checkpoint_file:
+            return []
+
+        before = [path for path in self.ingestion.bronze_files if path < checkpoint_file]
+        if self.ingested is None:
+            self.record_ingested(before)
+        return [path for path in before if path not in self.ingested]
+
+    def record_ingested(self, paths: List[str]):
+        self.ingested = (self.ingested or set()) | set(paths)
+        if not self.ingested_path:
+            return
+
+        os.makedirs(os.path.dirname(self.ingested_path), exist_ok=True)
+        tmp_path = f"{self.ingested_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": sorted(self.ingested)}, f, indent=2)
+        os.replace(tmp_path, self.ingested_path)
@@ -1,8 +1,48 @@
 import os
 import csv
+import sys
+import tempfile
 
-import pyarrow as pa
-import pyarrow.parquet as pq
+from src.manifest_service import SilverManifest, manifest_path
+from src.decompression_service import strip_compression_suffix
+from src.clean_transform_service import DEFAULT_MONTH
+
+
+# Gold tables merged into (rather than replaced) on incremental runs
+UPSERT_KEYS = {
+    "monthly_sales_summary": ("sale_month",),
+    "rollup_region_by_month": ("sale_month", "region"),
+}
+
+# pyorc.CompressionKind member names; pyarrow and pyorc are imported only
+# by the code paths that write or read those formats
+ORC_COMPRESSION = {
+    "none": "NONE",
+    "zlib": "ZLIB",
+    "snappy": "SNAPPY",
+    "lz4": "LZ4",
+    "zstd": "ZSTD",
+}
+
+MEASURE_TYPES = {
+    "total_revenue": float,
+    "total_quantity": int,
+    "order_count": int,
+    "avg_discount": float,
+    "discount_sum": int,
+}
+
+# ORC types of the numeric Gold columns (measures, plus the Silver columns
+# anomaly_records carries), so a table's schema does not depend on which
+# values its first batch happens to hold
+GOLD_ORC_TYPES = {
+    **{field: "bigint" if cast is int else "double" for field, cast in MEASURE_TYPES.items()},
+    "quantity": "bigint",
+    "unit_price": "double",
+    "discount_percent": "double",
+    "revenue": "double",
+    "avg_order_value": "double",
+}
 
 
 class WriterService:
@@ -13,14 +53,29 @@ class WriterService:
       - Always CSV
       - Chunk-based
       - Idempotent
+      - Indexed by a manifest with per-file statistics
 
     Gold:
       - Format driven by config (csv, parquet, orc)
     """
     
-    def __init__(self, base_output_dir: str, gold_format: str = "parquet"):
+    def __init__(
+        self,
+        base_output_dir: str,
+        gold_format: str = "parquet",
+        orc_stripe_size: int = 64 * 1024 * 1024,
+        orc_compression: str = "zlib",
+        row_group_size: int = 128 * 1024,
+        parquet_compression: str = "snappy",
+        use_dictionary: bool = True
+    ):
         self.base_output_dir = base_output_dir
         self.gold_format = gold_format.lower()
+        self.orc_stripe_size = orc_stripe_size
+        self.orc_compression = ORC_COMPRESSION[orc_compression.lower()]
+        self.row_group_size = row_group_size
+        self.parquet_compression = parquet_compression
+        self.use_dictionary = use_dictionary
 
         self.silver_dir = os.path.join(base_output_dir, "silver")
         self.gold_dir = os.path.join(base_output_dir, "gold")
@@ -28,103 +83,422 @@ class WriterService:
         os.makedirs(self.silver_dir, exist_ok=True)
         os.makedirs(self.gold_dir, exist_ok=True)
 
+        self.manifest = SilverManifest(self.silver_dir, manifest_path(base_output_dir))
+        self.manifest.bootstrap()
+
     # -------------------------
-    # SILVER (unchanged)
+    # SILVER
     # -------------------------
-    def write_silver_chunk(self, source_file, chunk_index, rows):
+    def write_silver_chunk(self, source_file, chunk_index, rows, range_index=None):
+        """
+        range_index: byte range of a split Bronze file; chunk_index then
+        counts within that range. Returns the Silver file's path (None when
+        rows is empty and nothing was written).
+        """
         if not rows:
-            return
+            return None
 
-        base = os.path.basename(source_file).replace(".csv", "")
+        base = os.path.basename(strip_compression_suffix(source_file)).replace(".csv", "")
+        if range_index is not None:
+            base = f"{base}_r{range_index:04d}"
         path = os.path.join(
             self.silver_dir,
             f"{base}_chunk_{chunk_index:04d}.csv"
         )
 
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=rows[0].keys())
-            writer.writeheader()
-            writer.writerows(rows)
+        # unique temp name + rename: a worker that lost its lease and the
+        # worker that took over may write the same chunk concurrently
+        fd, tmp_path = tempfile.mkstemp(dir=self.silver_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+                writer.writeheader()
+                writer.writerows(rows)
+            os.chmod(tmp_path, 0o644)  # mkstemp creates 0600
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.manifest.record(path, source_file, chunk_index, rows)
+        return path
 
     # -------------------------
     # GOLD ENTRY POINT
     # -------------------------
-    def write_gold_table(self, table_name: str, rows: list):
+    def write_gold_table(self, table_name: str, rows, full_refresh: bool = False):
+        """
+        rows: list or iterator of dicts, or iterator of pyarrow RecordBatches.
+        full_refresh replaces upserted tables instead of merging into them
+        (used when Gold is rebuilt from all of Silver).
+        """
         if not rows:
             return
 
-        if table_name == "monthly_sales_summary":
-            self._upsert_monthly_sales(rows)
+        if table_name in UPSERT_KEYS:
+            # small keyed tables: materialized for the merge and the rollups
+            rows = _materialize(rows)
+
+        if table_name in UPSERT_KEYS and not full_refresh:
+            rows = self._upsert(table_name, rows)
         else:
             self._write_gold_full_overwrite(table_name, rows)
 
+        # rollups are derived from the merged table, so they move together
+        if table_name == "monthly_sales_summary":
+            self._write_monthly_rollups(rows)
+
     # -------------------------
     # GOLD – FULL OVERWRITE
     # -------------------------
-    def _write_gold_full_overwrite(self, table_name: str, rows: list):
-        path = os.path.join(
+    def _gold_path(self, table_name: str) -> str:
+        return os.path.join(
             self.gold_dir,
             f"{table_name}.{self.gold_format}"
         )
 
-        if self.gold_format == "parquet":
-            table = pa.Table.from_pylist(rows)
-            pq.write_table(table, path)
-        else:
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=rows[0].keys())
-                writer.writeheader()
+    def _write_gold_full_overwrite(self, table_name: str, rows) -> bool:
+        """
+        rows may be a list or iterator of dicts, or an iterator of pyarrow
+        RecordBatches; they are written incrementally, never materialized
+        as one table. The file is written under a temp name and swapped in
+        atomically, so readers never see a partial table.
+        """
+        path = self._gold_path(table_name)
+        tmp_path = path + ".tmp"
+        batches = _row_batches(rows, self.row_group_size)
+
+        try:
+            if self.gold_format == "parquet":
+                written = self._write_parquet(tmp_path, batches)
+            elif self.gold_format == "orc":
+                written = self._write_orc(tmp_path, batches)
+            else:
+                written = self._write_csv(tmp_path, batches)
+
+            if written:
+                os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return written
+
+    def _write_parquet(self, path: str, batches) -> bool:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        schema = None
+
+        try:
+            for batch in batches:
+                if not _is_record_batch(batch):
+                    batch = _record_batch(batch, schema)
+
+                if writer is None:
+                    schema = batch.schema
+                    writer = pq.ParquetWriter(
+                        path,
+                        schema,
+                        compression=self.parquet_compression,
+                        use_dictionary=self.use_dictionary
+                    )
+                elif batch.schema != schema:
+                    batch = pa.Table.from_batches([batch]).cast(schema).to_batches()[0]
+
+                writer.write_batch(batch, row_group_size=self.row_group_size)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        return writer is not None
+
+    def _write_csv(self, path: str, batches) -> bool:
+        writer = None
+
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            for batch in batches:
+                rows = batch.to_pylist() if _is_record_batch(batch) else batch
+
+                if writer is None:
+                    writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+                    writer.writeheader()
                 writer.writerows(rows)
 
+        return writer is not None
+
+    def _read_gold_table(self, table_name: str) -> list:
+        path = self._gold_path(table_name)
+
+        if not os.path.exists(path):
+            return []
+
+        if self.gold_format == "parquet":
+            import pyarrow.parquet as pq
+            return pq.read_table(path).to_pylist()
+
+        if self.gold_format == "orc":
+            import pyorc
+            with open(path, "rb") as f:
+                return list(pyorc.Reader(f, struct_repr=pyorc.StructRepr.DICT))
+
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+
+    def _write_orc(self, path: str, batches) -> bool:
+        import pyorc
+
+        writer = None
+
+        with open(path, "wb") as f:
+            try:
+                for batch in batches:
+                    rows = batch.to_pylist() if _is_record_batch(batch) else batch
+
+                    if writer is None:
+                        # known Gold columns have fixed types; others are
+                        # inferred from the first batch
+                        fields = orc_fields(rows)
+                        schema = "struct<" + ",".join(f"{name}:{kind}" for name, kind in fields) + ">"
+                        writer = pyorc.Writer(
+                            f,
+                            schema,
+                            stripe_size=self.orc_stripe_size,
+                            compression=pyorc.CompressionKind[self.orc_compression],
+                            struct_repr=pyorc.StructRepr.DICT
+                        )
+
+                    for row in rows:
+                        writer.write(_coerce_orc_row(row, fields))
+            finally:
+                if writer is not None:
+                    writer.close()
+
+        return writer is not None
+
     # -------------------------
     # GOLD – UPSERT (NO PARTITIONS)
     # -------------------------
-    def _upsert_monthly_sales(self, new_rows: list):
-        path = os.path.join(
-            self.gold_dir,
-            f"monthly_sales_summary.{self.gold_format}"
-        )
-
+    def _upsert(self, table_name: str, new_rows: list) -> list:
+        key_fields = UPSERT_KEYS[table_name]
         existing = {}
 
         # ---- Read existing Gold (if present) ----
-        if os.path.exists(path):
-            if self.gold_format == "parquet":
-                table = pq.read_table(path)
-                rows = table.to_pylist()
-            else:
-                with open(path, "r", newline="", encoding="utf-8") as f:
-                    rows = list(csv.DictReader(f))
-
-            for r in rows:
-                existing[r["sale_month"]] = {
-                    "sale_month": r["sale_month"],
-                    "total_revenue": float(r["total_revenue"]),
-                    "total_quantity": int(r["total_quantity"]),
-                    "order_count": int(r["order_count"]),
-                }
+        for r in self._read_gold_table(table_name):
+            key = tuple(r[k] for k in key_fields)
+            existing[key] = _typed_measures(r, key_fields)
 
         # ---- Merge new aggregates ----
         for r in new_rows:
-            key = r["sale_month"]
+            key = tuple(r[k] for k in key_fields)
 
             if key in existing:
-                existing[key]["total_revenue"] += r["total_revenue"]
-                existing[key]["total_quantity"] += r["total_quantity"]
-                existing[key]["order_count"] += r["order_count"]
+                existing[key] = _merge_measures(existing[key], r)
             else:
-                existing[key] = r
+                existing[key] = _typed_measures(r, key_fields)
 
-        merged_rows = list(existing.values())
+        merged_rows = [existing[key] for key in sorted(existing)]
 
         # ---- Write back (overwrite) ----
-        if self.gold_format == "parquet":
-            table = pa.Table.from_pylist(merged_rows)
-            pq.write_table(table, path)
+        self._write_gold_full_overwrite(table_name, merged_rows)
+        return merged_rows
+
+    # -------------------------
+    # GOLD – ROLLUPS
+    # -------------------------
+    def _write_monthly_rollups(self, monthly_rows: list):
+        """
+        Small precomputed tables so the dashboard does not aggregate at render time.
+        The sentinel month is excluded, as in the dashboard.
+        """
+        months = [r for r in monthly_rows if r["sale_month"] != DEFAULT_MONTH]
+        if not months:
+            return
+
+        years = {}
+        for r in months:
+            y = years.setdefault(r["sale_month"][:4], {
+                "year": r["sale_month"][:4],
+                "total_revenue": 0.0,
+                "total_quantity": 0,
+                "order_count": 0
+            })
+            y["total_revenue"] += float(r["total_revenue"])
+            y["total_quantity"] += int(r["total_quantity"])
+            y["order_count"] += int(r["order_count"])
+
+        yearly = [years[y] for y in sorted(years)]
+        for y in yearly:
+            y["total_revenue"] = round(y["total_revenue"], 2)
+
+        total_revenue = round(sum(y["total_revenue"] for y in yearly), 2)
+        order_count = sum(y["order_count"] for y in yearly)
+
+        kpis = [{
+            "total_revenue": total_revenue,
+            "total_quantity": sum(y["total_quantity"] for y in yearly),
+            "order_count": order_count,
+            "avg_order_value": round(total_revenue / order_count, 2) if order_count else 0.0,
+            "first_month": min(r["sale_month"] for r in months),
+            "last_month": max(r["sale_month"] for r in months)
+        }]
+
+        self._write_gold_full_overwrite("rollup_revenue_by_year", yearly)
+        self._write_gold_full_overwrite("rollup_kpis", kpis)
+
+
+ORC_TYPES = [
+    (bool, "boolean"),
+    (int, "bigint"),
+    (float, "double"),
+    (str, "string"),
+]
+
+
+def _row_batches(rows, batch_size: int):
+    """
+    Groups dict rows into lists of batch_size; RecordBatches pass through.
+    """
+    batch = []
+    for item in rows if not _is_record_batch(rows) else [rows]:
+        if _is_record_batch(item):
+            if batch:
+                yield batch
+                batch = []
+            if item.num_rows:
+                yield item
+            continue
+
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def _materialize(rows) -> list:
+    result = []
+    for batch in _row_batches(rows, 1024):
+        result.extend(batch.to_pylist() if _is_record_batch(batch) else batch)
+    return result
+
+
+def _is_record_batch(obj) -> bool:
+    # nothing can be a RecordBatch before pyarrow has been imported
+    pa = sys.modules.get("pyarrow")
+    return pa is not None and isinstance(obj, pa.RecordBatch)
+
+
+def _record_batch(rows: list, schema=None):
+    import pyarrow as pa
+
+    if schema is not None:
+        return pa.RecordBatch.from_pylist(rows, schema=schema)
+
+    # the first batch fixes the schema; all-null columns become strings
+    batch = pa.RecordBatch.from_pylist(rows)
+    if any(pa.types.is_null(field.type) for field in batch.schema):
+        schema = pa.schema([
+            field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+            for field in batch.schema
+        ])
+        batch = pa.RecordBatch.from_pylist(rows, schema=schema)
+    return batch
+
+
+def orc_fields(rows: list) -> list:
+    """
+    Typed ORC columns: GOLD_ORC_TYPES for known Gold columns, otherwise
+    inferred from row values. Columns mixing ints and floats become double;
+    all-null columns become string.
+    """
+    fields = []
+    for name in rows[0].keys():
+        if name in GOLD_ORC_TYPES:
+            fields.append((name, GOLD_ORC_TYPES[name]))
+            continue
+
+        kinds = set()
+        for row in rows:
+            value = row.get(name)
+            if value is None:
+                continue
+            for py_type, orc_type in ORC_TYPES:
+                if isinstance(value, py_type):
+                    kinds.add(orc_type)
+                    break
+            else:
+                kinds.add("string")
+
+        if kinds == {"bigint", "double"}:
+            kind = "double"
+        elif len(kinds) == 1:
+            kind = kinds.pop()
         else:
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(
-                    f, fieldnames=merged_rows[0].keys()
-                )
-                writer.writeheader()
-                writer.writerows(merged_rows)
+            kind = "string"
+
+        fields.append((name, kind))
+
+    return fields
+
+
+def _coerce_orc_row(row: dict, fields: list) -> dict:
+    out = {}
+    for name, kind in fields:
+        value = row.get(name)
+        if value is not None:
+            if kind == "double":
+                value = float(value)
+            elif kind == "string" and not isinstance(value, str):
+                value = str(value)
+        out[name] = value
+    return out
+
+
+def _typed_measures(row: dict, key_fields) -> dict:
+    """
+    Re-casts a Gold row read back from CSV / Parquet.
+    Tables written before order_count existed merge as zero-count rows;
+    tables written before discount_sum existed get it from avg_discount.
+    """
+    # not at module level: aggregation_service imports this module
+    # through the hand-off workers
+    from src.aggregation_service import DISCOUNT_SCALE
+
+    typed = {k: row[k] for k in key_fields}
+    for field, cast in MEASURE_TYPES.items():
+        if field in row and row[field] not in (None, ""):
+            typed[field] = cast(row[field])
+        elif field == "order_count":
+            typed[field] = 0
+        elif field == "discount_sum" and "avg_discount" in typed:
+            typed[field] = round(typed["avg_discount"] * DISCOUNT_SCALE * typed["order_count"])
+    return typed
+
+
+def _merge_measures(old: dict, new: dict) -> dict:
+    merged = dict(old)
+
+    new = _typed_measures(new, ())
+
+    for field in ("total_revenue", "total_quantity", "order_count", "discount_sum"):
+        if field in new:
+            merged[field] = merged.get(field, 0) + new[field]
+
+    if "total_revenue" in merged:
+        merged["total_revenue"] = round(merged["total_revenue"], 2)
+
+    # the average is re-derived from the fixed-point sum, never averaged
+    # again, so repeated merges do not accumulate rounding
+    if "discount_sum" in new:
+        from src.aggregation_service import DISCOUNT_SCALE
+
+        count = merged["order_count"]
+        merged["avg_discount"] = (
+            round(merged["discount_sum"] / DISCOUNT_SCALE / count, 4) if count else new["avg_discount"]
+        )
+
+    return merged
@@ -1,4 +1,10 @@
 import unittest
+import random
+import tempfile
+import os
+
+import pyarrow as pa
+
 from src.aggregation_service import AggregationService
 
 
@@ -21,3 +27,62 @@ class TestAggregationService(unittest.TestCase):
         result = agg.finalize()
 
         self.assertEqual(result["monthly_sales_summary"][0]["total_revenue"], 100.0)
+
+    def test_process_batch_matches_row_path(self):
+        rng = random.Random(7)
+        rows = [
+            {
+                "order_id": f"ORD-{i}",
+                "sale_month": rng.choice(["2024-01", "2024-02", ""]),
+                "product_key": rng.choice(["p1", "p2", "p3"]),
+                "region": rng.choice(["north", "south"]),
+                "category": rng.choice(["electronics", "fashion"]),
+                "quantity": rng.randint(1, 10),
+                "discount_percent": rng.choice([0.0, 0.05, 0.125, 0.333]),
+                # repeated values exercise anomaly tie-breaking
+                "revenue": rng.choice([100.0, 0.005, 12345.675, 99999.99]),
+            }
+            for i in range(500)
+        ]
+
+        row_wise = AggregationService(anomaly_top_n=5)
+        for row in rows:
+            row_wise.process(dict(row))
+
+        batched = AggregationService(anomaly_top_n=5)
+        for start in range(0, len(rows), 128):
+            batched.process_batch(pa.Table.from_pylist(rows[start:start + 128]))
+
+        self.assertEqual(batched.finalize(), row_wise.finalize())
+        self.assertEqual(sorted(batched.anomalies, key=lambda e: e[:2]), sorted(row_wise.anomalies, key=lambda e: e[:2]))
+
+    def test_spilled_state_matches_in_memory(self):
+        rows = [
+            {
+                "sale_month": "2024-01",
+                "product_key": f"p{i % 4000}",
+                "region": "north",
+                "category": "electronics",
+                "quantity": 1 + i % 3,
+                "discount_percent": 0.1,
+                "revenue": float(i % 997),
+            }
+            for i in range(20000)
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            in_memory = AggregationService(anomaly_top_n=3)
+            # 4000 keys exceed 1 MB of estimated state: spills every 1000 rows
+            spilling = AggregationService(anomaly_top_n=3, spill_dir=tmp, max_state_mb=1, check_every=1000)
+            other = AggregationService(anomaly_top_n=3, spill_dir=tmp, max_state_mb=1, check_every=1000)
+
+            for i, row in enumerate(rows):
+                in_memory.process(dict(row), seq=i)
+                (spilling if i < 15000 else other).process(dict(row), seq=i)
+
+            spilling.merge(other)
+            self.assertGreater(spilling.spill_count(), 0)
+            self.assertEqual(spilling.finalize(), in_memory.finalize())
+
+            spilling.close()
+            self.assertEqual(os.listdir(tmp), [])
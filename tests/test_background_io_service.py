@@ -0,0 +1,55 @@
+import unittest
+import tempfile
+import os
+
+from src.background_io_service import Prefetcher, WriteBehindWriter
+from src.checkpoint_service import CheckpointService
+from src.writer_service import WriterService
+
+
+class TestPrefetcher(unittest.TestCase):
+
+    def test_preserves_order(self):
+        self.assertEqual(list(Prefetcher(range(50), depth=3)), list(range(50)))
+
+    def test_propagates_source_errors(self):
+        def source():
+            yield 1
+            raise ValueError("bad chunk")
+
+        with self.assertRaises(ValueError):
+            list(Prefetcher(source(), depth=1))
+
+
+class TestWriteBehindWriter(unittest.TestCase):
+
+    def test_writes_then_commits_in_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = WriterService(tmp, gold_format="csv")
+            cp = CheckpointService(os.path.join(tmp, "bronze.json"))
+
+            write_behind = WriteBehindWriter(writer, cp, max_in_flight=1)
+            for chunk in range(4):
+                write_behind.submit("part.csv", chunk, [{"order_id": str(chunk), "sale_month": "2024-01"}])
+            write_behind.close()
+
+            self.assertEqual(len(os.listdir(writer.silver_dir)), 4)
+            self.assertEqual(CheckpointService(cp.path).get().chunk_index, 4)
+
+    def test_failed_write_stops_commits(self):
+        class FailingWriter:
+            def write_silver_chunk(self, source_file, chunk_index, rows):
+                if chunk_index == 1:
+                    raise IOError("disk full")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cp = CheckpointService(os.path.join(tmp, "bronze.json"))
+            write_behind = WriteBehindWriter(FailingWriter(), cp, max_in_flight=4)
+
+            write_behind.submit("part.csv", 0, [])
+            write_behind.submit("part.csv", 1, [])
+            write_behind.submit("part.csv", 2, [])
+
+            with self.assertRaises(IOError):
+                write_behind.close()
+            self.assertEqual(cp.get().chunk_index, 1)
@@ -0,0 +1,58 @@
+import unittest
+import tempfile
+import os
+import random
+
+from src.batch_dedup_service import ExternalSorter, SortMergeDedup
+from src.dedup_service import DedupService
+
+
+class TestBatchDedupService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_external_sort_spills_runs(self):
+        rng = random.Random(3)
+        items = [(f"ORD-{rng.randint(1, 500)}", rng.randint(0, 9), i) for i in range(2000)]
+
+        sorter = ExternalSorter(self.tmp.name, "ids", (str, int, int), buffer_rows=300)
+        for item in items:
+            sorter.add(item)
+
+        self.assertEqual(list(sorter.sorted()), sorted(items))
+        self.assertGreater(len(os.listdir(self.tmp.name)), 1)
+
+    def test_matches_per_row_lookups(self):
+        rng = random.Random(5)
+        files = {f"part_{f}.csv": [f"ORD-{rng.randint(1, 300)}" for _ in range(100)] for f in range(6)}
+        names = sorted(files)
+        already_seen = [f"ORD-{i}" for i in range(1, 300, 7)]
+
+        # reference: one lookup per row
+        lookup = DedupService(os.path.join(self.tmp.name, "lookup", "order_id.db"))
+        lookup.mark_seen_many(already_seen)
+        expected = []
+        for file_index, name in enumerate(names):
+            kept = []
+            for row_index, order_id in enumerate(files[name]):
+                if not lookup.is_duplicate(order_id):
+                    lookup.mark_seen(order_id)
+                    kept.append(row_index)
+            expected.append((file_index, kept))
+
+        store = DedupService(os.path.join(self.tmp.name, "batch", "order_id.db"))
+        store.mark_seen_many(already_seen)
+        batch = SortMergeDedup(store, os.path.join(self.tmp.name, "sort_tmp"), buffer_rows=64)
+
+        self.assertEqual(list(batch.run(names, files.get)), expected)
+        self.assertEqual(batch.rows_read, 600)
+        self.assertEqual(batch.duplicates, 600 - sum(len(kept) for _, kept in expected))
+
+        # the key set was bulk-loaded for later incremental runs
+        self.assertEqual(list(store.iter_sorted()), list(lookup.iter_sorted()))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "sort_tmp")))
+
+        lookup.close()
+        store.close()
@@ -0,0 +1,168 @@
+import unittest
+import tempfile
+import csv
+import glob
+import os
+
+from src.byte_range_service import RangePlan, clean_byte_range, split_byte_ranges
+from src.clean_transform_service import CleanTransformService
+
+
+HEADER = [
+    "order_id", "product_name", "category", "quantity", "unit_price",
+    "discount_percent", "region", "sale_date", "customer_email"
+]
+
+
+def _rows(n):
+    rows = []
+    for i in range(n):
+        # every third product name spans lines and holds escaped quotes
+        product = 'iPhone "14"\nPro' if i % 3 == 0 else "Nike Shoes"
+        rows.append([f"ORD-{i}", product, "electronics", "2", "100.5", "0.1", "North", "2024-01-15", "a@b.com"])
+    return rows
+
+
+class TestByteRangeService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.source = os.path.join(self.tmp.name, "sales.csv")
+        self.rows = _rows(300)
+
+        with open(self.source, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADER)
+            writer.writerows(self.rows)
+
+    def _read_range(self, start, end):
+        with open(self.source, "rb") as f:
+            f.seek(start)
+            text = f.read(end - start).decode("utf-8")
+        return list(csv.reader(text.splitlines(keepends=True)))
+
+    def test_ranges_cover_file_on_record_boundaries(self):
+        header, ranges = split_byte_ranges(self.source, 7)
+
+        self.assertEqual(header, HEADER)
+        self.assertGreater(len(ranges), 1)
+        self.assertEqual(ranges[-1][1], os.path.getsize(self.source))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+
+        # quoted newlines never split a record
+        parsed = [row for start, end in ranges for row in self._read_range(start, end)]
+        self.assertEqual(parsed, self.rows)
+
+    def test_plan_is_reused_until_source_changes(self):
+        range_dir = os.path.join(self.tmp.name, "ranges")
+        plan = RangePlan.create(range_dir, self.source, 4)
+        plan.mark_done(0)
+
+        loaded = RangePlan.load(range_dir, self.source)
+        self.assertEqual(loaded.ranges, plan.ranges)
+        self.assertEqual(loaded.done, {0})
+
+        with open(self.source, "a") as f:
+            f.write("ORD-x,Nike Shoes,fashion,1,10,0,North,2024-01-01,a@b.com\n")
+        self.assertIsNone(RangePlan.load(range_dir, self.source))
+
+    def test_range_cleaning_matches_serial(self):
+        out = os.path.join(self.tmp.name, "out")
+        plan = RangePlan.create(os.path.join(self.tmp.name, "ranges"), self.source, 3)
+
+        total = 0
+        for index, (start, end) in enumerate(plan.ranges):
+            task = {
+                "index": index,
+                "source": self.source,
+                "start": start,
+                "end": end,
+                "header": plan.header,
+                "schema_file": "schema.txt" if index % 2 else None,
+                "chunk_size": 40,
+                "cache_size": 64,
+                "output_dir": out,
+                "checkpoint_path": plan.checkpoint_path(index),
+            }
+            _, metrics = clean_byte_range(task)
+            total += metrics.rows_successful
+
+        silver = []
+        for path in sorted(glob.glob(os.path.join(out, "silver", "*.csv"))):
+            with open(path, newline="") as f:
+                silver.extend(csv.DictReader(f))
+
+        cleaner = CleanTransformService()
+        expected = [cleaner.process_row(dict(zip(HEADER, row)))["clean_row"] for row in self.rows]
+
+        self.assertEqual(total, len(self.rows))
+        self.assertEqual([row["order_id"] for row in silver], [row["order_id"] for row in expected])
+        self.assertEqual(silver[0]["product_name"], expected[0]["product_name"])
+
+    def _clean_plan(self, plan, out, indices):
+        for index in indices:
+            start, end = plan.ranges[index]
+            clean_byte_range({
+                "index": index,
+                "source": self.source,
+                "start": start,
+                "end": end,
+                "header": plan.header,
+                "schema_file": None,
+                "chunk_size": 40,
+                "cache_size": 64,
+                "output_dir": out,
+                "checkpoint_path": plan.checkpoint_path(index),
+            })
+            plan.mark_done(index)
+
+    def test_appended_source_gets_new_ranges_after_the_old_ones(self):
+        out = os.path.join(self.tmp.name, "out")
+        range_dir = os.path.join(self.tmp.name, "ranges")
+        plan = RangePlan.create(range_dir, self.source, 4)
+        self._clean_plan(plan, out, range(len(plan.ranges)))
+        old_silver = sorted(glob.glob(os.path.join(out, "silver", "*.csv")))
+
+        appended = _rows(200)[100:]
+        with open(self.source, "a", newline="") as f:
+            csv.writer(f).writerows(appended)
+        old_ranges, old_size = plan.ranges, plan.size
+
+        self.assertIsNone(RangePlan.load(range_dir, self.source))
+        plan = RangePlan.create(range_dir, self.source, 2)
+        new = list(range(len(old_ranges), len(plan.ranges)))
+
+        # only the appended bytes are split; finished ranges stay finished
+        self.assertEqual(plan.ranges[:len(old_ranges)], old_ranges)
+        self.assertEqual(plan.ranges[new[0]][0], old_size)
+        self.assertEqual(plan.done, set(range(len(old_ranges))))
+
+        self._clean_plan(plan, out, new)
+        new_silver = sorted(set(glob.glob(os.path.join(out, "silver", "*.csv"))) - set(old_silver))
+
+        # past the Silver checkpoint (the last old file), and every row read once
+        self.assertGreater(new_silver[0], old_silver[-1])
+        order_ids = []
+        for path in old_silver + new_silver:
+            with open(path, newline="") as f:
+                order_ids.extend(row["order_id"] for row in csv.DictReader(f))
+        self.assertEqual(order_ids, [row[0] for row in self.rows + appended])
+
+    def test_rewritten_source_is_split_again_from_the_start(self):
+        range_dir = os.path.join(self.tmp.name, "ranges")
+        plan = RangePlan.create(range_dir, self.source, 3)
+        plan.mark_done(0)
+        old_count = len(plan.ranges)
+
+        with open(self.source, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADER)
+            writer.writerows(_rows(400)[::-1])
+
+        plan = RangePlan.create(range_dir, self.source, 2)
+        header_end = plan.ranges[0][0]
+        self.assertEqual(plan.ranges[old_count][0], header_end)
+        self.assertEqual(plan.ranges[-1][1], os.path.getsize(self.source))
+        self.assertEqual(plan.done, {0})
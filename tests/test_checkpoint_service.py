@@ -2,6 +2,7 @@ import unittest
 import tempfile
 import os
 import json
+from unittest import mock
 
 from src.checkpoint_service import Checkpoint, CheckpointService
 
@@ -50,4 +51,69 @@ class TestCheckpointService(unittest.TestCase):
 
     #     os.remove(path)
         
-	
\ No newline at end of file
+	
+
+class TestCheckpointCrashRecovery(unittest.TestCase):
+    """
+    Crash injection: a new service over the same path stands in for the
+    restarted process.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "bronze.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_snapshot_crash_before_swap_keeps_previous(self):
+        service = CheckpointService(self.path)
+        service.save(Checkpoint(file="a.csv", chunk_index=1))
+
+        with mock.patch("src.checkpoint_service.os.replace", side_effect=OSError("crash")):
+            with self.assertRaises(OSError):
+                service.save(Checkpoint(file="a.csv", chunk_index=2))
+
+        recovered = CheckpointService(self.path).get()
+        self.assertEqual(recovered.chunk_index, 1)
+
+    def test_wal_crash_without_close_recovers_last_record(self):
+        service = CheckpointService(self.path, mode="wal", commit_every=10)
+        for i in range(1, 6):
+            service.save(Checkpoint(file="a.csv", chunk_index=i))
+        # no close(): process dies with an uncompacted log
+
+        recovered = CheckpointService(self.path, mode="wal").get()
+        self.assertEqual(recovered.file, "a.csv")
+        self.assertEqual(recovered.chunk_index, 5)
+
+    def test_wal_torn_record_is_ignored(self):
+        service = CheckpointService(self.path, mode="wal")
+        service.save(Checkpoint(file="a.csv", chunk_index=3))
+        with open(service.wal_path, "a") as f:
+            f.write('{"file": "a.csv", "chunk_in')
+
+        restarted = CheckpointService(self.path, mode="wal")
+        self.assertEqual(restarted.get().chunk_index, 3)
+
+        restarted.save(Checkpoint(file="a.csv", chunk_index=4))
+        self.assertEqual(CheckpointService(self.path, mode="wal").get().chunk_index, 4)
+
+    def test_wal_close_compacts_log(self):
+        service = CheckpointService(self.path, mode="wal", commit_every=100)
+        service.save(Checkpoint(file="b.csv", chunk_index=7))
+        service.close()
+
+        self.assertFalse(os.path.exists(service.wal_path))
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {"file": "b.csv", "chunk_index": 7})
+
+    def test_snapshot_mode_supersedes_leftover_wal(self):
+        wal = CheckpointService(self.path, mode="wal")
+        wal.save(Checkpoint(file="a.csv", chunk_index=2))
+
+        snapshot = CheckpointService(self.path)
+        self.assertEqual(snapshot.get().chunk_index, 2)
+        snapshot.save(Checkpoint(file="b.csv", chunk_index=0))
+
+        self.assertEqual(CheckpointService(self.path).get().file, "b.csv")
@@ -31,3 +31,28 @@ class TestCleanTransformService(unittest.TestCase):
         }
         result = self.service.process_row(row)
         self.assertFalse(result["is_valid"])
+
+    def test_normalize_cache_matches_uncached(self):
+        uncached = CleanTransformService(cache_size=0)
+        variants = [
+            ("  iPhone 14 ", "Electronic", " NORT"),
+            ("Samsung--Galaxy S22!", "home-appl", "west "),
+            ("", "toys", ""),
+            (None, None, None),
+            ("  iPhone 14 ", "Electronic", " NORT"),
+        ]
+
+        for product, category, region in variants:
+            row = {
+                "order_id": "1",
+                "product_name": product,
+                "category": category,
+                "quantity": "1",
+                "unit_price": "10",
+                "region": region,
+            }
+            self.assertEqual(self.service.process_row(dict(row)), uncached.process_row(dict(row)))
+
+        stats = self.service.cache_stats()
+        self.assertEqual(stats["product"], (2, 3))  # None and "" share a key
+        self.assertEqual(uncached.cache_stats()["region"], (0, 5))
@@ -2,7 +2,7 @@ import unittest
 import tempfile
 import os
 
-from src.config_service import Config, ConfigError
+from src.config_service import DEFAULT_CHUNK_SIZE, Config, ConfigError
 
 
 class TestConfigService(unittest.TestCase):
@@ -102,6 +102,49 @@ high_revenue_threshold = 100000
         self.assertEqual(config.chunk_size, 1000)
         self.assertEqual(config.max_rows, -1)
         self.assertFalse(config.enable_checkpoint)
+        self.assertFalse(config.auto_chunk_size)
+        self.assertFalse(config.auto_workers)
+        self.assertEqual(config.dedup_journal_mode, "delete")
+
+        os.remove(path)
+
+    def test_auto_chunk_size_and_workers(self):
+        content = """
+[PIPELINE]
+chunk_size = auto
+max_rows = -1
+enable_checkpoint = false
+checkpoint_file = checkpoint.json
+
+[INPUT]
+input_type = file
+input_path = data.csv
+
+[OUTPUT]
+output_dir = out
+format = csv
+
+[MEMORY]
+max_chunk_mb = 128
+flush_interval = 1000
+
+[ANOMALY]
+top_n = 5
+high_revenue_threshold = 100000
+
+[PARALLEL]
+workers = Auto
+"""
+        with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
+            f.write(content)
+            path = f.name
+
+        config = Config(path)
+        self.assertTrue(config.auto_chunk_size)
+        self.assertTrue(config.auto_workers)
+        # starting values until the pipeline tunes them
+        self.assertEqual(config.chunk_size, DEFAULT_CHUNK_SIZE)
+        self.assertEqual(config.workers, 1)
 
         os.remove(path)
         
@@ -0,0 +1,49 @@
+import unittest
+import tempfile
+import os
+
+from src.dashboard.loaders import load_table
+from src.writer_service import WriterService
+
+
+MONTHLY = [
+    {"sale_month": "2024-02", "total_revenue": 20.0, "total_quantity": 2, "avg_discount": 0.1},
+    {"sale_month": "1970-01", "total_revenue": 5.0, "total_quantity": 1, "avg_discount": 0.0},
+    {"sale_month": "2024-01", "total_revenue": 10.0, "total_quantity": 1, "avg_discount": 0.2},
+]
+
+
+class TestDashboardLoaders(unittest.TestCase):
+
+    def test_projection_filter_and_sort(self):
+        for fmt in ("csv", "parquet", "orc"):
+            with tempfile.TemporaryDirectory() as tmp:
+                WriterService(tmp, gold_format=fmt).write_gold_table("monthly", MONTHLY)
+
+                df = load_table(
+                    tmp, "monthly",
+                    columns=["sale_month", "total_revenue"],
+                    sale_month_after="1970-01-01",
+                    sort_by="sale_month"
+                )
+
+                self.assertEqual(list(df.columns), ["sale_month", "total_revenue"], fmt)
+                self.assertEqual(list(df["sale_month"]), ["2024-01", "2024-02"], fmt)
+
+    def test_cache_invalidated_when_table_rewritten(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = WriterService(tmp, gold_format="csv")
+            writer.write_gold_table("monthly", MONTHLY)
+
+            first = load_table(tmp, "monthly")
+            self.assertIs(load_table(tmp, "monthly"), first)
+
+            writer.write_gold_table("monthly", MONTHLY[:1])
+            reloaded = load_table(tmp, "monthly")
+            self.assertIsNot(reloaded, first)
+            self.assertEqual(len(reloaded), 1)
+
+    def test_missing_table_raises(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(FileNotFoundError):
+                load_table(tmp, "nope")
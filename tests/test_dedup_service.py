@@ -0,0 +1,75 @@
+import unittest
+import tempfile
+import os
+import sqlite3
+import time
+
+from src.dedup_service import DedupService, drop_duplicates
+
+
+class TestDedupService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "dedup", "order_id.db")
+
+    def test_migrates_store_without_first_seen(self):
+        os.makedirs(os.path.dirname(self.path))
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE seen (order_id TEXT PRIMARY KEY)")
+        conn.executemany("INSERT INTO seen VALUES (?)", [("ORD-1",), ("ORD-2",)])
+        conn.commit()
+        conn.close()
+
+        dedup = DedupService(self.path, journal_mode="wal")
+        self.assertTrue(dedup.is_duplicate("ORD-1"))
+
+        first_seen = [row[0] for row in dedup.conn.execute("SELECT first_seen FROM seen")]
+        self.assertTrue(all(abs(ts - time.time()) < 60 for ts in first_seen))
+        self.assertEqual(dedup.conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        dedup.close()
+
+    def test_compact_drops_only_expired_keys(self):
+        dedup = DedupService(self.path)
+        dedup.mark_seen_many(f"ORD-{i}" for i in range(25))
+        dedup.mark_seen("ORD-new")
+
+        # 25 keys first seen 100 days ago, one today
+        old = int(time.time() - 100 * 86400)
+        with dedup.conn:
+            dedup.conn.execute("UPDATE seen SET first_seen = ? WHERE order_id != 'ORD-new'", (old,))
+
+        self.assertEqual(dedup.compact(retention_days=90, batch_size=10), 25)
+        self.assertEqual(dedup.count(), 1)
+        self.assertTrue(dedup.is_duplicate("ORD-new"))
+        self.assertFalse(dedup.is_duplicate("ORD-3"))
+
+        # no retention: rebuild only
+        self.assertEqual(dedup.compact(), 0)
+        self.assertEqual(dedup.count(), 1)
+        dedup.close()
+
+    def test_drop_duplicates_keeps_what_phase_2_would_keep(self):
+        dedup = DedupService(self.path)
+        dedup.mark_seen_many(f"ORD-{i}" for i in range(0, 1200, 2))
+
+        rows = [{"order_id": f"ORD-{i % 1000}", "seq": i} for i in range(1500)]
+
+        # per-row lookups, as Phase 2 does them
+        seen = set()
+        expected = []
+        for row in rows:
+            if row["order_id"] in seen or dedup.is_duplicate(row["order_id"]):
+                continue
+            seen.add(row["order_id"])
+            expected.append(row)
+
+        kept, dropped = drop_duplicates(rows, dedup)
+        self.assertEqual(kept, expected)
+        self.assertEqual(dropped, len(rows) - len(expected))
+
+        # in-chunk only; the store is not written to
+        self.assertEqual(len(drop_duplicates(rows)[0]), 1000)
+        self.assertEqual(dedup.count(), 600)
+        dedup.close()
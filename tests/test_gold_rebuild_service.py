@@ -0,0 +1,125 @@
+import unittest
+import tempfile
+import os
+import random
+import csv
+import time
+
+from src.aggregation_service import AggregationService
+from src.clean_transform_service import CleanTransformService
+from src.dedup_service import DedupService
+from src.gold_rebuild_service import GoldRebuildService
+from src.writer_service import WriterService
+
+
+def _write_silver(tmp, files=6, rows_per_file=80):
+    rnd = random.Random(7)
+    writer = WriterService(tmp, gold_format="csv")
+
+    for f in range(files):
+        rows = []
+        for _ in range(rows_per_file):
+            rows.append({
+                "order_id": f"ORD-{rnd.randint(1, 200)}",
+                "quantity": rnd.randint(1, 5),
+                "unit_price": 10.0,
+                "product_name": "p",
+                "product_key": f"p{rnd.randint(1, 15)}",
+                "category": rnd.choice(["fashion", "electronics"]),
+                "discount_percent": rnd.choice([0.0, 0.1, 0.37]),
+                "region": rnd.choice(["north", "south", "east"]),
+                "sale_date": "2024-01-01",
+                "sale_month": rnd.choice(["2024-01", "2024-02", "2024-03"]),
+                "customer_email": "",
+                # few distinct values so anomaly ties are common
+                "revenue": rnd.choice([10.0, 20.5, 99.99]),
+            })
+        writer.write_silver_chunk("part.csv", f, rows)
+
+    return sorted(writer.manifest.select())
+
+
+def _serial_reference(files, top_n):
+    aggregator = AggregationService(top_n)
+    seen = set()
+    for path in files:
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row["order_id"] in seen:
+                    continue
+                seen.add(row["order_id"])
+                aggregator.process(CleanTransformService.normalize_silver_row(row))
+    return aggregator.finalize(), seen
+
+
+class TestGoldRebuildService(unittest.TestCase):
+
+    def test_parallel_rebuild_matches_serial(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            files = _write_silver(tmp)
+            expected, expected_ids = _serial_reference(files, top_n=5)
+            dedup_path = os.path.join(tmp, "dedup", "order_id.db")
+
+            for workers in (1, 3):
+                rebuilder = GoldRebuildService(tmp, dedup_path, anomaly_top_n=5, workers=workers)
+                result = rebuilder.rebuild(files).finalize()
+                self.assertEqual(result, expected, f"workers={workers}")
+
+                dedup = DedupService(dedup_path)
+                stored = {r[0] for r in dedup.conn.execute("SELECT order_id FROM seen")}
+                dedup.close()
+                self.assertEqual(stored, expected_ids)
+
+            self.assertFalse(os.path.exists(rebuilder.spill_dir))
+
+    def test_rebuild_keeps_first_seen_and_compacted_keys_stay_expired(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            files = _write_silver(tmp)
+            dedup_path = os.path.join(tmp, "dedup", "order_id.db")
+            rebuilder = GoldRebuildService(tmp, dedup_path, anomaly_top_n=5, retention_days=90)
+            rebuilder.rebuild(files)
+
+            # the first Silver file and its keys are 100 days old, one other key 10 days
+            old, recent = int(time.time() - 100 * 86400), int(time.time() - 10 * 86400)
+            os.utime(files[0], (old, old))
+            with open(files[0], "r", newline="", encoding="utf-8") as f:
+                old_ids = {row["order_id"] for row in csv.DictReader(f)}
+            _, all_ids = _serial_reference(files, top_n=5)
+            kept_id = sorted(all_ids - old_ids)[0]
+
+            dedup = DedupService(dedup_path)
+            with dedup.conn:
+                dedup.conn.executemany("UPDATE seen SET first_seen = ? WHERE order_id = ?", [(old, i) for i in old_ids])
+                dedup.conn.execute("UPDATE seen SET first_seen = ? WHERE order_id = ?", (recent, kept_id))
+            self.assertEqual(dedup.compact(retention_days=90), len(old_ids))
+            dedup.close()
+
+            for workers in (1, 3):
+                GoldRebuildService(tmp, dedup_path, anomaly_top_n=5, workers=workers, retention_days=90).rebuild(files)
+
+                dedup = DedupService(dedup_path)
+                stored = dict(dedup.conn.execute("SELECT order_id, first_seen FROM seen"))
+                dedup.close()
+                self.assertEqual(set(stored), all_ids - old_ids, f"workers={workers}")
+                self.assertEqual(stored[kept_id], recent)
+
+    def test_merge_combines_partial_states(self):
+        row = {
+            "sale_month": "2024-01",
+            "product_key": "p1",
+            "region": "north",
+            "category": "electronics",
+            "quantity": 1,
+            "discount_percent": 0.1,
+            "revenue": 0.1
+        }
+        left, right = AggregationService(2), AggregationService(2)
+        left.process(dict(row), seq=0)
+        right.process(dict(row), seq=1)
+        right.process(dict(row), seq=2)
+        left.merge(right)
+
+        monthly = left.finalize()["monthly_sales_summary"][0]
+        self.assertEqual(monthly["total_revenue"], 0.3)
+        self.assertEqual(monthly["total_quantity"], 3)
+        self.assertEqual(len(left.anomalies), 2)
@@ -0,0 +1,106 @@
+import unittest
+import tempfile
+import csv
+import glob
+import multiprocessing
+import os
+
+from src.clean_transform_service import CleanTransformService
+from src.handoff_service import (
+    ArrowHandoff,
+    _owner_prefix,
+    clean_handoff_chunk,
+    init_clean_worker,
+    read_records,
+    sweep_stale,
+)
+from src.profiling_service import ChunkProfiler
+from src.schema_service import RECORD_FIELDS, BronzeSchema
+
+
+ROWS = [
+    {
+        "order_id": "ORD-1", "product_name": "iPhone 14", "category": "electronics", "quantity": "2",
+        "unit_price": "100.5", "discount_percent": "0.1", "region": "North", "sale_date": "2024-01-15",
+        "customer_email": "a@b.com",
+    },
+    {
+        "order_id": "ORD-2", "product_name": "nike shoe", "category": "fashion", "quantity": "zero",
+        "unit_price": "10", "discount_percent": "0", "region": None, "sale_date": "", "customer_email": "",
+    },
+]
+
+
+def _noop():
+    pass
+
+
+class TestHandoffService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = os.path.join(self.tmp.name, "handoff")
+
+    def test_round_trip_and_cleanup(self):
+        records = [(None, "Nike Shoes", "fashion", "1", 10.5, None, "North", "2024-01-01", "")]
+
+        with ArrowHandoff(self.root) as handoff:
+            path = handoff.put(ROWS)
+            self.assertEqual(read_records(path), [tuple(map(row.get, RECORD_FIELDS)) for row in ROWS])
+            self.assertFalse(os.path.exists(path))
+
+        self.assertFalse(os.path.exists(handoff.dir))
+
+        # schema ingestion hands over typed record tuples
+        with ArrowHandoff(self.root, BronzeSchema.load("schema.txt")) as handoff:
+            self.assertEqual(read_records(handoff.put(records)), records)
+
+    def test_sweep_removes_only_dead_owners(self):
+        child = multiprocessing.Process(target=_noop)
+        child.start()
+        child.join()
+
+        prefix = _owner_prefix()
+        dead = os.path.join(self.root, f"{prefix}{child.pid}")
+        alive = os.path.join(self.root, f"{prefix}{os.getpid()}")
+        other_host = os.path.join(self.root, f"not-{prefix}{child.pid}")
+        for path in (dead, alive, other_host):
+            os.makedirs(path)
+
+        self.assertEqual(sweep_stale(self.root), [dead])
+        self.assertTrue(os.path.isdir(alive))
+        self.assertTrue(os.path.isdir(other_host))
+
+    def test_worker_cleans_like_serial(self):
+        out = os.path.join(self.tmp.name, "out")
+        init_clean_worker(64, out)
+
+        with ArrowHandoff(self.root) as handoff:
+            metrics = clean_handoff_chunk(handoff.put(ROWS), "sales_part_0001.csv", 0)
+
+        self.assertEqual(metrics.rows_successful, 1)
+        self.assertEqual(metrics.rows_rejected, 1)
+
+        (silver_path,) = glob.glob(os.path.join(out, "silver", "*.csv"))
+        with open(silver_path, newline="") as f:
+            silver = list(csv.DictReader(f))
+
+        expected = CleanTransformService().process_row(ROWS[0])["clean_row"]
+        self.assertEqual(silver, [{k: str(v) for k, v in expected.items()}])
+
+    def test_worker_profiles_sampled_chunks(self):
+        out = os.path.join(self.tmp.name, "out")
+        profiler = ChunkProfiler(out, sample_rate=1.0, stages=["clean", "silver_write"])
+        init_clean_worker(64, out, profiler=profiler)
+
+        with ArrowHandoff(self.root) as handoff:
+            unsampled = clean_handoff_chunk(handoff.put(ROWS), "sales_part_0001.csv", 0)
+            label = profiler.start_chunk("bronze_sales_part_0001.csv_c1").label
+            sampled = clean_handoff_chunk(handoff.put(ROWS), "sales_part_0001.csv", 1, label)
+
+        self.assertEqual(unsampled.profiles, [])
+        self.assertEqual([(p["chunk"], p["stage"]) for p in sampled.profiles], [
+            (label, "clean"), (label, "silver_write")
+        ])
+        self.assertTrue(glob.glob(os.path.join(profiler.profile_dir, f"{label}_clean.prof")))
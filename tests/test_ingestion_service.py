@@ -4,7 +4,7 @@ import os
 import csv
 
 from src.ingestion_service import IngestionService
-from src.checkpoint_service import CheckpointService
+from src.checkpoint_service import Checkpoint, CheckpointService
 from src.config_service import Config
 
 
@@ -52,3 +52,106 @@ high_revenue_threshold = 100
 
             chunks = list(ingestion.read_bronze_chunks())
             self.assertEqual(len(chunks), 3)  # 2,2,1
+
+
+def _write_config(tmp, input_type, input_path, chunk_size=2, file_pattern="data_*.csv"):
+    conf = f"""
+[PIPELINE]
+chunk_size = {chunk_size}
+max_rows = -1
+enable_checkpoint = false
+checkpoint_file = cp.json
+
+[INPUT]
+input_type = {input_type}
+input_path = {input_path}
+file_pattern = {file_pattern}
+
+[OUTPUT]
+output_dir = {os.path.join(tmp, "out")}
+format = csv
+
+[MEMORY]
+max_chunk_mb = 128
+flush_interval = 1000
+
+[ANOMALY]
+top_n = 5
+high_revenue_threshold = 100
+"""
+    conf_path = os.path.join(tmp, "conf.ini")
+    with open(conf_path, "w") as f:
+        f.write(conf)
+    return Config(conf_path)
+
+
+class TestCompressedBronze(unittest.TestCase):
+
+    def _csv_bytes(self, start, count, header=True):
+        lines = ["a,b\n"] if header else []
+        lines += [f"{i},{i}\n" for i in range(start, start + count)]
+        return "".join(lines).encode("utf-8")
+
+    def test_directory_pattern_matches_compressed_files(self):
+        import gzip
+        import zstandard
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "data_1.csv"), "wb") as f:
+                f.write(self._csv_bytes(0, 3))
+            with open(os.path.join(tmp, "data_2.csv.gz"), "wb") as f:
+                # multi-member gzip: header + rows split across members
+                f.write(gzip.compress(self._csv_bytes(0, 2)))
+                f.write(gzip.compress(self._csv_bytes(2, 3, header=False)))
+            with open(os.path.join(tmp, "data_3.csv.zst"), "wb") as f:
+                f.write(zstandard.ZstdCompressor().compress(self._csv_bytes(0, 4)))
+
+            config = _write_config(tmp, "directory", tmp)
+            ingestion = IngestionService(config, CheckpointService("x", False), CheckpointService("y", False))
+
+            rows = {}
+            for chunk in ingestion.read_bronze_chunks():
+                rows.setdefault(os.path.basename(chunk["file"]), []).extend(chunk["rows"])
+
+            self.assertEqual(len(rows["data_1.csv"]), 3)
+            self.assertEqual([r["a"] for r in rows["data_2.csv.gz"]], ["0", "1", "2", "3", "4"])
+            self.assertEqual(len(rows["data_3.csv.zst"]), 4)
+
+    def test_resume_on_compressed_file(self):
+        import gzip
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "big.csv.gz")
+            with open(path, "wb") as f:
+                f.write(gzip.compress(self._csv_bytes(0, 5)))
+
+            cp = CheckpointService(os.path.join(tmp, "bronze.json"))
+            cp.save(Checkpoint(file=path, chunk_index=1))
+
+            config = _write_config(tmp, "file", path)
+            ingestion = IngestionService(config, cp, CheckpointService("y", False))
+
+            chunks = list(ingestion.read_bronze_chunks())
+            self.assertEqual([c["chunk_index"] for c in chunks], [1, 2])
+            self.assertEqual(chunks[0]["rows"][0]["a"], "2")
+
+    def test_resume_keeps_chunk_size_file_was_started_with(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "big.csv")
+            with open(path, "wb") as f:
+                f.write(self._csv_bytes(0, 7))
+
+            # started with chunk_size = 3; the config (auto-tuning) now says 2
+            cp = CheckpointService(os.path.join(tmp, "bronze.json"))
+            cp.save(Checkpoint(file=path, chunk_index=1, chunk_size=3))
+            cp = CheckpointService(os.path.join(tmp, "bronze.json"))
+
+            config = _write_config(tmp, "file", path)
+            ingestion = IngestionService(config, cp, CheckpointService("y", False))
+
+            chunks = list(ingestion.read_bronze_chunks())
+            self.assertEqual([c["chunk_index"] for c in chunks], [1, 2])
+            self.assertEqual([[r["a"] for r in c["rows"]] for c in chunks], [["3", "4", "5"], ["6"]])
+            self.assertEqual({c["chunk_size"] for c in chunks}, {3})
+
+            self.assertEqual([r["a"] for r in ingestion.sample_bronze_rows(4)], ["0", "1", "2", "3"])
@@ -0,0 +1,135 @@
+import unittest
+import tempfile
+import multiprocessing
+import os
+import sqlite3
+import time
+
+from src.lease_service import MERGE_ITEM, LeaseService
+
+
+ITEMS = [f"part_{i:04d}.csv" for i in range(12)]
+
+
+def _worker(path, worker_id, log_dir, crash_after_claim=False):
+    """
+    Stands in for one node: claims items until none are left, then tries
+    to take the Gold merge.
+    """
+    leases = LeaseService(path, worker_id, lease_seconds=0.5)
+    leases.register(ITEMS)
+
+    while True:
+        item = leases.claim()
+        if item is None:
+            if leases.all_done():
+                break
+            time.sleep(0.1)
+            continue
+
+        if crash_after_claim:
+            os._exit(1)  # dies holding the lease
+
+        with leases.keep_alive(item, interval=0.1):
+            time.sleep(0.02)
+            with open(os.path.join(log_dir, f"{worker_id}.log"), "a") as f:
+                f.write(item + "\n")
+
+        leases.complete(item)
+
+    if leases.claim_merge():
+        with open(os.path.join(log_dir, "merge.log"), "a") as f:
+            f.write(worker_id + "\n")
+        leases.complete(MERGE_ITEM)
+
+    leases.close()
+
+
+class TestLeaseService(unittest.TestCase):
+
+    def test_claim_complete_and_merge(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "coordination", "leases.db")
+            a = LeaseService(path, "a")
+            b = LeaseService(path, "b")
+
+            self.assertEqual(a.register(["f1", "f2"]), 2)
+            self.assertEqual(b.register(["f1", "f2"]), 0)
+
+            self.assertEqual(a.claim(), "f1")
+            self.assertEqual(b.claim(), "f2")
+            self.assertIsNone(a.claim())
+
+            # only the owner can complete
+            self.assertFalse(a.complete("f2"))
+            self.assertFalse(a.claim_merge())
+
+            self.assertTrue(a.complete("f1"))
+            self.assertTrue(b.complete("f2"))
+            self.assertTrue(a.all_done())
+
+            self.assertTrue(b.claim_merge())
+            self.assertFalse(a.claim_merge())
+            b.complete(MERGE_ITEM)
+
+            # new input reopens the merge
+            a.register(["f3"])
+            self.assertEqual(a.status(MERGE_ITEM), "pending")
+
+            a.close()
+            b.close()
+
+    def test_expired_lease_is_reclaimed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "leases.db")
+            dead = LeaseService(path, "dead", lease_seconds=0.05)
+            alive = LeaseService(path, "alive", lease_seconds=0.05)
+            dead.register(["f1"])
+
+            self.assertEqual(dead.claim(), "f1")
+            self.assertIsNone(alive.claim())
+
+            time.sleep(0.1)
+            self.assertEqual(alive.claim(), "f1")
+            self.assertFalse(dead.heartbeat("f1"))
+            self.assertFalse(dead.complete("f1"))
+            self.assertTrue(alive.complete("f1"))
+
+            dead.close()
+            alive.close()
+
+    def test_processes_share_work_and_survive_a_dead_worker(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "coordination", "leases.db")
+
+            crashed = multiprocessing.Process(target=_worker, args=(path, "crashed", tmp, True))
+            crashed.start()
+            crashed.join()
+
+            workers = [
+                multiprocessing.Process(target=_worker, args=(path, f"w{i}", tmp))
+                for i in range(3)
+            ]
+            for p in workers:
+                p.start()
+            for p in workers:
+                p.join()
+                self.assertEqual(p.exitcode, 0)
+
+            processed = []
+            for i in range(3):
+                log = os.path.join(tmp, f"w{i}.log")
+                if os.path.exists(log):
+                    with open(log) as f:
+                        processed.extend(f.read().split())
+
+            # every item exactly once, including the one the crashed worker held
+            self.assertEqual(sorted(processed), ITEMS)
+
+            with open(os.path.join(tmp, "merge.log")) as f:
+                self.assertEqual(len(f.read().split()), 1)
+
+            conn = sqlite3.connect(path)
+            attempts = dict(conn.execute("SELECT item, attempts FROM leases"))
+            conn.close()
+            self.assertEqual(attempts[ITEMS[0]], 2)
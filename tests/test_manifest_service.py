@@ -0,0 +1,62 @@
+import unittest
+import tempfile
+import os
+
+from src.writer_service import WriterService
+
+
+def _row(order_id, month, region, category):
+    return {
+        "order_id": order_id,
+        "sale_month": month,
+        "region": region,
+        "category": category,
+        "revenue": 10.0
+    }
+
+
+class TestSilverManifest(unittest.TestCase):
+
+    def test_manifest_records_chunk_stats(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = WriterService(tmp, gold_format="csv")
+            writer.write_silver_chunk("input/part_0001.csv", 0, [
+                _row("1", "2024-01", "north", "fashion"),
+                _row("2", "2024-03", "south", "fashion"),
+            ])
+
+            entries = writer.manifest.entries()
+            self.assertEqual(len(entries), 1)
+
+            entry = entries[0]
+            self.assertEqual(entry["file"], "part_0001_chunk_0000.csv")
+            self.assertEqual(entry["source_file"], "input/part_0001.csv")
+            self.assertEqual(entry["row_count"], 2)
+            self.assertEqual(entry["min_sale_month"], "2024-01")
+            self.assertEqual(entry["max_sale_month"], "2024-03")
+            self.assertEqual(entry["regions"], ["north", "south"])
+            self.assertGreater(entry["byte_size"], 0)
+
+    def test_select_skips_irrelevant_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = WriterService(tmp, gold_format="csv")
+            writer.write_silver_chunk("a.csv", 0, [_row("1", "2023-05", "north", "fashion")])
+            writer.write_silver_chunk("a.csv", 1, [_row("2", "2024-02", "east", "electronics")])
+            # replayed chunk supersedes the earlier entry
+            writer.write_silver_chunk("a.csv", 1, [_row("2", "2024-02", "west", "electronics")])
+
+            by_month = writer.manifest.select(min_month="2024-01")
+            self.assertEqual([os.path.basename(p) for p in by_month], ["a_chunk_0001.csv"])
+
+            self.assertEqual(writer.manifest.select(regions=["east"]), [])
+            self.assertEqual(len(writer.manifest.select(regions=["north", "west"])), 2)
+
+    def test_bootstrap_indexes_existing_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = WriterService(tmp, gold_format="csv")
+            writer.write_silver_chunk("a.csv", 0, [_row("1", "2024-01", "north", "fashion")])
+            os.remove(writer.manifest.path)
+
+            rebuilt = WriterService(tmp, gold_format="csv").manifest.entries()
+            self.assertEqual(len(rebuilt), 1)
+            self.assertEqual(rebuilt[0]["row_count"], 1)
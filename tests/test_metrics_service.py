@@ -14,3 +14,9 @@ class TestMetricsService(unittest.TestCase):
         self.assertEqual(summary["rows_read"], 1)
         self.assertEqual(summary["rows_successful"], 1)
         self.assertEqual(summary["rows_rejected"], 1)
+
+    def test_cache_hit_rates(self):
+        m = MetricsService()
+        m.record_cache_stats({"product": (3, 1), "region": (0, 0)})
+
+        self.assertEqual(m.summary()["cache_hit_rates"], {"product": 0.75, "region": 0.0})
@@ -0,0 +1,331 @@
+import unittest
+import tempfile
+import os
+import csv
+import json
+import logging
+import shutil
+import threading
+import time
+
+from src.config_service import Config
+from src.lease_service import LeaseService, lease_path
+from src.pipeline_orchestrator import Pipeline, dry_run, run_distributed, run_pipeline, watch_pipeline
+
+
+def _sales_file(path, start, count):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "order_id", "product_name", "category", "quantity", "unit_price",
+            "discount_percent", "region", "sale_date", "customer_email"
+        ])
+        for i in range(start, start + count):
+            # distinct prices: no revenue ties in anomaly_records
+            writer.writerow([f"ORD-{i}", "iphone 14", "electronics", 1, 10.0 + i, 0.0, "north", "2024-01-15", ""])
+
+
+def _write_conf(tmp, extra="", checkpoints=""):
+    input_dir = os.path.join(tmp, "input")
+    os.makedirs(input_dir, exist_ok=True)
+    os.makedirs(os.path.join(tmp, "checkpoints"), exist_ok=True)
+
+    path = os.path.join(tmp, "conf.ini")
+    with open(path, "w") as f:
+        f.write(f"""
+[PIPELINE]
+chunk_size = 2
+max_rows = -1
+enable_checkpoint = true
+checkpoint_file = cp.json
+
+[INPUT]
+input_type = directory
+input_path = {input_dir}
+file_pattern = part_*.csv
+
+[OUTPUT]
+output_dir = {os.path.join(tmp, "out")}
+format = csv
+
+[CHECKPOINTS]
+bronze_checkpoint = {os.path.join(tmp, "checkpoints", "bronze.json")}
+silver_checkpoint = {os.path.join(tmp, "checkpoints", "silver.json")}
+{checkpoints}
+
+[MEMORY]
+max_chunk_mb = 128
+flush_interval = 1000
+
+[ANOMALY]
+top_n = 5
+high_revenue_threshold = 100
+{extra}
+""")
+    return path, input_dir
+
+
+def _gold(tmp):
+    gold_dir = os.path.join(tmp, "out", "gold")
+    tables = {}
+    for name in sorted(os.listdir(gold_dir)):
+        with open(os.path.join(gold_dir, name), newline="") as f:
+            tables[name] = list(csv.DictReader(f))
+    return tables
+
+
+def _batch_gold(input_dir):
+    """
+    Gold of a single batch run over input_dir's files (the reference).
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        conf, reference_input = _write_conf(tmp)
+        for name in os.listdir(input_dir):
+            shutil.copy(os.path.join(input_dir, name), reference_input)
+        run_pipeline(conf)
+        return _gold(tmp)
+
+
+def _checkpoint(tmp, layer):
+    with open(os.path.join(tmp, "checkpoints", f"{layer}.json")) as f:
+        return json.load(f)
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.02)
+
+
+def _tree(root):
+    return {
+        os.path.join(directory, name): os.stat(os.path.join(directory, name)).st_mtime_ns
+        for directory, _, names in os.walk(root) for name in names
+    }
+
+
+class TestDryRun(unittest.TestCase):
+
+    def test_dry_run_writes_nothing_and_reports_done_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conf, input_dir = _write_conf(tmp, checkpoints="mode = wal")
+            _sales_file(os.path.join(input_dir, "part_0001.csv"), 0, 5)
+
+            with self.assertLogs("pipeline", level="INFO") as logs:
+                dry_run(conf)
+            self.assertFalse(os.path.exists(os.path.join(tmp, "out")))
+            self.assertTrue(any("Pending Bronze file" in line and "part_0001" in line for line in logs.output))
+
+            run_pipeline(conf)
+
+            # a torn trailing record, as left by a crash during an append
+            wal_path = os.path.join(tmp, "checkpoints", "bronze.json.wal")
+            with open(os.path.join(tmp, "checkpoints", "bronze.json")) as f:
+                record = f.read()
+            with open(wal_path, "w") as f:
+                f.write(record + "\n" + '{"file": "part_')
+            before = _tree(tmp)
+
+            with self.assertLogs("pipeline", level="INFO") as logs:
+                dry_run(conf)
+            self.assertEqual(_tree(tmp), before)
+            self.assertTrue(any("part_0001.csv done" in line for line in logs.output))
+            self.assertFalse(any("resume at chunk" in line for line in logs.output))
+
+
+class TestBronzePhase(unittest.TestCase):
+
+    def test_chunk_error_is_not_replaced_by_write_behind_error(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conf, input_dir = _write_conf(tmp)
+            _sales_file(os.path.join(input_dir, "part_0001.csv"), 0, 6)
+
+            pipeline = Pipeline(Config(conf), logging.getLogger("test"))
+            cleaning_failed = threading.Event()
+            process_row = pipeline.cleaner.process_row
+
+            def failing_write(*args):
+                cleaning_failed.wait(5)
+                raise OSError("disk full")
+
+            def failing_clean(row):
+                if row["order_id"] == "ORD-3":
+                    cleaning_failed.set()
+                    raise ValueError("bad row")
+                return process_row(row)
+
+            pipeline.writer.write_silver_chunk = failing_write
+            pipeline.cleaner.process_row = failing_clean
+            try:
+                with self.assertLogs("test", level="ERROR") as logs, self.assertRaises(ValueError):
+                    pipeline.run_bronze_phase()
+                self.assertIn("disk full", logs.output[0])
+            finally:
+                pipeline.close()
+
+
+class TestBatchRun(unittest.TestCase):
+
+    def test_second_run_picks_up_new_files_only(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conf, input_dir = _write_conf(tmp)
+            _sales_file(os.path.join(input_dir, "part_0001.csv"), 0, 5)
+            run_pipeline(conf)
+
+            # ORD-3 and ORD-4 are resent in the next partition
+            _sales_file(os.path.join(input_dir, "part_0002.csv"), 3, 5)
+            run_pipeline(conf)
+
+            self.assertEqual(_checkpoint(tmp, "bronze"), {
+                "file": os.path.join(input_dir, "part_0002.csv"), "chunk_index": 3, "chunk_size": 2
+            })
+            silver = sorted(os.listdir(os.path.join(tmp, "out", "silver")))
+            self.assertEqual(_checkpoint(tmp, "silver")["file"], os.path.join(tmp, "out", "silver", silver[-1]))
+
+            # upserted tables match one run over both files; the others
+            # cover the latest run only
+            gold, expected = _gold(tmp), _batch_gold(input_dir)
+            for table in ("monthly_sales_summary.csv", "rollup_kpis.csv", "rollup_region_by_month.csv", "rollup_revenue_by_year.csv"):
+                self.assertEqual(gold[table], expected[table], table)
+            self.assertEqual(gold["monthly_sales_summary.csv"][0]["order_count"], "8")
+
+            # nothing new: checkpoints and Gold stay as they are
+            run_pipeline(conf)
+            self.assertEqual(_checkpoint(tmp, "bronze")["file"], os.path.join(input_dir, "part_0002.csv"))
+            self.assertEqual(_gold(tmp)["monthly_sales_summary.csv"], gold["monthly_sales_summary.csv"])
+
+
+class TestWatchPipeline(unittest.TestCase):
+
+    def _watch(self, conf):
+        stop = threading.Event()
+        thread = threading.Thread(target=watch_pipeline, args=(conf, stop), daemon=True)
+        thread.start()
+        return stop, thread
+
+    def test_watch_ingests_new_and_late_files_and_restarts_cleanly(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conf, input_dir = _write_conf(tmp, "[WATCH]\npoll_interval_seconds = 0.02\ngold_refresh_seconds = 0")
+            _sales_file(os.path.join(input_dir, "part_0002.csv"), 0, 5)
+            ledger_path = os.path.join(tmp, "out", "watch", "ingested.json")
+
+            def ledger():
+                if not os.path.exists(ledger_path):
+                    return set()
+                with open(ledger_path) as f:
+                    return {os.path.basename(path) for path in json.load(f)["files"]}
+
+            stop, thread = self._watch(conf)
+            try:
+                _wait_for(lambda: "part_0002.csv" in ledger())
+                # one on-time partition, one backfilled behind the checkpoint
+                _sales_file(os.path.join(input_dir, "part_0003.csv"), 3, 5)
+                _sales_file(os.path.join(input_dir, "part_0001.csv"), 20, 3)
+                _wait_for(lambda: len(ledger()) == 3)
+            finally:
+                stop.set()
+                thread.join(10)
+            self.assertFalse(thread.is_alive())
+
+            gold = _gold(tmp)
+            self.assertEqual(gold["monthly_sales_summary.csv"][0]["order_count"], "11")
+            bronze = _checkpoint(tmp, "bronze")
+            self.assertEqual(bronze["file"], os.path.join(input_dir, "part_0003.csv"))
+
+            # second pass: a restart rebuilds Gold from Silver and ingests nothing again
+            stop, thread = self._watch(conf)
+            time.sleep(0.2)
+            stop.set()
+            thread.join(10)
+            self.assertFalse(thread.is_alive())
+
+            self.assertEqual(_checkpoint(tmp, "bronze"), bronze)
+            self.assertEqual(ledger(), {"part_0001.csv", "part_0002.csv", "part_0003.csv"})
+            self.assertEqual(_gold(tmp), gold)
+            self.assertEqual(gold, _batch_gold(input_dir))
+
+
+class TestDistributedRun(unittest.TestCase):
+
+    def test_workers_share_files_and_a_new_file_reopens_the_merge(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conf, input_dir = _write_conf(tmp, "[COORDINATION]\nlease_seconds = 0.3")
+            for index in range(4):
+                _sales_file(os.path.join(input_dir, f"part_{index:04d}.csv"), index * 4, 6)
+
+            errors = []
+
+            def worker(worker_id):
+                try:
+                    run_distributed(conf, worker_id)
+                except BaseException as e:
+                    errors.append(e)
+
+            workers = [threading.Thread(target=worker, args=(f"w{index}",), daemon=True) for index in range(2)]
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join(30)
+                self.assertFalse(thread.is_alive())
+            self.assertEqual(errors, [])
+
+            leases = LeaseService(lease_path(os.path.join(tmp, "out")), "check")
+            try:
+                self.assertTrue(leases.all_done())
+                owners = {row[0] for row in leases.conn.execute("SELECT owner FROM leases WHERE item LIKE '%.csv'")}
+            finally:
+                leases.close()
+            self.assertTrue(owners <= {"w0", "w1"})
+            self.assertEqual(_gold(tmp), _batch_gold(input_dir))
+            # progress lives in the lease table, not in checkpoints
+            self.assertEqual(os.listdir(os.path.join(tmp, "checkpoints")), [])
+
+            # second pass: a new file is registered, processed and merged
+            _sales_file(os.path.join(input_dir, "part_0004.csv"), 14, 6)
+            run_distributed(conf, "w2")
+
+            leases = LeaseService(lease_path(os.path.join(tmp, "out")), "check")
+            try:
+                self.assertTrue(leases.all_done())
+                self.assertEqual(leases.status(os.path.join(input_dir, "part_0004.csv")), "done")
+            finally:
+                leases.close()
+            gold = _gold(tmp)
+            self.assertEqual(gold, _batch_gold(input_dir))
+            self.assertEqual(gold["monthly_sales_summary.csv"][0]["order_count"], "20")
+
+
+class TestProfileFlag(unittest.TestCase):
+
+    def _profiles(self, tmp):
+        root = os.path.join(tmp, "out", "profiles")
+        return {
+            os.path.basename(directory): sorted(name for name in names if name.endswith(".prof"))
+            for directory, _, names in os.walk(root) if names
+        }
+
+    def test_watch_and_distributed_runs_profile_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conf, input_dir = _write_conf(tmp, "[WATCH]\npoll_interval_seconds = 0.02\ngold_refresh_seconds = 0")
+            _sales_file(os.path.join(input_dir, "part_0001.csv"), 0, 4)
+
+            stop = threading.Event()
+            thread = threading.Thread(target=watch_pipeline, args=(conf, stop, 1.0, ["clean"]), daemon=True)
+            thread.start()
+            _wait_for(lambda: os.path.exists(os.path.join(tmp, "out", "watch", "ingested.json")))
+            stop.set()
+            thread.join(10)
+
+            (profiles,) = self._profiles(tmp).values()
+            self.assertEqual(profiles, ["bronze_part_0001.csv_c0_clean.prof", "bronze_part_0001.csv_c1_clean.prof"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            conf, input_dir = _write_conf(tmp)
+            _sales_file(os.path.join(input_dir, "part_0001.csv"), 0, 2)
+            run_distributed(conf, "w0", profile_sample=1.0, profile_stages=["clean"])
+
+            ((run, profiles),) = self._profiles(tmp).items()
+            self.assertTrue(run.endswith("-w0"))
+            self.assertEqual(profiles, ["bronze_part_0001.csv_c0_clean.prof"])
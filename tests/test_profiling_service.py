@@ -0,0 +1,47 @@
+import unittest
+import tempfile
+import os
+
+from src.metrics_service import MetricsService
+from src.profiling_service import ChunkProfiler
+
+
+class TestProfilingService(unittest.TestCase):
+
+    def test_disabled_profiler_is_a_no_op(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = ChunkProfiler(tmp)
+            chunk = profiler.start_chunk("c0")
+
+            self.assertIsNone(chunk)
+            self.assertIs(profiler.stage(chunk, "clean"), profiler.stage(chunk, "dedup"))
+            self.assertFalse(os.path.exists(os.path.join(tmp, "profiles")))
+
+    def test_sampled_chunks_dump_profiles_and_metrics(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = ChunkProfiler(tmp, sample_rate=0.5, stages=["clean"])
+            metrics = MetricsService()
+
+            for i in range(4):
+                chunk = profiler.start_chunk(f"c{i}")
+                with profiler.stage(chunk, "clean"):
+                    data = [str(n) * 10 for n in range(20000)]
+                with profiler.stage(chunk, "silver_write"):
+                    pass
+                profiler.finish_chunk(chunk, metrics)
+
+            self.assertEqual([p["chunk"] for p in metrics.profiles], ["c1", "c3"])
+            self.assertEqual({p["stage"] for p in metrics.profiles}, {"clean"})
+            self.assertTrue(metrics.profiles[0]["top_allocations"])
+            self.assertGreater(metrics.profiles[0]["peak_bytes"], 0)
+
+            files = sorted(os.listdir(profiler.profile_dir))
+            self.assertEqual(files, [
+                "c1_clean.collapsed", "c1_clean.prof",
+                "c3_clean.collapsed", "c3_clean.prof",
+            ])
+            self.assertEqual(len(data), 20000)
+
+    def test_unknown_stage_rejected(self):
+        with self.assertRaises(ValueError):
+            ChunkProfiler("unused", sample_rate=1.0, stages=["parse"])
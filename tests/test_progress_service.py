@@ -0,0 +1,61 @@
+import unittest
+import tempfile
+import logging
+import os
+from unittest import mock
+
+from src.metrics_service import MetricsService
+from src.progress_service import PhaseProgress, ProgressReporter
+
+
+class TestProgressService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.logger = logging.getLogger("test_progress")
+
+    def test_phase_fraction_rate_and_eta(self):
+        with mock.patch("src.progress_service.time.monotonic", side_effect=[0.0, 10.0, 20.0, 20.0, 20.0, 20.0]):
+            progress = PhaseProgress(total_bytes=1000, rows_at_start=50)
+            progress.update(100, 150)   # t=10: first update, skipped resume rows do not count
+            progress.update(300, 350)   # t=20
+
+            self.assertAlmostEqual(progress.fraction, 0.3)
+            self.assertAlmostEqual(progress.rows_per_second, 300 / 20)
+            # 200 bytes in 10s since the first update -> 700 bytes left
+            self.assertAlmostEqual(progress.eta, 35.0)
+
+        progress.finish()
+        self.assertEqual((progress.fraction, progress.eta), (1.0, 0.0))
+
+    def test_textfile_is_replaced_atomically_with_counters(self):
+        path = os.path.join(self.tmp.name, "prom", "pipeline.prom")
+        metrics = MetricsService()
+        metrics.increment_clean_read(10)
+        metrics.increment_read(8)
+        metrics.increment_deduplicated(2)
+        metrics.increment_deduplicated_early(2)
+        metrics.increment_rejected(["bad \"quote\""])
+        with metrics.timed("clean"):
+            pass
+
+        reporter = ProgressReporter(self.logger, metrics, path, interval=3600)
+        reporter.start_phase("bronze", 100)
+        reporter.update("bronze", 40, 10)
+        self.assertFalse(os.path.exists(path))  # throttled
+
+        reporter.finish_phase("bronze", 10)
+        with open(path) as f:
+            text = f.read()
+
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["pipeline.prom"])
+        self.assertIn("pipeline_bronze_rows_total 10\n", text)
+        self.assertIn('pipeline_rows_deduplicated_total{stage="early"} 2\n', text)
+        self.assertIn('pipeline_rows_deduplicated_total{stage="silver"} 2\n', text)
+        self.assertIn("pipeline_dedup_hit_ratio 0.4\n", text)
+        self.assertIn('pipeline_rejections_total{reason="bad \\"quote\\""} 1\n', text)
+        self.assertIn('pipeline_stage_seconds_total{stage="bronze"}', text)
+        self.assertIn('pipeline_stage_seconds_total{stage="clean"}', text)
+        self.assertIn('pipeline_phase_progress_ratio{phase="bronze"} 1.0\n', text)
+        self.assertIn("# TYPE pipeline_phase_eta_seconds gauge\n", text)
@@ -0,0 +1,158 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+
+from src.dashboard.loaders import _read_table
+from src.dashboard.query_service import GoldQueryService, make_server
+from src.writer_service import WriterService
+
+
+ROLLUP = [
+    {"sale_month": "2024-01", "region": "north", "category": "electronics", "total_revenue": 100.0, "total_quantity": 2},
+    {"sale_month": "2024-01", "region": "south", "category": "toys", "total_revenue": 40.0, "total_quantity": 4},
+    {"sale_month": "2024-02", "region": "north", "category": "toys", "total_revenue": 30.0, "total_quantity": 3},
+    {"sale_month": "2024-03", "region": "south", "category": "electronics", "total_revenue": 70.0, "total_quantity": 1},
+]
+
+
+def body(response):
+    return json.loads(response[2])
+
+
+class TestGoldQueryService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.writer = WriterService(self.tmp.name, gold_format="parquet")
+        self.writer.write_gold_table("rollup", ROLLUP)
+        self.service = GoldQueryService(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_filters(self):
+        status, _, _ = response = self.service.handle(
+            "/tables/rollup?month_from=2024-01&month_to=2024-02&region=north,east"
+        )
+        self.assertEqual(status, 200)
+        rows = body(response)["rows"]
+        self.assertEqual([(r["sale_month"], r["region"]) for r in rows], [("2024-01", "north"), ("2024-02", "north")])
+
+    def test_group_by_aggregates_and_orders(self):
+        response = self.service.handle("/tables/rollup?group_by=region&order_by=-total_revenue_sum")
+        self.assertEqual(body(response)["rows"], [
+            {"region": "north", "total_revenue_sum": 130.0, "total_quantity_sum": 5},
+            {"region": "south", "total_revenue_sum": 110.0, "total_quantity_sum": 5},
+        ])
+
+        response = self.service.handle(
+            "/tables/rollup?category=electronics&group_by=category&agg=sum:total_revenue,count:region"
+        )
+        self.assertEqual(body(response)["rows"], [
+            {"category": "electronics", "total_revenue_sum": 170.0, "region_count": 2}
+        ])
+
+        response = self.service.handle("/tables/rollup?columns=region,total_revenue&order_by=-total_revenue&limit=1")
+        self.assertEqual(body(response)["rows"], [{"region": "north", "total_revenue": 100.0}])
+
+    def test_etag_and_not_modified(self):
+        status, headers, _ = self.service.handle("/tables/rollup?region=north&limit=5")
+        self.assertEqual(status, 200)
+        etag = headers["ETag"]
+
+        # same query in another parameter order: same ETag
+        status, headers, content = self.service.handle("/tables/rollup?limit=5&region=north", if_none_match=etag)
+        self.assertEqual((status, content), (304, b""))
+        self.assertEqual(headers["ETag"], etag)
+
+        status, other, _ = self.service.handle("/tables/rollup?region=south&limit=5", if_none_match=etag)
+        self.assertEqual(status, 200)
+        self.assertNotEqual(other["ETag"], etag)
+
+    def test_reload_when_table_rewritten(self):
+        status, headers, _ = self.service.handle("/tables/rollup")
+        self.assertEqual(status, 200)
+
+        self.writer.write_gold_table("rollup", ROLLUP[:1])
+        # coarse mtime granularity: make sure the rewrite changes the version
+        path = os.path.join(self.tmp.name, "gold", "rollup.parquet")
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 10_000_000))
+
+        status, new_headers, content = self.service.handle("/tables/rollup", if_none_match=headers["ETag"])
+        self.assertEqual(status, 200)
+        self.assertNotEqual(new_headers["ETag"], headers["ETag"])
+        self.assertEqual(json.loads(content)["row_count"], 1)
+
+    def test_etag_follows_the_table_the_body_came_from(self):
+        status, headers, content = self.service.handle("/tables/rollup?region=north")
+        self.assertEqual(status, 200)
+
+        # the table is rewritten between the version stat and the load
+        other = GoldQueryService(self.tmp.name)
+        other.store.version = lambda name: "stale"
+        status, other_headers, other_content = other.handle("/tables/rollup?region=north")
+        self.assertEqual(status, 200)
+        self.assertEqual(other_headers["ETag"], headers["ETag"])
+        self.assertEqual(other_content, content)
+
+    def test_errors(self):
+        status, _, content = self.service.handle("/tables/nope")
+        self.assertEqual(status, 404)
+        self.assertIn("error", json.loads(content))
+
+        queries = (
+            "limit=x", "group_by=nope", "agg=median:total_revenue&group_by=region", "colour=red",
+            "agg=sum:total_revenue", "group_by=sale_month&agg=sum:sale_month",
+        )
+        for query in queries:
+            status, _, content = self.service.handle(f"/tables/rollup?{query}")
+            self.assertEqual(status, 400, query)
+            self.assertIn("error", json.loads(content))
+
+        self.assertEqual(body(self.service.handle("/tables")), {"tables": ["rollup"]})
+
+    def test_only_gold_tables_are_served(self):
+        WriterService(os.path.join(self.tmp.name, "outside"), gold_format="csv").write_gold_table("leak", ROLLUP)
+        with open(os.path.join(self.tmp.name, "leak.csv"), "w") as f:
+            f.write("secret\n1\n")
+
+        for name in ("../leak", "../outside/gold/leak", "..%2Fleak", "/leak"):
+            status, _, _ = self.service.handle(f"/tables/{name}")
+            self.assertEqual(status, 404, name)
+
+    def test_unreadable_table_is_a_server_error(self):
+        with open(os.path.join(self.tmp.name, "gold", "broken.parquet"), "wb") as f:
+            f.write(b"not parquet")
+
+        with self.assertLogs("gold_query", level="ERROR"):
+            status, _, content = self.service.handle("/tables/broken")
+        self.assertEqual(status, 500)
+        self.assertIn("error", json.loads(content))
+
+        # the table is not kept twice: load_table's cache is bypassed
+        _read_table.cache_clear()
+        self.assertEqual(body(self.service.handle("/tables/rollup"))["row_count"], 4)
+        self.assertEqual(_read_table.cache_info().currsize, 0)
+
+    def test_http_server(self):
+        server = make_server(self.tmp.name, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/tables/rollup?region=south"
+            with urllib.request.urlopen(url) as response:
+                etag = response.headers["ETag"]
+                self.assertEqual(json.loads(response.read())["row_count"], 2)
+
+            request = urllib.request.Request(url, headers={"If-None-Match": etag})
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                urllib.request.urlopen(request)
+            self.assertEqual(ctx.exception.code, 304)
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,64 @@
+import unittest
+import tempfile
+import os
+
+from src.clean_transform_service import CleanTransformService
+from src.schema_service import BronzeSchema, SchemaError
+
+
+HEADER = [
+    "order_id", "product_name", "category", "quantity", "unit_price",
+    "discount_percent", "region", "sale_date", "customer_email"
+]
+
+
+class TestSchemaService(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = BronzeSchema.load("schema.txt")
+
+    def _write_schema(self, text):
+        fd, path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_invalid_schema_file(self):
+        with self.assertRaises(SchemaError):
+            BronzeSchema.load(self._write_schema("order_id:string\nunit_price:decimal\n"))
+        with self.assertRaises(SchemaError):
+            BronzeSchema.load(self._write_schema("order_id:string\n"))  # missing required fields
+
+    def test_header_drift_fails_fast(self):
+        with self.assertRaisesRegex(SchemaError, "missing=\\['customer_email'\\]"):
+            self.schema.compile(HEADER[:-1], "part_1.csv")
+        with self.assertRaisesRegex(SchemaError, "unexpected=\\['coupon'\\]"):
+            self.schema.compile(HEADER + ["coupon"], "part_1.csv")
+
+    def test_reordered_columns_and_typed_fields(self):
+        header = list(reversed(HEADER))
+        parse = self.schema.compile(header, "part_1.csv")
+        row = ["a@b.com", "2024-01-02", "north", "0.1", "oops", "2", "fashion", "shoe", "O1"]
+
+        self.assertEqual(
+            parse(row),
+            ("O1", "shoe", "fashion", "2", None, 0.1, "north", "2024-01-02", "a@b.com")
+        )
+        # short rows are padded like DictReader
+        self.assertEqual(parse(row[:3])[0], None)
+
+    def test_record_path_matches_dict_path(self):
+        parse = self.schema.compile(HEADER, "part_1.csv")
+        cleaner = CleanTransformService()
+        rows = [
+            ["1", " Nike Shoes ", "Cloths", "3", "19.999", "0.25", "NORT", "02/03/2024", "x@y.z"],
+            ["2", "", "", "1", "abc", "", "", "", ""],
+            ["3", "iPhone 14", "electronics", "0", "10", "1.5", "west", "2024/01/05", "bad"],
+            ["4", "tv", "home appliance", "2", "100", "-1", "east", "not a date"],
+            ["", "tv", "home appliance", "2", "100", "0", "east", "2024-01-01", ""],
+        ]
+
+        for row in rows:
+            as_dict = dict(zip(HEADER, row + [None] * (len(HEADER) - len(row))))
+            self.assertEqual(cleaner.process_record(parse(row)), cleaner.process_row(as_dict))
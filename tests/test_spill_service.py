@@ -0,0 +1,59 @@
+import unittest
+import tempfile
+import os
+
+from src.spill_service import ENTRY_BYTES, SpillStore
+
+
+def _state(keys, revenue=1):
+    return {f"p{k}": {"revenue": revenue, "quantity": 1} for k in keys}
+
+
+class TestSpillStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_merged_items_sum_spills_and_memory(self):
+        store = SpillStore(self.tmp.name, "products", ("revenue", "quantity"), max_bytes=1 << 30)
+        store.spill(_state(range(100)))
+        store.spill(_state(range(50, 150), revenue=2))
+
+        totals = dict(store.merged_items(_state([0, 500], revenue=10)))
+
+        self.assertEqual(len(totals), 151)
+        self.assertEqual(totals["p0"], {"revenue": 11, "quantity": 2})
+        self.assertEqual(totals["p75"], {"revenue": 3, "quantity": 2})
+        self.assertEqual(totals["p149"], {"revenue": 2, "quantity": 1})
+        self.assertEqual(totals["p500"], {"revenue": 10, "quantity": 1})
+
+        store.clear()
+        self.assertFalse(os.path.exists(store.dir))
+
+    def test_oversized_partition_is_split_again(self):
+        # budget of ~10 entries forces recursive re-partitioning
+        store = SpillStore(self.tmp.name, "products", ("revenue", "quantity"), max_bytes=10 * ENTRY_BYTES)
+        for _ in range(3):
+            store.spill(_state(range(5000)))
+
+        totals = dict(store.merged_items({}))
+        self.assertEqual(len(totals), 5000)
+        self.assertTrue(all(v == {"revenue": 3, "quantity": 3} for v in totals.values()))
+
+        # split files are temporary
+        self.assertEqual(len(os.listdir(store.dir)), 64)
+
+    def test_absorb_moves_partials(self):
+        a = SpillStore(self.tmp.name, "products", ("revenue", "quantity"), max_bytes=1 << 30)
+        b = SpillStore(self.tmp.name, "products", ("revenue", "quantity"), max_bytes=1 << 30)
+        a.spill(_state(range(10)))
+        b.spill(_state(range(5, 15)))
+
+        a.absorb(b)
+
+        self.assertFalse(b.spilled)
+        self.assertFalse(os.path.exists(b.dir))
+        totals = dict(a.merged_items({}))
+        self.assertEqual(len(totals), 15)
+        self.assertEqual(totals["p7"]["quantity"], 2)
@@ -0,0 +1,68 @@
+import unittest
+import tempfile
+import json
+import os
+
+from src.clean_transform_service import CleanTransformService
+from src.tuning_service import CHUNK_SIZES, TuningService, worker_ladder
+
+
+ROW = {
+    "order_id": "ORD-1", "product_name": "iPhone 14", "category": "electronics", "quantity": "2",
+    "unit_price": "100.5", "discount_percent": "0.1", "region": "North", "sale_date": "2024-01-15",
+    "customer_email": "a@b.com",
+}
+
+
+class TestTuningService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _record(self, tuning, chunk_size, workers, rows_per_second):
+        tuning.record_run(chunk_size, workers, 1.0, [{"rows": rows_per_second, "seconds": 1.0, "rss_bytes": None}])
+
+    def test_choose_explores_neighbours_then_settles(self):
+        tuning = TuningService(self.tmp.name, max_chunk_mb=256, cpus=1)
+        self.assertIsNone(tuning.choose())
+
+        self._record(tuning, 25_000, 1, 1000)
+        self.assertEqual(tuning.choose().chunk_size, 50_000)  # larger neighbour first
+
+        self._record(tuning, 50_000, 1, 800)
+        self.assertEqual(tuning.choose().chunk_size, 10_000)
+
+        self._record(tuning, 10_000, 1, 900)
+        choice = tuning.choose()
+        self.assertEqual((choice.chunk_size, choice.workers), (25_000, 1))
+        self.assertIn("best measured", choice.reason)
+
+        # a fixed chunk_size only considers runs with that size
+        self.assertEqual(tuning.choose(chunk_size=50_000).chunk_size, 50_000)
+
+        # persisted per host
+        with open(tuning.path) as f:
+            self.assertEqual(len(json.load(f)[tuning.host]["runs"]), 3)
+        self.assertEqual(len(TuningService(self.tmp.name, 256).runs), 3)
+
+    def test_choose_tries_more_workers(self):
+        tuning = TuningService(self.tmp.name, max_chunk_mb=256, cpus=4)
+        self.assertEqual(worker_ladder(4), [1, 2, 4])
+        self.assertEqual(worker_ladder(6), [1, 2, 4, 6])
+
+        self._record(tuning, 25_000, 1, 1000)
+        self.assertEqual(tuning.choose(chunk_size=25_000).workers, 2)
+
+    def test_calibration_respects_memory_cap(self):
+        tuning = TuningService(self.tmp.name, max_chunk_mb=10, cpus=2)
+        rows = [dict(ROW, order_id=f"ORD-{i}") for i in range(12_000)]
+
+        choice = tuning.calibrate(lambda n: rows[:n], CleanTransformService().process_row)
+        self.assertIn(choice.chunk_size, CHUNK_SIZES)
+        self.assertLessEqual(choice.chunk_size * tuning.bytes_per_row, 10 * 1024 * 1024)
+        self.assertEqual(choice.workers, 2)
+        self.assertGreater(tuning.bytes_per_row, 0)
+        self.assertFalse(os.path.exists(os.path.join(tuning.dir, "calibration")))
+
+        self.assertIsNone(TuningService(self.tmp.name, 10).calibrate(lambda n: [], lambda row: None))
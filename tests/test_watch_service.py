@@ -0,0 +1,149 @@
+import unittest
+import tempfile
+import os
+import csv
+import logging
+
+from src.config_service import Config
+from src.pipeline_orchestrator import Pipeline
+from src.watch_service import WatchService
+
+
+class FakeIngestion:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def refresh_bronze_files(self):
+        return sorted(os.path.join(self.directory, f) for f in os.listdir(self.directory))
+
+
+class TestWatchService(unittest.TestCase):
+
+    def _write(self, path, text):
+        with open(path, "a") as f:
+            f.write(text)
+
+    def test_file_reported_once_settled(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            watcher = WatchService(FakeIngestion(tmp))
+            path = os.path.join(tmp, "part_0001.csv")
+
+            self._write(path, "order_id\n")
+            self.assertEqual(watcher.poll(), [])
+
+            # still growing: not ready
+            self._write(path, "1\n")
+            self.assertEqual(watcher.poll(), [])
+
+            self.assertEqual(watcher.poll(), [path])
+            self.assertEqual(watcher.poll(), [])
+
+    def test_mark_done_skips_existing_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            watcher = WatchService(FakeIngestion(tmp))
+            old = os.path.join(tmp, "part_0001.csv")
+            self._write(old, "order_id\n1\n")
+            watcher.mark_done([old])
+
+            new = os.path.join(tmp, "part_0002.csv")
+            self._write(new, "order_id\n2\n")
+
+            watcher.poll()
+            self.assertEqual(watcher.poll(), [new])
+
+    def test_late_files_tracked_by_ledger(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ingestion = FakeIngestion(tmp)
+            paths = [os.path.join(tmp, f"part_000{i}.csv") for i in (1, 2, 3)]
+            for path in paths:
+                self._write(path, "order_id\n")
+            ingestion.bronze_files = ingestion.refresh_bronze_files()
+            ledger = os.path.join(tmp, "watch", "ingested.json")
+
+            # first start: everything before the checkpoint was ingested by it
+            watcher = WatchService(ingestion, ledger)
+            self.assertEqual(watcher.late_files(paths[2]), [])
+            watcher.record_ingested(paths)
+
+            # backfilled while the watcher was down
+            late = os.path.join(tmp, "part_0000.csv")
+            self._write(late, "order_id\n")
+            ingestion.bronze_files = ingestion.refresh_bronze_files()
+
+            watcher = WatchService(ingestion, ledger)
+            self.assertEqual(watcher.late_files(paths[2]), [late])
+            watcher.record_ingested([late])
+            self.assertEqual(WatchService(ingestion, ledger).late_files(paths[2]), [])
+
+
+def _sales_file(path, start, count):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "order_id", "product_name", "category", "quantity", "unit_price",
+            "discount_percent", "region", "sale_date", "customer_email"
+        ])
+        for i in range(start, start + count):
+            writer.writerow([f"ORD-{i}", "iphone 14", "electronics", 1, 10.0, 0.0, "north", "2024-01-15", ""])
+
+
+class TestLateFiles(unittest.TestCase):
+
+    def test_late_file_reaches_gold(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            input_dir = os.path.join(tmp, "input")
+            os.makedirs(input_dir)
+            _sales_file(os.path.join(input_dir, "part_0001.csv"), 0, 5)
+            _sales_file(os.path.join(input_dir, "part_0003.csv"), 5, 5)
+
+            conf_path = os.path.join(tmp, "conf.ini")
+            with open(conf_path, "w") as f:
+                f.write(f"""
+[PIPELINE]
+chunk_size = 2
+max_rows = -1
+enable_checkpoint = true
+checkpoint_file = cp.json
+
+[INPUT]
+input_type = directory
+input_path = {input_dir}
+file_pattern = part_*.csv
+
+[OUTPUT]
+output_dir = {os.path.join(tmp, "out")}
+format = csv
+
+[CHECKPOINTS]
+bronze_checkpoint = {os.path.join(tmp, "bronze.json")}
+silver_checkpoint = {os.path.join(tmp, "silver.json")}
+
+[MEMORY]
+max_chunk_mb = 128
+flush_interval = 1000
+
+[ANOMALY]
+top_n = 5
+high_revenue_threshold = 100
+""")
+            pipeline = Pipeline(Config(conf_path), logging.getLogger("test"))
+            try:
+                pipeline.run_bronze_phase()
+                pipeline.run_silver_phase()
+                bronze_cp = pipeline.bronze_cp.get().to_dict()
+                silver_cp = pipeline.silver_cp.get().to_dict()
+
+                # backfilled partition, sorting before both checkpoints; one
+                # order repeats an ingested one
+                late = os.path.join(input_dir, "part_0002.csv")
+                _sales_file(late, 8, 4)
+                pipeline.ingestion.refresh_bronze_files()
+
+                self.assertTrue(pipeline.run_silver_phase(pipeline.run_bronze_late([late])))
+                self.assertEqual(pipeline.bronze_cp.get().to_dict(), bronze_cp)
+                self.assertEqual(pipeline.silver_cp.get().to_dict(), silver_cp)
+
+                monthly = pipeline.aggregator.finalize()["monthly_sales_summary"]
+                self.assertEqual(sum(row["order_count"] for row in monthly), 12)
+            finally:
+                pipeline.close()
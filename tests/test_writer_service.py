@@ -1,7 +1,9 @@
 import unittest
+import random
 import tempfile
 import os
 
+from src.aggregation_service import AggregationService
 from src.writer_service import WriterService
 
 
@@ -26,3 +28,163 @@ class TestWriterService(unittest.TestCase):
 
             gold_dir = os.path.join(tmp, "gold")
             self.assertTrue(os.path.exists(os.path.join(gold_dir, "test.csv")))
+
+    def test_silver_name_strips_compression_suffix(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = WriterService(tmp, gold_format="csv")
+            writer.write_silver_chunk("input/part_0001.csv.gz", 3, [{"a": 1}])
+
+            silver_dir = os.path.join(tmp, "silver")
+            self.assertEqual(os.listdir(silver_dir), ["part_0001_chunk_0003.csv"])
+
+    def test_monthly_upsert_updates_rollups(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = WriterService(tmp, gold_format="csv")
+            first = [
+                {"sale_month": "2023-12", "total_revenue": 10.0, "total_quantity": 1, "order_count": 1, "avg_discount": 0.2},
+                {"sale_month": "1970-01", "total_revenue": 99.0, "total_quantity": 9, "order_count": 9, "avg_discount": 0.0},
+            ]
+            second = [
+                {"sale_month": "2023-12", "total_revenue": 5.5, "total_quantity": 2, "order_count": 3, "avg_discount": 0.0},
+                {"sale_month": "2024-01", "total_revenue": 4.5, "total_quantity": 1, "order_count": 1, "avg_discount": 0.1},
+            ]
+            writer.write_gold_table("monthly_sales_summary", first)
+            writer.write_gold_table("monthly_sales_summary", second)
+
+            merged = {r["sale_month"]: r for r in writer._read_gold_table("monthly_sales_summary")}
+            self.assertEqual(float(merged["2023-12"]["total_revenue"]), 15.5)
+            self.assertEqual(int(merged["2023-12"]["order_count"]), 4)
+            self.assertEqual(float(merged["2023-12"]["avg_discount"]), 0.05)
+
+            kpis = writer._read_gold_table("rollup_kpis")[0]
+            self.assertEqual(float(kpis["total_revenue"]), 20.0)
+            self.assertEqual(int(kpis["order_count"]), 5)
+            self.assertEqual(kpis["first_month"], "2023-12")
+
+            years = writer._read_gold_table("rollup_revenue_by_year")
+            self.assertEqual([(y["year"], float(y["total_revenue"])) for y in years], [("2023", 15.5), ("2024", 4.5)])
+
+    def test_incremental_avg_discount_matches_full_run(self):
+        rng = random.Random(3)
+        rows = [
+            {
+                "sale_month": rng.choice(["2024-01", "2024-02"]),
+                "product_key": "p1",
+                "region": "north",
+                "category": "electronics",
+                "quantity": 1,
+                "discount_percent": round(rng.random(), 6),
+                "revenue": 1.0,
+            }
+            for _ in range(400)
+        ]
+        full = AggregationService(anomaly_top_n=1)
+        for row in rows:
+            full.process(row)
+        expected = full.finalize()["monthly_sales_summary"]
+
+        for fmt in ("csv", "parquet", "orc"):
+            with tempfile.TemporaryDirectory() as tmp:
+                writer = WriterService(tmp, gold_format=fmt)
+                # one incremental run per 7 rows
+                for start in range(0, len(rows), 7):
+                    batch = AggregationService(anomaly_top_n=1)
+                    for row in rows[start:start + 7]:
+                        batch.process(row)
+                    writer.write_gold_table("monthly_sales_summary", batch.finalize()["monthly_sales_summary"])
+
+                merged = writer._read_gold_table("monthly_sales_summary")
+                self.assertEqual(
+                    [(r["sale_month"], float(r["avg_discount"]), int(r["discount_sum"])) for r in merged],
+                    [(r["sale_month"], r["avg_discount"], r["discount_sum"]) for r in expected],
+                    fmt
+                )
+
+    def test_gold_write_orc_typed(self):
+        import pyorc
+
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = WriterService(tmp, gold_format="orc", orc_compression="zstd")
+            rows = [
+                {"order_id": "1", "quantity": 2, "revenue": 10, "customer_email": None},
+                {"order_id": "2", "quantity": 1, "revenue": 5.5, "customer_email": "a@b.com"},
+            ]
+            writer.write_gold_table("anomaly_records", rows)
+
+            path = os.path.join(tmp, "gold", "anomaly_records.orc")
+            with open(path, "rb") as f:
+                reader = pyorc.Reader(f, struct_repr=pyorc.StructRepr.DICT)
+                self.assertEqual(
+                    str(reader.schema),
+                    "struct<order_id:string,quantity:bigint,revenue:double,customer_email:string>"
+                )
+                self.assertEqual(list(reader)[0]["revenue"], 10.0)
+
+    def test_orc_schema_does_not_depend_on_first_batch(self):
+        import pyorc
+
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = WriterService(tmp, gold_format="orc", row_group_size=2)
+            # the first batch has whole revenues and no customer_email
+            rows = [
+                {"order_id": "1", "quantity": 2, "revenue": 10, "customer_email": None},
+                {"order_id": "2", "quantity": 1, "revenue": 5, "customer_email": None},
+                {"order_id": "3", "quantity": 3, "revenue": 7.25, "customer_email": "a@b.com"},
+            ]
+            writer.write_gold_table("anomaly_records", iter(rows))
+
+            path = os.path.join(tmp, "gold", "anomaly_records.orc")
+            with open(path, "rb") as f:
+                reader = pyorc.Reader(f, struct_repr=pyorc.StructRepr.DICT)
+                self.assertEqual(
+                    str(reader.schema),
+                    "struct<order_id:string,quantity:bigint,revenue:double,customer_email:string>"
+                )
+                self.assertEqual([row["revenue"] for row in reader], [10.0, 5.0, 7.25])
+
+    def test_orc_monthly_upsert(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = WriterService(tmp, gold_format="orc")
+            row = {"sale_month": "2024-01", "total_revenue": 1.5, "total_quantity": 1, "order_count": 1, "avg_discount": 0.1}
+            writer.write_gold_table("monthly_sales_summary", [row])
+            writer.write_gold_table("monthly_sales_summary", [dict(row)])
+
+            merged = writer._read_gold_table("monthly_sales_summary")
+            self.assertEqual(merged[0]["total_revenue"], 3.0)
+            self.assertEqual(merged[0]["order_count"], 2)
+
+    def test_streaming_parquet_row_groups(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = WriterService(tmp, gold_format="parquet", row_group_size=100)
+            rows = ({"product_key": f"p{i}", "revenue": float(i), "note": None} for i in range(250))
+            writer.write_gold_table("product_sales", rows)
+
+            path = os.path.join(tmp, "gold", "product_sales.parquet")
+            meta = pq.ParquetFile(path).metadata
+            self.assertEqual(meta.num_rows, 250)
+            self.assertEqual(meta.num_row_groups, 3)
+            self.assertEqual(pq.read_schema(path).field("note").type, pa.string())
+
+            batches = (pa.RecordBatch.from_pylist([{"product_key": "x", "revenue": 1.0, "note": "n"}]) for _ in range(2))
+            writer.write_gold_table("product_sales", batches)
+            self.assertEqual(pq.ParquetFile(path).metadata.num_rows, 2)
+
+    def test_failed_gold_write_keeps_previous_table(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = WriterService(tmp, gold_format="csv", row_group_size=1)
+            writer.write_gold_table("top_products", [{"product_key": "a", "revenue": 1.0}])
+
+            def broken_rows():
+                yield {"product_key": "b", "revenue": 2.0}
+                raise RuntimeError("aggregator failed")
+
+            with self.assertRaises(RuntimeError):
+                writer.write_gold_table("top_products", broken_rows())
+
+            gold_dir = os.path.join(tmp, "gold")
+            self.assertEqual(os.listdir(gold_dir), ["top_products.csv"])
+            with open(os.path.join(gold_dir, "top_products.csv")) as f:
+                self.assertIn("a,1.0", f.read())